@@ -0,0 +1,227 @@
+"""
+Simulateur de Conduite - Permis B
+Banc d'essai : pas de physique, étapes de dessin et trafic
+
+S'exécute avec le pilote vidéo SDL factice (aucune fenêtre) et produit
+un rapport JSON, à comparer d'une version à l'autre avant de déployer
+sur les postes de l'auto-école.
+
+Utilisation :
+    python benchmark.py --sortie bench.json
+    python benchmark.py --reference bench.json   # code de retour 1 si régression
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import copy
+import json
+import platform
+import sys
+import time
+
+from motorisation import profils_disponibles
+from simulation import Voiture, Tutoriel, FREQUENCE_PHYSIQUE
+
+
+# États représentatifs de la physique
+def etat(moteur=True, vitesse_engagee=0, vitesse=0.0, regime=800, embrayage=0,
+         frein=0, accelerateur=0, frein_main=False, cale=False, profil=None):
+    v = Voiture(profil)
+    v.moteur_demarre = moteur
+    v.vitesse_engagee = vitesse_engagee
+    v.vitesse_actuelle = vitesse
+    v.regime_moteur = regime
+    v.embrayage = embrayage
+    v.frein = frein
+    v.accelerateur = accelerateur
+    v.frein_main = frein_main
+    v.cale = cale
+    return v
+
+
+def etats_physique(profil=None):
+    etats = {
+        "ralenti": etat(frein_main=True, profil=profil),
+        "cale": etat(moteur=False, vitesse_engagee=1, regime=0, frein_main=True, cale=True,
+                     profil=profil),
+        "marche_arriere": etat(vitesse_engagee=-1, vitesse=-8.0, regime=2000, accelerateur=1,
+                               profil=profil),
+        "freinage": etat(vitesse_engagee=3, vitesse=50.0, regime=3000, frein=4, profil=profil),
+        "patinage": etat(vitesse_engagee=1, vitesse=3.0, regime=1500, embrayage=2,
+                         accelerateur=1, profil=profil),
+    }
+    vitesse_max = Voiture(profil).vitesse_max_rapport
+    for rapport in range(1, 6):
+        etats[f"rapport_{rapport}"] = etat(
+            vitesse_engagee=rapport, vitesse=vitesse_max[rapport] * 0.6,
+            regime=3000, accelerateur=2, profil=profil,
+        )
+    return etats
+
+
+def mesurer(fonction, repetitions=5, nombre=1000):
+    """Meilleur temps par appel (secondes) sur plusieurs séries"""
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        for _ in range(nombre):
+            fonction()
+        meilleur = min(meilleur, (time.perf_counter() - debut) / nombre)
+    return meilleur
+
+
+def benchmark_physique(pas=2000, repetitions=5, frequence=FREQUENCE_PHYSIQUE, profil=None):
+    """Pas par seconde de Voiture.update pour chaque état de référence"""
+    dt = 1.0 / frequence
+    resultats = {}
+    for nom, modele in etats_physique(profil).items():
+        meilleur = float("inf")
+        for _ in range(repetitions):
+            voiture = copy.copy(modele)  # Chaque série repart du même état
+            update = voiture.update
+            debut = time.perf_counter()
+            for _ in range(pas):
+                update(dt)
+            meilleur = min(meilleur, time.perf_counter() - debut)
+        resultats[nom] = pas / meilleur
+    return resultats
+
+
+def benchmark_dessin(nombre=200, repetitions=5):
+    """Temps par appel (µs) de chaque fonction de dessin et d'une image complète"""
+    import pygame
+    import simulateur
+
+    screen = simulateur.initialiser_affichage()
+    voiture = etat(vitesse_engagee=3, vitesse=50.0, regime=3000, accelerateur=2, embrayage=1)
+    voiture.position_route = 1234.5
+    voiture.position_laterale = 12.0
+    tutoriel = Tutoriel()
+    retroviseurs = simulateur.Retroviseurs(periode=1)
+
+    etapes = {
+        "dessiner_ciel": lambda: simulateur.dessiner_ciel(screen, voiture.position_route),
+        "dessiner_paysage": lambda: simulateur.dessiner_paysage(screen, voiture.position_route),
+        "dessiner_route": lambda: simulateur.dessiner_route(
+            screen, voiture.position_route, voiture.position_laterale),
+        "dessiner_tableau_bord": lambda: simulateur.dessiner_tableau_bord(screen, voiture),
+        "dessiner_pedales": lambda: simulateur.dessiner_pedales(screen, voiture),
+        "dessiner_aide_touches": lambda: simulateur.dessiner_aide_touches(screen),
+        "dessiner_tutoriel": lambda: simulateur.dessiner_tutoriel(screen, tutoriel),
+        # Les trois rétroviseurs redessinés (coût d'une image sur N) puis recopiés
+        "retroviseurs": lambda: (retroviseurs.mettre_a_jour(voiture),
+                                 retroviseurs.dessiner(screen)),
+    }
+
+    def image_complete():
+        simulateur.dessiner_frame(screen, voiture, tutoriel)
+        pygame.display.flip()
+
+    # Préchauffage des caches (couche statique, textes)
+    image_complete()
+
+    resultats = {nom: mesurer(f, repetitions, nombre) * 1e6 for nom, f in etapes.items()}
+    image = mesurer(image_complete, repetitions, nombre) * 1e6
+    return resultats, image
+
+
+def benchmark_trafic(nombres=(100, 300, 1000), repetitions=5, nombre=200):
+    """Temps (µs) de la mise à jour du trafic, des requêtes et du dessin de la route avec trafic"""
+    import simulateur
+    from trafic import Trafic
+
+    screen = simulateur.initialiser_affichage()
+    route = simulateur.get_route()
+    voiture = etat(vitesse_engagee=3, vitesse=50.0, regime=3000)
+    s_eleve = 1234.5
+    voiture.position_route = s_eleve * simulateur.UNITES_PAR_METRE
+    resultats = {}
+    for n in nombres:
+        trafic = Trafic(route.longueur, n)
+        for _ in range(120):  # Files d'attente formées derrière l'élève
+            trafic.mettre_a_jour(1 / 60, s_eleve, 1.75, 50 / 3.6)
+        resultats[f"mise_a_jour_{n}"] = mesurer(
+            lambda: trafic.mettre_a_jour(1 / 60, s_eleve, 1.75, 50 / 3.6), repetitions, nombre) * 1e6
+        resultats[f"proches_{n}"] = mesurer(
+            lambda: trafic.proches(s_eleve, 50.0), repetitions, nombre) * 1e6
+        resultats[f"vehicule_devant_{n}"] = mesurer(
+            lambda: trafic.vehicule_devant(s_eleve, 1.75), repetitions, nombre) * 1e6
+        resultats[f"dessiner_route_{n}"] = mesurer(
+            lambda: simulateur.dessiner_route(screen, voiture.position_route, 0.0, trafic=trafic),
+            repetitions, nombre) * 1e6
+    return resultats
+
+
+def executer(physique=True, dessin=True):
+    rapport = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "plateforme": platform.platform(),
+            "machine": platform.machine(),
+        },
+    }
+    if physique:
+        rapport["physique_pas_par_s"] = benchmark_physique()
+        # Chaîne de traction tabulée, pour chaque profil de voiture
+        for profil in profils_disponibles():
+            rapport[f"physique_{profil}_pas_par_s"] = benchmark_physique(profil=profil)
+    if dessin:
+        import pygame
+        rapport["meta"]["pygame"] = pygame.version.ver
+        rapport["dessin_us"], rapport["image_complete_us"] = benchmark_dessin()
+        import simulateur
+        rapport["cache_texte"] = simulateur.cache_texte.statistiques()  # Hits/misses du HUD mesuré
+        rapport["trafic_us"] = benchmark_trafic()
+    return rapport
+
+
+def comparer(rapport, reference, tolerance):
+    """Liste les mesures plus lentes que la référence au-delà de la tolérance"""
+    regressions = []
+    for cle, mesures in rapport.items():
+        if not (cle.startswith("physique") and cle.endswith("_pas_par_s")):
+            continue
+        for nom, valeur in mesures.items():
+            ancien = reference.get(cle, {}).get(nom)
+            if ancien and valeur < ancien * (1 - tolerance):
+                regressions.append(f"{cle[:-10]} {nom} : {ancien:,.0f} -> {valeur:,.0f} pas/s")
+    temps = {**rapport.get("dessin_us", {}), **rapport.get("trafic_us", {})}
+    temps_ref = {**reference.get("dessin_us", {}), **reference.get("trafic_us", {})}
+    if "image_complete_us" in rapport:
+        temps["image_complete"] = rapport["image_complete_us"]
+        temps_ref["image_complete"] = reference.get("image_complete_us")
+    for nom, valeur in temps.items():
+        ancien = temps_ref.get(nom)
+        if ancien and valeur > ancien * (1 + tolerance):
+            regressions.append(f"{nom} : {ancien:.1f} -> {valeur:.1f} µs")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai du simulateur")
+    parser.add_argument("--sortie", metavar="FICHIER", help="écrire le rapport JSON dans un fichier")
+    parser.add_argument("--reference", metavar="FICHIER", help="rapport JSON de comparaison")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="écart relatif toléré avant de signaler une régression")
+    parser.add_argument("--sans-dessin", action="store_true", help="ne mesurer que la physique")
+    args = parser.parse_args()
+
+    rapport = executer(dessin=not args.sans_dessin)
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False)
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            f.write(texte + "\n")
+    else:
+        print(texte)
+
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as f:
+            regressions = comparer(rapport, json.load(f), args.tolerance)
+        for ligne in regressions:
+            print(f"RÉGRESSION {ligne}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
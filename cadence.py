@@ -0,0 +1,137 @@
+"""
+Simulateur de Conduite - Permis B
+Cadence d'affichage : images par seconde visées, synchronisation verticale, mode libre
+
+clock.tick() de Pygame dort par tranches de l'ordre de la milliseconde
+(plus sous Windows) : à 144 Hz, une image sur deux arrive en retard ou en
+avance. Le Cadenceur vise des échéances régulières (chaque échéance suit
+la précédente, pas l'instant de réveil, pour ne pas dériver) : il dort
+jusqu'à MARGE_ATTENTE avant l'échéance puis attend activement la fin.
+
+Modes :
+- "precis" : cadence logicielle à `fps` images par seconde ;
+- "vsync" : la présentation de l'image attend le rafraîchissement de
+  l'écran, le Cadenceur ne fait que mesurer (et limite à `fps` si donné).
+  Une image non présentée (rendu partiel, rien n'a bougé) n'attend pas
+  l'écran : l'image suivante attend alors FPS_REPLI, sans quoi la boucle
+  tournerait à vide à 100 % d'un cœur ;
+- "libre" : aucune attente, pour mesurer la marge de la machine.
+
+Pendant le sommeil, une fonction peut être appelée toutes les PAS_ATTENTE
+secondes (relevé des entrées, voir entrees.py) : l'attente sert alors à
+dater les commandes plus finement qu'une fois par image.
+
+Les durées d'image sont gardées dans un tampon circulaire pour le résumé
+(images par seconde, centiles du temps d'image).
+
+Ce module n'importe pas Pygame.
+"""
+
+import time
+from array import array
+
+MARGE_ATTENTE = 0.002  # s avant l'échéance où l'on cesse de dormir
+PAS_ATTENTE = 0.002  # s entre deux appels de pendant_attente dans le sommeil
+MODES = ("precis", "vsync", "libre")
+FPS_REPLI = 60.0  # Cadence logicielle après une image non présentée en vsync
+
+
+def attendre_jusqu_a(echeance, pendant_attente=None):
+    """Dort jusqu'à MARGE_ATTENTE avant l'échéance, puis attend activement
+
+    pendant_attente : appelée toutes les PAS_ATTENTE secondes du sommeil.
+    """
+    restant = echeance - time.perf_counter()
+    while restant > MARGE_ATTENTE:
+        if pendant_attente is None:
+            time.sleep(restant - MARGE_ATTENTE)
+            break
+        time.sleep(min(PAS_ATTENTE, restant - MARGE_ATTENTE))
+        pendant_attente()
+        restant = echeance - time.perf_counter()
+    while time.perf_counter() < echeance:
+        pass
+
+
+class Cadenceur:
+    """Rythme la boucle principale et mesure les durées d'image"""
+
+    def __init__(self, fps=60.0, mode="precis", taille_mesures=10000):
+        if mode not in MODES:
+            raise ValueError(f"mode de cadence inconnu : {mode}")
+        self.mode = mode
+        self.periode = 1.0 / fps if fps and mode != "libre" else 0.0
+        self.periode_repli = 1.0 / FPS_REPLI if mode == "vsync" and not self.periode else 0.0
+        self.durees = array("d", [0.0]) * taille_mesures
+        self.n_images = 0
+        self.debut = time.perf_counter()
+        self.precedent = self.debut
+        self.echeance = self.debut + self.periode
+
+    def attendre(self, presentee=True, pendant_attente=None):
+        """Attend l'échéance de la prochaine image et renvoie le temps écoulé (s)
+
+        presentee : l'image précédente a été présentée (donc, en vsync,
+        la présentation a déjà attendu l'écran).
+        pendant_attente : fonction appelée régulièrement pendant l'attente.
+        """
+        if not presentee and self.periode_repli:
+            attendre_jusqu_a(self.precedent + self.periode_repli, pendant_attente)
+            maintenant = time.perf_counter()
+        elif self.periode:
+            attendre_jusqu_a(self.echeance, pendant_attente)
+            self.echeance += self.periode
+            maintenant = time.perf_counter()
+            if maintenant > self.echeance:
+                self.echeance = maintenant + self.periode  # Trop en retard : on se recale
+        else:
+            maintenant = time.perf_counter()
+
+        dt = maintenant - self.precedent
+        self.precedent = maintenant
+        self.durees[self.n_images % len(self.durees)] = dt
+        self.n_images += 1
+        return dt
+
+    def resume(self):
+        """Images par seconde sur toute la séance et centiles des dernières durées d'image (ms)"""
+        n = min(self.n_images, len(self.durees))
+        if n == 0:
+            return None
+        durees = sorted(self.durees[:n])
+
+        def centile(p):
+            return durees[min(n - 1, int(p / 100 * n))] * 1000
+
+        return {
+            "images": self.n_images,
+            "fps": self.n_images / (self.precedent - self.debut) if self.precedent > self.debut else 0.0,
+            "p50_ms": centile(50),
+            "p95_ms": centile(95),
+            "p99_ms": centile(99),
+            "max_ms": durees[-1] * 1000,
+        }
+
+
+def afficher_resume(resume, mode):
+    if resume is None:
+        return
+    print(f"Cadence ({mode}) : {resume['images']} images, {resume['fps']:.1f} images/s")
+    print(f"  temps d'image : médiane {resume['p50_ms']:.2f} ms, p95 {resume['p95_ms']:.2f} ms, "
+          f"p99 {resume['p99_ms']:.2f} ms, max {resume['max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # Gigue de la cadence seule (boucle vide), à comparer avec clock.tick
+    parser = argparse.ArgumentParser(description="Gigue du Cadenceur sur une boucle vide")
+    parser.add_argument("--fps", type=float, default=144.0)
+    parser.add_argument("--duree", type=float, default=3.0)
+    args = parser.parse_args()
+
+    cadenceur = Cadenceur(args.fps)
+    fin = time.perf_counter() + args.duree
+    while time.perf_counter() < fin:
+        cadenceur.attendre()
+    afficher_resume(cadenceur.resume(), cadenceur.mode)
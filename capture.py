@@ -0,0 +1,190 @@
+"""
+Simulateur de Conduite - Permis B
+Capture vidéo de la séance : copie des images dans des tampons réutilisés, écriture sur un fil à part
+
+La boucle principale ne fait qu'une copie mémoire de l'image (environ
+1 ms en 1280x720) dans l'un des TAILLE_RESERVE tampons préalloués ; un
+fil d'arrière-plan les compresse et les écrit, puis rend le tampon.
+Quand aucun tampon n'est libre (le disque ou la compression ne suivent
+pas), l'image est perdue plutôt que d'attendre : la cadence d'affichage
+ne dépend jamais de la capture. Les images perdues sont comptées et
+chaque image écrite est horodatée dans images.csv.
+
+Formats :
+- "png" : une image PNG par fichier (image_000001.png, ...). Le PNG est
+  codé ici avec zlib, qui libère le GIL pendant la compression ;
+  pygame.image.save le garde et bloquerait la boucle d'affichage ;
+- "raw" : pixels bruts dans video.raw, sans compression (le plus léger
+  pour la machine, le plus lourd pour le disque).
+
+La décimation garde une image sur N (30 images/s à partir de 60).
+
+Assemblage en vidéo, par exemple :
+    ffmpeg -framerate 30 -i image_%06d.png lecon.mp4
+    ffmpeg -f rawvideo -pixel_format bgra -video_size 1280x720 -framerate 30 -i video.raw lecon.mp4
+(format des pixels et taille dans video.json)
+"""
+
+import csv
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import pygame
+
+FORMATS = ("png", "raw")
+TAILLE_RESERVE = 8  # Tampons d'image : au-delà, les images sont perdues
+NIVEAU_PNG = 1  # Compression zlib rapide : la compression est l'étape la plus lente
+
+
+def format_pixels(surface):
+    """Ordre des octets de la surface pour pygame.image.frombuffer (ex. "BGRA"), ou None"""
+    if surface.get_bytesize() != 4 or surface.get_pitch() != surface.get_width() * 4:
+        return None
+    octets = ["A"] * 4
+    for lettre, decalage in zip("RGB", surface.get_shifts()[:3]):
+        octets[decalage // 8] = lettre
+    if sys.byteorder == "big":
+        octets.reverse()
+    ordre = "".join(octets)
+    return ordre if ordre in ("RGBA", "BGRA", "ARGB") else None
+
+
+def morceau_png(type_morceau, donnees):
+    return (struct.pack(">I", len(donnees)) + type_morceau + donnees
+            + struct.pack(">I", zlib.crc32(type_morceau + donnees)))
+
+
+def coder_png(rgb, largeur, hauteur, niveau=NIVEAU_PNG):
+    """PNG 8 bits RVB à partir de pixels RVB contigus (sans filtre de ligne)"""
+    ligne = largeur * 3
+    vue = memoryview(rgb)
+    lignes = b"".join(b"\0" + vue[y * ligne:(y + 1) * ligne] for y in range(hauteur))
+    return (b"\x89PNG\r\n\x1a\n"
+            + morceau_png(b"IHDR", struct.pack(">IIBBBBB", largeur, hauteur, 8, 2, 0, 0, 0))
+            + morceau_png(b"IDAT", zlib.compress(lignes, niveau))
+            + morceau_png(b"IEND", b""))
+
+
+class Capture:
+    """Capture des images présentées, écrites par un fil d'arrière-plan"""
+
+    def __init__(self, dossier, taille, format="png", decimation=1, taille_reserve=TAILLE_RESERVE):
+        if format not in FORMATS:
+            raise ValueError(f"format de capture inconnu : {format}")
+        os.makedirs(dossier, exist_ok=True)
+        self.dossier = dossier
+        self.format = format
+        self.taille = tuple(taille)
+        self.decimation = max(1, int(decimation))
+        self.pixels = None  # Ordre des octets, fixé à la première image
+        self.copie_directe = False  # Copie des octets de la surface, sans conversion
+
+        self.libres = queue.Queue()
+        for _ in range(taille_reserve):
+            self.libres.put(bytearray(self.taille[0] * self.taille[1] * 4))
+        self.a_ecrire = queue.Queue()
+
+        self.presentees = 0  # Images vues par capturer()
+        self.copiees = 0
+        self.perdues = 0  # Aucun tampon libre : écriture en retard
+        self.ecrites = 0
+        self.duree_ecriture = 0.0  # s, cumul sur le fil d'écriture
+        self.debut = time.perf_counter()
+
+        self.video = open(os.path.join(dossier, "video.raw"), "wb") if format == "raw" else None
+        self.horodatage = open(os.path.join(dossier, "images.csv"), "w", newline="")
+        self.csv = csv.writer(self.horodatage)
+        self.csv.writerow(("image", "temps_s"))
+        self.fil = threading.Thread(target=self._ecrire, name="capture", daemon=True)
+        self.fil.start()
+
+    def capturer(self, surface):
+        """Copie l'image (une fois par image, avant la présentation) ; ne bloque jamais"""
+        self.presentees += 1
+        if (self.presentees - 1) % self.decimation:
+            return
+        try:
+            tampon = self.libres.get_nowait()
+        except queue.Empty:
+            self.perdues += 1
+            return
+        if surface.get_size() != self.taille:
+            self.libres.put(tampon)
+            self.perdues += 1
+            return
+        if self.pixels is None:
+            self.pixels = format_pixels(surface)
+            self.copie_directe = self.pixels is not None
+            self.pixels = self.pixels or "RGBA"
+        if self.copie_directe:
+            pixels = surface.get_buffer()
+            tampon[:] = memoryview(pixels)
+            del pixels  # Déverrouille la surface
+        else:
+            tampon[:] = pygame.image.tobytes(surface, "RGBA")  # Format inhabituel : conversion
+        self.copiees += 1
+        self.a_ecrire.put((self.copiees, time.perf_counter() - self.debut, tampon))
+
+    def _ecrire(self):
+        largeur, hauteur = self.taille
+        while True:
+            element = self.a_ecrire.get()
+            if element is None:
+                break
+            numero, temps, tampon = element
+            debut = time.perf_counter()
+            if self.video is not None:
+                self.video.write(tampon)
+            else:
+                image = pygame.image.frombuffer(tampon, self.taille, self.pixels)
+                png = coder_png(pygame.image.tobytes(image, "RGB"), largeur, hauteur)
+                del image
+                with open(os.path.join(self.dossier, f"image_{numero:06}.png"), "wb") as f:
+                    f.write(png)
+            self.csv.writerow((numero, f"{temps:.4f}"))
+            self.ecrites += 1
+            self.duree_ecriture += time.perf_counter() - debut
+            self.libres.put(tampon)
+
+    def resume(self):
+        return {
+            "presentees": self.presentees,
+            "copiees": self.copiees,
+            "ecrites": self.ecrites,
+            "perdues": self.perdues,
+            "ecriture_ms": self.duree_ecriture / self.ecrites * 1000 if self.ecrites else 0.0,
+        }
+
+    def fermer(self):
+        """Termine l'écriture des images en attente et décrit la vidéo (video.json)"""
+        self.a_ecrire.put(None)
+        self.fil.join()
+        if self.video is not None:
+            self.video.close()
+        self.horodatage.close()
+        duree = time.perf_counter() - self.debut
+        with open(os.path.join(self.dossier, "video.json"), "w") as f:
+            json.dump({
+                "format": self.format,
+                "largeur": self.taille[0],
+                "hauteur": self.taille[1],
+                "pixels": (self.pixels or "RGBA").lower() if self.format == "raw" else "rgb24",
+                "images_par_s": round(self.copiees / duree, 2) if duree > 0 else 0.0,
+                **self.resume(),
+            }, f, indent=2)
+        return self.resume()
+
+
+def afficher_capture(resume, dossier, decimation=1):
+    print(f"Capture : {resume['ecrites']} images écrites dans {dossier} "
+          f"({resume['ecriture_ms']:.1f} ms par image sur le fil d'écriture)")
+    if decimation > 1:
+        print(f"  une image sur {decimation} gardée ({resume['presentees']} présentées)")
+    if resume["perdues"]:
+        print(f"  {resume['perdues']} images perdues : l'écriture ne suivait pas")
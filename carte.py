@@ -0,0 +1,365 @@
+"""
+Simulateur de Conduite - Permis B
+Cartes d'itinéraires : tracé, panneaux, carrefours et décor en blocs d'un fichier projeté en mémoire
+
+Un fichier .carte décrit un itinéraire de longueur quelconque en blocs de
+taille fixe (TAILLE_BLOC octets, un kilomètre de route par bloc) :
+- positions latérales et altitudes cumulées au début de chaque segment
+  (comme Route, plus le premier point du bloc suivant) ;
+- marquage au sol de chaque segment (carrefours compris) ;
+- objets posés le long de la route, triés par abscisse : arbres,
+  buissons, maisons, panneaux (type, paramètre, abscisse, côté).
+
+Le fichier est ouvert par mmap : l'ouverture ne lit que l'en-tête, quelle
+que soit la longueur de l'itinéraire. RouteCarte a la même interface que
+Route ; un bloc n'est décodé qu'au premier accès, les blocs suivants sont
+annoncés au système (MADV_WILLNEED) pour qu'il les lise d'avance, et au
+plus BLOCS_EN_MEMOIRE blocs restent décodés : les plus anciennement lus,
+c'est-à-dire ceux que la voiture a laissés derrière elle, sont libérés
+(et leurs pages rendues au système, MADV_DONTNEED). La mémoire occupée ne
+dépend donc pas de la longueur de l'itinéraire.
+
+Utilisation :
+    python carte.py creer itineraire.carte --km 200 --graine 3
+    python carte.py info itineraire.carte
+    python carte.py essai            # mémoire et ouverture, 2 km contre 200 km
+
+Ce module n'importe pas Pygame.
+"""
+
+import mmap
+import random
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+from route import LONGUEUR_SEGMENT, DISCONTINU, CONTINU, CARREFOUR
+
+SIGNATURE = b"CART"
+VERSION = 1
+TAILLE_BLOC = 8192  # Octets, multiple de la taille de page
+SEGMENTS_PAR_BLOC = 200  # 1 km de route par bloc
+OBJETS_PAR_BLOC = 256
+BLOCS_EN_MEMOIRE = 4  # Blocs décodés gardés (bloc courant, voisins, rétroviseurs)
+BLOCS_ANTICIPES = 2  # Blocs annoncés au système devant le dernier bloc lu
+
+# Signature, version, segments par bloc, objets par bloc, nombre de segments,
+# nombre de blocs, longueur d'un segment (m), position latérale et altitude finales
+EN_TETE = struct.Struct("<4sHHHIIddd")
+NOMBRE_OBJETS = struct.Struct("<H")
+OBJET = struct.Struct("<BBhff")  # Type, paramètre, réservé, abscisse dans le bloc (m), côté (m)
+
+# Types d'objets
+ARBRE = 1
+BUISSON = 2
+MAISON = 3
+PANNEAU_LIMITATION = 10  # Paramètre : vitesse en km/h / 10
+PANNEAU_CEDER = 11  # Cédez le passage avant un carrefour
+PANNEAU_STOP = 12
+PANNEAUX = (PANNEAU_LIMITATION, PANNEAU_CEDER, PANNEAU_STOP)
+
+# Disposition d'un bloc : x et h (float64, SEGMENTS_PAR_BLOC + 1 points), marquages (int8),
+# nombre d'objets, objets
+_OCTETS_POINTS = 8 * (SEGMENTS_PAR_BLOC + 1)
+_DEBUT_MARQUAGES = 2 * _OCTETS_POINTS
+_DEBUT_OBJETS = _DEBUT_MARQUAGES + SEGMENTS_PAR_BLOC
+assert _DEBUT_OBJETS + NOMBRE_OBJETS.size + OBJETS_PAR_BLOC * OBJET.size <= TAILLE_BLOC
+
+
+class Bloc:
+    """Un kilomètre de carte décodé : tracé, marquages et objets (abscisses absolues)"""
+
+    __slots__ = ("x", "h", "marquages", "s_objets", "objets")
+
+    def __init__(self, donnees, debut_s):
+        self.x = array("d")
+        self.x.frombytes(donnees[:_OCTETS_POINTS])
+        self.h = array("d")
+        self.h.frombytes(donnees[_OCTETS_POINTS:_DEBUT_MARQUAGES])
+        if sys.byteorder == "big":
+            self.x.byteswap()
+            self.h.byteswap()
+        self.marquages = array("b", donnees[_DEBUT_MARQUAGES:_DEBUT_OBJETS])
+        nombre, = NOMBRE_OBJETS.unpack_from(donnees, _DEBUT_OBJETS)
+        self.objets = [
+            (debut_s + s, type_objet, parametre, cote)
+            for type_objet, parametre, _, s, cote in OBJET.iter_unpack(
+                donnees[_DEBUT_OBJETS + NOMBRE_OBJETS.size:
+                        _DEBUT_OBJETS + NOMBRE_OBJETS.size + nombre * OBJET.size])
+        ]
+        self.s_objets = [objet[0] for objet in self.objets]
+
+
+class RouteCarte:
+    """Itinéraire lu dans un fichier .carte, avec la même interface que route.Route"""
+
+    def __init__(self, chemin, blocs_en_memoire=BLOCS_EN_MEMOIRE):
+        self.chemin = chemin
+        with open(chemin, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mm) < TAILLE_BLOC:
+            raise ValueError(f"{chemin} : carte tronquée")
+        (signature, version, segments_par_bloc, objets_par_bloc, self.n, self.nombre_blocs,
+         self.longueur_segment, self.x_fin, self.h_fin) = EN_TETE.unpack_from(self.mm)
+        if signature != SIGNATURE or version != VERSION or segments_par_bloc != SEGMENTS_PAR_BLOC:
+            raise ValueError(f"{chemin} : carte non reconnue")
+        if len(self.mm) < TAILLE_BLOC * (1 + self.nombre_blocs):
+            raise ValueError(f"{chemin} : carte tronquée")
+        self.longueur = self.n * self.longueur_segment
+        self.longueur_bloc = SEGMENTS_PAR_BLOC * self.longueur_segment
+        self.blocs_en_memoire = max(blocs_en_memoire, 2)
+        self.blocs = OrderedDict()  # indice -> Bloc, du plus anciennement lu au plus récent
+        self.lectures = 0  # Blocs décodés depuis l'ouverture
+
+    def _bloc(self, b):
+        """Bloc b décodé, lu dans le fichier au premier accès"""
+        bloc = self.blocs.get(b)
+        if bloc is not None:
+            self.blocs.move_to_end(b)
+            return bloc
+        debut = TAILLE_BLOC * (1 + b)
+        bloc = self.blocs[b] = Bloc(self.mm[debut:debut + TAILLE_BLOC], b * self.longueur_bloc)
+        self.lectures += 1
+        if hasattr(self.mm, "madvise"):
+            suivant = TAILLE_BLOC * (2 + b)
+            anticipe = min(BLOCS_ANTICIPES, self.nombre_blocs - 1 - b) * TAILLE_BLOC
+            if anticipe > 0:
+                self.mm.madvise(mmap.MADV_WILLNEED, suivant, anticipe)
+        while len(self.blocs) > self.blocs_en_memoire:
+            ancien, _ = self.blocs.popitem(last=False)
+            if hasattr(self.mm, "madvise"):
+                self.mm.madvise(mmap.MADV_DONTNEED, TAILLE_BLOC * (1 + ancien), TAILLE_BLOC)
+        return bloc
+
+    def _segment(self, s):
+        """(bloc, indice du segment dans le bloc, fraction, tours) à l'abscisse s"""
+        tours, s = divmod(s, self.longueur)
+        u = s / self.longueur_segment
+        i = min(int(u), self.n - 1)
+        b, j = divmod(i, SEGMENTS_PAR_BLOC)
+        return self._bloc(b), j, u - i, tours
+
+    def echantillonner(self, s):
+        """Position latérale et altitude à l'abscisse s (m), la route bouclant sur elle-même"""
+        bloc, j, f, tours = self._segment(s)
+        x, h = bloc.x, bloc.h
+        return (x[j] + (x[j + 1] - x[j]) * f + tours * self.x_fin,
+                h[j] + (h[j + 1] - h[j]) * f + tours * self.h_fin)
+
+    def cap(self, s):
+        """Pente latérale du tracé à l'abscisse s"""
+        bloc, j, _, _ = self._segment(s)
+        return (bloc.x[j + 1] - bloc.x[j]) / self.longueur_segment
+
+    def marquage(self, s):
+        bloc, j, _, _ = self._segment(s)
+        return bloc.marquages[j]
+
+    def objets_entre(self, s_min, s_max):
+        """Objets (s, type, paramètre, côté) d'abscisse dans [s_min, s_max[, dans l'ordre de s
+
+        Les abscisses renvoyées suivent s_min : après un tour de boucle, elles
+        continuent au-delà de la longueur de l'itinéraire.
+        """
+        L = self.longueur
+        tours, a = divmod(s_min, L)
+        b = a + min(s_max - s_min, L)
+        decalage = tours * L
+        resultat = []
+        while a < b:
+            fin = min(b, L)
+            for k in range(int(a / self.longueur_bloc),
+                           min(int(fin / self.longueur_bloc), self.nombre_blocs - 1) + 1):
+                bloc = self._bloc(k)
+                i = bisect_left(bloc.s_objets, a)
+                j = bisect_left(bloc.s_objets, fin)
+                resultat.extend((s + decalage, type_objet, parametre, cote)
+                                for s, type_objet, parametre, cote in bloc.objets[i:j])
+            a, b, decalage = 0.0, b - L, decalage + L  # Suite après un tour de boucle
+        return resultat
+
+    def fermer(self):
+        self.blocs.clear()
+        self.mm.close()
+
+
+# Écriture
+def ecrire_carte(chemin, courbures, pentes, marquages, objets,
+                 longueur_segment=LONGUEUR_SEGMENT):
+    """Intègre le tracé (comme Route) et l'écrit bloc par bloc avec les objets (s, type, param, côté)"""
+    n = len(courbures)
+    nombre_blocs = -(-n // SEGMENTS_PAR_BLOC)
+    longueur_bloc = SEGMENTS_PAR_BLOC * longueur_segment
+    objets = sorted(objets)
+    par_bloc = [[] for _ in range(nombre_blocs)]
+    for objet in objets:
+        b = min(int(objet[0] / longueur_bloc), nombre_blocs - 1)
+        if len(par_bloc[b]) < OBJETS_PAR_BLOC:
+            par_bloc[b].append(objet)
+
+    with open(chemin, "wb") as f:
+        en_tete = bytearray(TAILLE_BLOC)
+        f.write(en_tete)  # Réécrit à la fin, avec le tracé final
+        x = h = cap = 0.0
+        i = 0
+        for b in range(nombre_blocs):
+            xs = array("d", [x])
+            hs = array("d", [h])
+            fin = min(i + SEGMENTS_PAR_BLOC, n)
+            marquages_bloc = array("b", marquages[i:fin])
+            for k in range(i, fin):
+                cap += courbures[k] * longueur_segment
+                x += cap * longueur_segment
+                h += pentes[k] * longueur_segment
+                xs.append(x)
+                hs.append(h)
+            while len(xs) < SEGMENTS_PAR_BLOC + 1:  # Dernier bloc incomplet
+                xs.append(x)
+                hs.append(h)
+                marquages_bloc.append(DISCONTINU)
+            i = fin
+            if sys.byteorder == "big":
+                xs.byteswap()
+                hs.byteswap()
+
+            donnees = bytearray(TAILLE_BLOC)
+            donnees[:_OCTETS_POINTS] = xs.tobytes()
+            donnees[_OCTETS_POINTS:_DEBUT_MARQUAGES] = hs.tobytes()
+            donnees[_DEBUT_MARQUAGES:_DEBUT_OBJETS] = marquages_bloc.tobytes()
+            NOMBRE_OBJETS.pack_into(donnees, _DEBUT_OBJETS, len(par_bloc[b]))
+            for k, (s, type_objet, parametre, cote) in enumerate(par_bloc[b]):
+                OBJET.pack_into(donnees, _DEBUT_OBJETS + NOMBRE_OBJETS.size + k * OBJET.size,
+                                type_objet, parametre, 0, s - b * longueur_bloc, cote)
+            f.write(donnees)
+
+        EN_TETE.pack_into(en_tete, 0, SIGNATURE, VERSION, SEGMENTS_PAR_BLOC, OBJETS_PAR_BLOC,
+                          n, nombre_blocs, longueur_segment, x, h)
+        f.seek(0)
+        f.write(en_tete)
+
+
+def itineraire_aleatoire(longueur_km=20.0, graine=0, longueur_segment=LONGUEUR_SEGMENT):
+    """Tracé de route_sinueuse, avec panneaux aux carrefours, limitations et décor
+
+    Renvoie (courbures, pentes, marquages, objets).
+    """
+    rng = random.Random(graine)
+    courbures, pentes, marquages, objets = [], [], [], []
+
+    def section(longueur, courbure, pente, marquage):
+        nombre = max(1, int(round(longueur / longueur_segment)))
+        courbures.extend([courbure] * nombre)
+        pentes.extend([pente] * nombre)
+        marquages.extend([marquage] * nombre)
+
+    section(100, 0.0, 0.0, DISCONTINU)
+    while len(courbures) * longueur_segment < longueur_km * 1000:
+        longueur = rng.choice((60, 100, 150))
+        rayon = rng.uniform(150, 1000)
+        courbure = rng.choice((-1, 1)) / rayon
+        marquage = CONTINU if rayon < 300 else DISCONTINU
+        pente = rng.choice((0.0, 0.0, 0.04, -0.04, 0.07))
+        if rayon < 300 and rng.random() < 0.5:
+            # Virage serré : limitation à 50 ou 70 km/h avant d'y entrer
+            s = len(courbures) * longueur_segment - 50
+            objets.append((max(s, 0.0), PANNEAU_LIMITATION, rng.choice((5, 7)), 5.0))
+        section(longueur, courbure, pente, marquage)
+        section(longueur, -courbure, -pente, marquage)
+        section(rng.choice((50, 150, 300)), 0.0, 0.0, DISCONTINU)
+        if rng.random() < 0.3:
+            s = len(courbures) * longueur_segment
+            objets.append((max(s - 30, 0.0), rng.choice((PANNEAU_CEDER, PANNEAU_STOP)), 0, 5.0))
+            objets.append((s + 40, PANNEAU_LIMITATION, 9, 5.0))  # Fin de la zone du carrefour
+            section(10, 0.0, 0.0, CARREFOUR)
+            if rng.random() < 0.5:
+                objets.append((s + rng.uniform(-20, 30), MAISON, rng.randrange(4),
+                               rng.choice((-1, 1)) * rng.uniform(12, 20)))
+
+    # Décor : arbres et buissons des deux côtés, en bosquets plus ou moins denses
+    longueur = len(courbures) * longueur_segment
+    s = 0.0
+    while s < longueur:
+        densite = rng.choice((0.0, 0.3, 1.0, 1.0, 2.0))  # Objets tous les 20 m en moyenne
+        fin = min(s + rng.uniform(200, 600), longueur)
+        while s < fin:
+            if rng.random() < densite * 0.5:
+                type_objet = ARBRE if rng.random() < 0.7 else BUISSON
+                objets.append((s, type_objet, rng.randrange(4),
+                               rng.choice((-1, 1)) * rng.uniform(6, 30)))
+            s += rng.uniform(5, 15)
+    return courbures, pentes, marquages, objets
+
+
+def creer_carte(chemin, longueur_km=20.0, graine=0):
+    ecrire_carte(chemin, *itineraire_aleatoire(longueur_km, graine))
+
+
+def ouvrir_carte(chemin):
+    return RouteCarte(chemin)
+
+
+def parcourir(route, pas=5.0, portee=300.0):
+    """Parcourt tout l'itinéraire comme la caméra : tracé tous les `pas` m, objets visibles
+
+    Renvoie (échantillons, pic de mémoire Python en octets, blocs décodés).
+    """
+    import tracemalloc
+
+    tracemalloc.start()
+    echantillons = 0
+    s = 0.0
+    while s < route.longueur:
+        route.echantillonner(s)
+        route.echantillonner(s - 100)  # Rétroviseurs
+        route.objets_entre(s, s + portee)
+        echantillons += 1
+        s += pas
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return echantillons, pic, route.lectures
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import tempfile
+    import time
+
+    parser = argparse.ArgumentParser(description="Cartes d'itinéraires en blocs")
+    sous = parser.add_subparsers(dest="commande", required=True)
+    p = sous.add_parser("creer", help="générer un itinéraire aléatoire")
+    p.add_argument("fichier")
+    p.add_argument("--km", type=float, default=20.0)
+    p.add_argument("--graine", type=int, default=0)
+    p = sous.add_parser("info", help="décrire une carte")
+    p.add_argument("fichier")
+    sous.add_parser("essai", help="ouverture et mémoire : 2 km contre 200 km")
+    args = parser.parse_args()
+
+    if args.commande == "creer":
+        creer_carte(args.fichier, args.km, args.graine)
+        print(f"{args.fichier} : {os.path.getsize(args.fichier) // 1024} Kio")
+    elif args.commande == "info":
+        route = ouvrir_carte(args.fichier)
+        objets = route.objets_entre(0.0, route.longueur)
+        panneaux = sum(1 for o in objets if o[1] in PANNEAUX)
+        print(f"{route.longueur / 1000:.1f} km, {route.nombre_blocs} blocs de "
+              f"{TAILLE_BLOC // 1024} Kio, {len(objets)} objets dont {panneaux} panneaux")
+        route.fermer()
+    else:
+        with tempfile.TemporaryDirectory() as dossier:
+            for km in (2, 200):
+                chemin = os.path.join(dossier, f"{km}.carte")
+                creer_carte(chemin, km)
+                debut = time.perf_counter()
+                route = ouvrir_carte(chemin)
+                ouverture = time.perf_counter() - debut
+                debut = time.perf_counter()
+                echantillons, pic, lectures = parcourir(route)
+                duree = time.perf_counter() - debut
+                print(f"{km:>4} km : ouverture {ouverture * 1e6:.0f} µs, "
+                      f"pic mémoire {pic / 1024:.0f} Kio, {len(route.blocs)} blocs en mémoire, "
+                      f"{lectures} lectures, {duree / echantillons * 1e6:.1f} µs par position")
+                route.fermer()
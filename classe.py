@@ -0,0 +1,283 @@
+"""
+Simulateur de Conduite - Permis B
+Salle de classe : état des postes en direct pour le moniteur
+
+Chaque poste (simulateur.py --classe HOTE:PORT) envoie au concentrateur,
+quelques fois par seconde, les grandeurs qui ont changé depuis le dernier
+envoi (vitesse, régime, rapport, pédales, calages, étape du tutoriel),
+une ligne JSON par envoi. L'envoi tourne dans une boucle asyncio sur un
+fil à part : la boucle d'affichage ne fait que déposer le dernier état.
+Si le concentrateur ne suit pas, les envois sont sautés (le suivant
+contiendra tous les changements) plutôt que mis en file.
+
+Le concentrateur agrège les postes et sert une vue d'ensemble en HTTP.
+Les lignes reçues sont limitées en taille, chaque connexion a donc une
+mémoire bornée.
+
+Utilisation :
+    python classe.py concentrateur --port 8765 --http 8766
+    python classe.py charge --postes 150 --duree 10   # essai local complet
+"""
+
+import asyncio
+import html
+import json
+import threading
+import time
+
+# Champs envoyés (clé courte) : vitesse, régime, rapport, embrayage, frein,
+# accélérateur, calé, nombre de calages, étape du tutoriel, moteur démarré
+CHAMPS = ("v", "r", "g", "e", "f", "a", "c", "n", "t", "m")
+
+LIMITE_LIGNE = 1024  # Octets par ligne reçue (mémoire bornée par connexion)
+LIMITE_ENVOI = 16 * 1024  # Au-delà, le poste saute ses envois
+INACTIF = 5.0  # s sans nouvelles avant qu'un poste soit signalé
+
+
+def etat_voiture(voiture, tutoriel, calages):
+    """État arrondi (les petites variations ne déclenchent pas d'envoi)"""
+    return (
+        round(voiture.vitesse_actuelle, 1), int(voiture.regime_moteur), voiture.vitesse_engagee,
+        round(voiture.embrayage, 2), round(voiture.frein, 2), round(voiture.accelerateur, 2),
+        voiture.cale, calages, tutoriel.etape + 1, voiture.moteur_demarre,
+    )
+
+
+async def emettre(hote, port, nom, source, frequence, arret):
+    """Envoie les changements de source() au concentrateur, en se reconnectant au besoin"""
+    periode = 1.0 / frequence
+    attente = 0.5
+    while not arret.is_set():
+        try:
+            _, writer = await asyncio.open_connection(hote, port)
+        except OSError:
+            await asyncio.sleep(attente)
+            attente = min(attente * 2, 5.0)
+            continue
+        attente = 0.5
+        envoye = {}
+        try:
+            writer.write(json.dumps({"poste": nom}).encode() + b"\n")
+            while not arret.is_set() and not writer.is_closing():
+                await asyncio.sleep(periode)
+                etat = source()
+                if etat is None:
+                    continue
+                delta = {k: x for k, x in zip(CHAMPS, etat) if envoye.get(k, ()) != x}
+                if not delta or writer.transport.get_write_buffer_size() > LIMITE_ENVOI:
+                    continue
+                writer.write(json.dumps(delta, separators=(",", ":")).encode() + b"\n")
+                envoye.update(delta)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+
+class PosteClasse:
+    """Client du poste : boucle asyncio sur un fil d'arrière-plan"""
+
+    def __init__(self, hote, port, nom, frequence=10.0):
+        self.etat = None  # Dernier état déposé par la boucle principale
+        self.calages = 0
+        self.cale = False
+        self.arret = threading.Event()
+        self.fil = threading.Thread(
+            target=asyncio.run,
+            args=(emettre(hote, port, nom, lambda: self.etat, frequence, self.arret),),
+            name="classe", daemon=True,
+        )
+        self.fil.start()
+
+    def publier(self, voiture, tutoriel):
+        """Dépose l'état courant (appelé une fois par image, sans attente)"""
+        if voiture.cale and not self.cale:
+            self.calages += 1
+        self.cale = voiture.cale
+        self.etat = etat_voiture(voiture, tutoriel, self.calages)
+
+    def fermer(self):
+        self.arret.set()
+        self.fil.join(timeout=1.0)
+
+
+class Concentrateur:
+    """Reçoit les postes et tient à jour leur dernier état"""
+
+    def __init__(self):
+        self.postes = {}  # nom -> état (clés de CHAMPS + "connecte", "maj")
+        self.messages = 0
+
+    async def gerer_poste(self, reader, writer):
+        etat = None
+        try:
+            bonjour = json.loads(await asyncio.wait_for(reader.readline(), INACTIF))
+            nom = str(bonjour["poste"])[:40]
+            etat = self.postes[nom] = {"connecte": True, "maj": time.monotonic()}
+            while True:
+                ligne = await reader.readline()
+                if not ligne:
+                    break
+                delta = json.loads(ligne)
+                etat.update((k, delta[k]) for k in CHAMPS if k in delta)
+                etat["maj"] = time.monotonic()
+                self.messages += 1
+        except (ValueError, KeyError, TypeError, asyncio.TimeoutError, ConnectionError):
+            pass  # Ligne trop longue ou invalide, poste muet : on coupe
+        finally:
+            if etat is not None:
+                etat["connecte"] = False
+            writer.close()
+
+    def vue_ensemble(self):
+        """Postes triés par nom, avec leur ancienneté"""
+        maintenant = time.monotonic()
+        return {
+            nom: {**{k: x for k, x in etat.items() if k != "maj"},
+                  "age": round(maintenant - etat["maj"], 1)}
+            for nom, etat in sorted(self.postes.items())
+        }
+
+    def page_html(self):
+        lignes = []
+        for nom, e in self.vue_ensemble().items():
+            alerte = e.get("c") or not e["connecte"] or e["age"] > INACTIF
+            lignes.append(
+                f"<tr{' class=alerte' if alerte else ''}><td>{html.escape(nom)}</td>"
+                f"<td>{e.get('v', '')}</td><td>{e.get('r', '')}</td><td>{e.get('g', '')}</td>"
+                f"<td>{e.get('e', '')} / {e.get('f', '')} / {e.get('a', '')}</td>"
+                f"<td>{'oui' if e.get('c') else ''}</td><td>{e.get('n', 0)}</td>"
+                f"<td>{e.get('t', '')}</td><td>{'' if e['connecte'] else 'déconnecté'}</td></tr>"
+            )
+        return (
+            "<!doctype html><meta charset=utf-8><meta http-equiv=refresh content=1>"
+            "<title>Salle de classe</title><style>body{font-family:sans-serif}"
+            "td,th{padding:2px 8px;text-align:right}.alerte{background:#fcc}</style>"
+            f"<h1>Salle de classe : {len(self.postes)} postes</h1><table>"
+            "<tr><th>Poste</th><th>km/h</th><th>tr/min</th><th>Rapport</th>"
+            "<th>Emb. / Frein / Accél.</th><th>Calé</th><th>Calages</th><th>Étape</th><th></th></tr>"
+            + "".join(lignes) + "</table>"
+        )
+
+    async def gerer_http(self, reader, writer):
+        """Vue d'ensemble : / (page HTML rafraîchie chaque seconde) ou /etat (JSON)"""
+        try:
+            requete = await asyncio.wait_for(reader.readline(), INACTIF)
+            while (await asyncio.wait_for(reader.readline(), INACTIF)).strip():
+                pass  # En-têtes ignorés
+            chemin = requete.split()[1].decode() if len(requete.split()) > 1 else "/"
+            if chemin == "/etat":
+                corps = json.dumps(self.vue_ensemble(), ensure_ascii=False).encode()
+                type_contenu = "application/json"
+            else:
+                corps = self.page_html().encode()
+                type_contenu = "text/html; charset=utf-8"
+            writer.write(
+                f"HTTP/1.0 200 OK\r\nContent-Type: {type_contenu}\r\n"
+                f"Content-Length: {len(corps)}\r\nConnection: close\r\n\r\n".encode() + corps
+            )
+            await asyncio.wait_for(writer.drain(), INACTIF)
+        except (ValueError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def demarrer(self, hote="127.0.0.1", port=8765, port_http=8766):
+        serveur = await asyncio.start_server(self.gerer_poste, hote, port, limit=LIMITE_LIGNE)
+        serveur_http = await asyncio.start_server(self.gerer_http, hote, port_http,
+                                                  limit=LIMITE_LIGNE)
+        return serveur, serveur_http
+
+
+# Essai de charge : concentrateur et postes simulés dans le même processus
+async def poste_simule(hote, port, nom, frequence, arret):
+    from simulation import Voiture, Tutoriel, Ordonnanceur, scenario_demarrage
+
+    voiture = Voiture()
+    tutoriel = Tutoriel()
+    ordonnanceur = Ordonnanceur(voiture)
+    voiture.embrayage = 4
+    voiture.demarrer_moteur()
+    voiture.changer_vitesse(1)
+    voiture.frein_main = False
+    debut = time.monotonic()
+
+    def source():
+        t = time.monotonic() - debut
+        scenario_demarrage(voiture, t % 20)  # Un démarrage toutes les 20 s
+        ordonnanceur.avancer(1.0 / frequence)
+        return etat_voiture(voiture, tutoriel, 0)
+
+    await emettre(hote, port, nom, source, frequence, arret)
+
+
+async def essai_charge(postes=150, duree=10.0, frequence=10.0, port=8765, port_http=8766):
+    concentrateur = Concentrateur()
+    serveurs = await concentrateur.demarrer("127.0.0.1", port, port_http)
+    arret = asyncio.Event()
+    taches = [
+        asyncio.create_task(poste_simule("127.0.0.1", port, f"poste{i:03}", frequence, arret))
+        for i in range(postes)
+    ]
+    await asyncio.sleep(1.0)
+    messages = concentrateur.messages
+    debut = time.perf_counter()
+    await asyncio.sleep(duree)
+    ecoule = time.perf_counter() - debut
+    recus = concentrateur.messages - messages
+
+    # Vue d'ensemble lue comme le ferait le navigateur du moniteur
+    reader, writer = await asyncio.open_connection("127.0.0.1", port_http)
+    writer.write(b"GET /etat HTTP/1.0\r\n\r\n")
+    reponse = await reader.read()
+    writer.close()
+    vue = json.loads(reponse.split(b"\r\n\r\n", 1)[1])
+
+    arret.set()
+    await asyncio.gather(*taches)
+    for serveur in serveurs:
+        serveur.close()
+    connectes = sum(1 for e in vue.values() if e["connecte"] and e["age"] < INACTIF)
+    return {
+        "postes": postes,
+        "connectes": connectes,
+        "messages_par_s": recus / ecoule,
+        "attendus_par_s": postes * frequence,
+    }
+
+
+async def servir(hote, port, port_http):
+    concentrateur = Concentrateur()
+    serveurs = await concentrateur.demarrer(hote, port, port_http)
+    print(f"Concentrateur : postes sur {hote}:{port}, vue d'ensemble sur http://{hote}:{port_http}/")
+    async with serveurs[0], serveurs[1]:
+        await asyncio.gather(serveurs[0].serve_forever(), serveurs[1].serve_forever())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Salle de classe : concentrateur des postes")
+    sous = parser.add_subparsers(dest="commande", required=True)
+    p = sous.add_parser("concentrateur", help="recevoir les postes et servir la vue d'ensemble")
+    p.add_argument("--hote", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--http", type=int, default=8766)
+    p = sous.add_parser("charge", help="essai local avec des postes simulés")
+    p.add_argument("--postes", type=int, default=150)
+    p.add_argument("--duree", type=float, default=10.0)
+    p.add_argument("--frequence", type=float, default=10.0, help="envois par seconde et par poste")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--http", type=int, default=8766)
+    args = parser.parse_args()
+
+    if args.commande == "concentrateur":
+        try:
+            asyncio.run(servir(args.hote, args.port, args.http))
+        except KeyboardInterrupt:
+            pass
+    else:
+        r = asyncio.run(essai_charge(args.postes, args.duree, args.frequence, args.port, args.http))
+        print(f"{r['connectes']}/{r['postes']} postes à jour, "
+              f"{r['messages_par_s']:.0f} messages/s reçus "
+              f"(au plus {r['attendus_par_s']:.0f}/s : seuls les changements sont envoyés)")
@@ -0,0 +1,119 @@
+"""
+Simulateur de Conduite - Permis B
+Correction par lots des séances enregistrées
+
+Chaque séance (.simc) est rejouée sans affichage dans Voiture et Tutoriel,
+et notée : relevés de l'examen (voir examen.py) et durée de chaque étape
+du tutoriel. Les fichiers sont répartis par lots entre plusieurs
+processus ; chaque résultat est écrit (une ligne JSON par séance) dès que
+son lot est terminé.
+
+Utilisation :
+    python correction.py seances/ --processus 8 --sortie notes.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from enregistrement import rejouer
+from examen import Examen
+
+
+class Notation(Examen):
+    """Relevés de l'examen, plus la durée de chaque étape du tutoriel"""
+
+    __slots__ = ("etape", "tick_etape", "ticks_etapes")
+
+    def __init__(self):
+        super().__init__()
+        self.etape = 0
+        self.tick_etape = 0
+        self.ticks_etapes = []  # Pas passés dans chaque étape terminée
+
+    def __call__(self, tick, voiture, tutoriel):
+        Examen.__call__(self, tick, voiture)
+        while self.etape < tutoriel.etape:
+            self.ticks_etapes.append(tick - self.tick_etape)
+            self.tick_etape = tick
+            self.etape += 1
+
+
+def corriger_seance(chemin):
+    """Rejoue une séance et renvoie ses mesures (dictionnaire sérialisable en JSON)"""
+    notation = Notation()
+    try:
+        voiture, tutoriel, mesures = rejouer(chemin, notation)
+    except (OSError, ValueError) as erreur:
+        return {"fichier": chemin, "erreur": str(erreur)}
+
+    frequence = mesures["pas"] / mesures["duree_seance_s"] if mesures["pas"] else 1.0
+    return {
+        "fichier": chemin,
+        **notation.resultats(frequence),
+        "etape_atteinte": tutoriel.etape + 1,
+        "durees_etapes_s": [round(n / frequence, 3) for n in notation.ticks_etapes],
+        "hors_plage_regime_s": round(
+            (notation.ticks_surregime + notation.ticks_sous_regime) / frequence, 3),
+        "relecture_s": round(mesures["duree_relecture_s"], 4),
+    }
+
+
+def corriger_lot(chemins):
+    """Tâche d'un processus : un lot de séances corrigées à la suite"""
+    return [corriger_seance(chemin) for chemin in chemins]
+
+
+def lister_seances(entrees):
+    """Fichiers .simc donnés directement ou contenus dans des dossiers"""
+    chemins = []
+    for entree in entrees:
+        if os.path.isdir(entree):
+            for dossier, _, fichiers in os.walk(entree):
+                chemins += [os.path.join(dossier, f) for f in fichiers if f.endswith(".simc")]
+        else:
+            chemins.append(entree)
+    return sorted(chemins)
+
+
+def corriger(chemins, processus=None, taille_lot=8):
+    """Générateur des résultats, dans l'ordre où les lots se terminent"""
+    lots = [chemins[i:i + taille_lot] for i in range(0, len(chemins), taille_lot)]
+    with ProcessPoolExecutor(max_workers=processus) as executeur:
+        taches = [executeur.submit(corriger_lot, lot) for lot in lots]
+        for tache in as_completed(taches):
+            yield from tache.result()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Correction par lots des séances enregistrées")
+    parser.add_argument("entrees", nargs="+", help="fichiers .simc ou dossiers")
+    parser.add_argument("--processus", type=int, default=os.cpu_count(),
+                        help="nombre de processus (par défaut : un par cœur)")
+    parser.add_argument("--lot", type=int, default=8, help="séances par tâche")
+    parser.add_argument("--sortie", metavar="FICHIER", help="écrire les résultats (JSON lignes)")
+    args = parser.parse_args()
+
+    chemins = lister_seances(args.entrees)
+    sortie = open(args.sortie, "w", encoding="utf-8") if args.sortie else sys.stdout
+    debut = time.perf_counter()
+    nombre = erreurs = 0
+    duree_totale = 0.0
+    try:
+        for resultat in corriger(chemins, args.processus, args.lot):
+            sortie.write(json.dumps(resultat, ensure_ascii=False) + "\n")
+            sortie.flush()
+            nombre += 1
+            erreurs += "erreur" in resultat
+            duree_totale += resultat.get("duree_s", 0.0)
+    finally:
+        if sortie is not sys.stdout:
+            sortie.close()
+    ecoule = time.perf_counter() - debut
+
+    print(f"{nombre} séances ({erreurs} illisibles, {duree_totale / 3600:.1f} h de conduite) "
+          f"corrigées en {ecoule:.1f} s : {nombre / ecoule if ecoule else 0:.1f} séances/s "
+          f"sur {args.processus} processus", file=sys.stderr)
@@ -0,0 +1,336 @@
+"""
+Simulateur de Conduite - Permis B
+Enregistrement binaire compact des entrées et relecture des séances
+
+Le fichier commence par un en-tête (signature, version, fréquence de la
+physique, puis nom du profil de voiture précédé de sa longueur sur un
+octet) suivi de mots de 16 bits (petit-boutiste), ajoutés au fil de la
+séance :
+- 00pp pppp pppp pppp : nouvel état des pédales (embrayage, frein,
+  accélérateur sur 3 bits chacun, direction + 1 sur 2 bits)
+- 01nn nnnn nnnn nnnn : n pas de physique avec l'état courant
+- 10.. .... cccc cccc : événement discret de code c (voir simulation.py)
+- 11kk vvvv vvvv vvvv : pédale analogique k (embrayage, frein,
+  accélérateur, direction) à la valeur quantifiée v (0-4095, direction
+  centrée sur 2048)
+
+Un état des pédales n'est écrit que lorsqu'il change et les pas sont
+comptés par séries : une leçon de 30 minutes tient en quelques Ko. Les
+niveaux entiers (clavier) passent toujours par le mot des pédales, exact ;
+le mot analogique ne sert qu'aux valeurs fractionnaires, déjà quantifiées
+sur 12 bits par entrees.py : la relecture retrouve les mêmes valeurs.
+La voiture part au centre de sa voie (CENTRE_VOIE) ; les séances des
+versions 1 à 3, conduites depuis la ligne médiane, sont rejouées depuis
+celle-ci.
+
+Relecture sans affichage :
+    python enregistrement.py seance.simc
+Vérification enregistrement -> relecture (clavier et analogique mêlés) :
+    python enregistrement.py --verifier --voiture 208_diesel
+"""
+
+import struct
+import sys
+import time
+from array import array
+
+from retour import TamponRetour
+from simulation import (
+    CENTRE_VOIE, Voiture, Tutoriel, Ordonnanceur, FREQUENCE_PHYSIQUE,
+    EVT_MOTEUR, EVT_ESPACE, EVT_VITESSE, appliquer_evenement,
+    niveau_analogique, direction_analogique, quantifier_pedale, quantifier_direction,
+)
+
+SIGNATURE = b"SIMC"
+VERSION = 4  # Version 1 : sans profil de voiture, 2 : sans pédales analogiques,
+# 3 : départ sur la ligne médiane (position_laterale 0) et non au centre de la voie
+EN_TETE = struct.Struct("<4sHH")  # Signature, version, fréquence (Hz)
+
+TYPE_PEDALES = 0x0000
+TYPE_TICKS = 0x4000
+TYPE_EVENEMENT = 0x8000
+TYPE_ANALOGIQUE = 0xC000
+MASQUE_TYPE = 0xC000
+TICKS_MAX = 0x3FFF
+
+CANAUX_ANALOGIQUES = ("embrayage", "frein", "accelerateur", "direction")
+
+
+def coder_pedales(voiture):
+    return (
+        int(voiture.embrayage)
+        | (int(voiture.frein) << 3)
+        | (int(voiture.accelerateur) << 6)
+        | ((int(voiture.direction) + 1) << 9)
+    )
+
+
+def decoder_pedales(mot, voiture):
+    voiture.embrayage = mot & 7
+    voiture.frein = (mot >> 3) & 7
+    voiture.accelerateur = (mot >> 6) & 7
+    voiture.direction = ((mot >> 9) & 3) - 1
+
+
+def coder_analogique(canal, valeur):
+    q = quantifier_direction(valeur) if canal == 3 else quantifier_pedale(valeur / 4)
+    return TYPE_ANALOGIQUE | (canal << 12) | q
+
+
+def decoder_analogique(mot, voiture):
+    canal = (mot >> 12) & 3
+    q = mot & 0xFFF
+    valeur = direction_analogique(q) if canal == 3 else niveau_analogique(q)
+    setattr(voiture, CANAUX_ANALOGIQUES[canal], valeur)
+
+
+class Enregistreur:
+    """Ajoute les entrées d'une séance à un fichier binaire"""
+
+    def __init__(self, chemin, frequence, profil=None, taille_tampon=4096):
+        nom = (profil or "").encode("utf-8")
+        self.fichier = open(chemin, "wb")
+        self.fichier.write(EN_TETE.pack(SIGNATURE, VERSION, frequence))
+        self.fichier.write(bytes((len(nom),)) + nom)
+        self.tampon = array("H")
+        self.taille_tampon = taille_tampon
+        self.dernier_etat = None
+        self.ticks_en_attente = 0
+
+    def pedales(self, voiture):
+        """Note l'état des pédales (écrit seulement s'il a changé)"""
+        etat = (voiture.embrayage, voiture.frein, voiture.accelerateur, voiture.direction)
+        if etat == self.dernier_etat:
+            return
+        self._vider_ticks()
+        entiers = [float(x).is_integer() for x in etat]
+        precedent = self.dernier_etat or (None,) * 4
+        if any(e and valeur != ancienne for e, valeur, ancienne in zip(entiers, etat, precedent)):
+            # Un niveau entier (clavier) a changé : mot des pédales, exact, puis les
+            # commandes analogiques qu'il vient d'écraser
+            self._ecrire(TYPE_PEDALES | coder_pedales(voiture))
+            for canal, valeur in enumerate(etat):
+                if not entiers[canal]:
+                    self._ecrire(coder_analogique(canal, valeur))
+        else:
+            for canal, (valeur, ancienne) in enumerate(zip(etat, precedent)):
+                if valeur != ancienne:
+                    self._ecrire(coder_analogique(canal, valeur))
+        self.dernier_etat = etat
+
+    def evenement(self, code):
+        self._vider_ticks()
+        self._ecrire(TYPE_EVENEMENT | code)
+
+    def ticks(self, n):
+        """Compte n pas de physique effectués avec l'état courant"""
+        self.ticks_en_attente += n
+
+    def _vider_ticks(self):
+        while self.ticks_en_attente > 0:
+            n = min(self.ticks_en_attente, TICKS_MAX)
+            self._ecrire(TYPE_TICKS | n)
+            self.ticks_en_attente -= n
+
+    def _ecrire(self, mot):
+        self.tampon.append(mot)
+        if len(self.tampon) >= self.taille_tampon:
+            self.vider()
+
+    def vider(self):
+        """Écrit le tampon sur le disque"""
+        if sys.byteorder == "big":
+            self.tampon.byteswap()
+        self.fichier.write(self.tampon.tobytes())
+        self.fichier.flush()
+        del self.tampon[:]
+
+    def fermer(self):
+        self._vider_ticks()
+        self.vider()
+        self.fichier.close()
+
+
+class Relecteur:
+    """Réinjecte une séance enregistrée dans Voiture et Tutoriel"""
+
+    def __init__(self, chemin):
+        with open(chemin, "rb") as f:
+            donnees = f.read()
+        if len(donnees) < EN_TETE.size:
+            raise ValueError(f"{chemin} : enregistrement tronqué")
+        signature, version, self.frequence = EN_TETE.unpack_from(donnees)
+        if signature != SIGNATURE or not 1 <= version <= VERSION:
+            raise ValueError(f"{chemin} : enregistrement non reconnu")
+
+        debut = EN_TETE.size
+        self.lateral_depart = CENTRE_VOIE if version >= 4 else 0
+        self.profil = None  # Modèle historique
+        if version >= 2:
+            longueur = donnees[debut]
+            self.profil = donnees[debut + 1:debut + 1 + longueur].decode("utf-8") or None
+            debut += 1 + longueur
+        corps = donnees[debut:]
+        self.mots = array("H")
+        self.mots.frombytes(corps[:len(corps) // 2 * 2])  # Ignore un octet final tronqué
+        if sys.byteorder == "big":
+            self.mots.byteswap()
+
+        self.ticks_total = sum(m & TICKS_MAX for m in self.mots if m & MASQUE_TYPE == TYPE_TICKS)
+        self.voiture = None
+        self.tutoriel = None
+
+    def demarrer(self, voiture, tutoriel, retour=None):
+        """Lie la relecture à une voiture et un tutoriel, depuis le début"""
+        voiture.position_laterale = self.lateral_depart
+        self.voiture = voiture
+        self.tutoriel = tutoriel
+        self.retour = retour  # Tampon des retours en arrière, tenu à jour par l'appelant
+        self.indice = 0
+        self.ticks_restants = 0
+        self.termine = False
+
+    def avant_pas(self, tick=None):
+        """Applique les entrées enregistrées jusqu'au prochain pas de physique"""
+        if self.ticks_restants > 0:
+            self.ticks_restants -= 1
+            return
+        mots = self.mots
+        while self.indice < len(mots):
+            mot = mots[self.indice]
+            self.indice += 1
+            type_mot = mot & MASQUE_TYPE
+            if type_mot == TYPE_TICKS:
+                self.ticks_restants = (mot & TICKS_MAX) - 1
+                return
+            elif type_mot == TYPE_PEDALES:
+                decoder_pedales(mot, self.voiture)
+            elif type_mot == TYPE_EVENEMENT:
+                appliquer_evenement(mot & 0xFF, self.voiture, self.tutoriel, self.retour)
+            else:
+                decoder_analogique(mot, self.voiture)
+        self.termine = True
+
+
+def rejouer(chemin, apres_pas=None):
+    """Rejoue une séance sans affichage, aussi vite que possible"""
+    relecteur = Relecteur(chemin)
+    voiture = Voiture(relecteur.profil)
+    tutoriel = Tutoriel()
+    retour = TamponRetour(relecteur.frequence)
+    relecteur.demarrer(voiture, tutoriel, retour)
+    retour.enregistrer(voiture, tutoriel)
+    ordonnanceur = Ordonnanceur(voiture, relecteur.frequence)
+
+    def verifier(tick):
+        tutoriel.mettre_a_jour(voiture)
+        retour.enregistrer(voiture, tutoriel)
+        if apres_pas is not None:
+            apres_pas(tick, voiture, tutoriel)
+
+    debut = time.perf_counter()
+    ordonnanceur.executer(relecteur.ticks_total, relecteur.avant_pas, verifier)
+    relecteur.avant_pas()  # Événements écrits après le dernier pas
+    duree = time.perf_counter() - debut
+
+    mesures = {
+        "pas": relecteur.ticks_total,
+        "duree_seance_s": relecteur.ticks_total / relecteur.frequence,
+        "duree_relecture_s": duree,
+    }
+    return voiture, tutoriel, mesures
+
+
+# État comparé entre la séance conduite et sa relecture
+ETAT_COMPARE = ("position_route", "position_laterale", "vitesse_actuelle", "regime_moteur",
+                "vitesse_engagee", "embrayage", "frein", "accelerateur", "direction",
+                "moteur_demarre", "cale")
+
+
+def verifier_aller_retour(chemin, profil=None, duree=30.0, frequence=FREQUENCE_PHYSIQUE):
+    """Conduit une séance scriptée en l'enregistrant, la rejoue et compare l'état final
+
+    Embrayage au clavier (niveaux entiers), frein, accélérateur et direction
+    analogiques (quantifiés comme entrees.py), comme avec MANETTE_DEFAUT.
+    Renvoie les écarts {attribut: (séance, relecture)}, vides si la relecture est exacte.
+    """
+    import math
+
+    voiture = Voiture(profil)
+    tutoriel = Tutoriel()
+    retour = TamponRetour(frequence)
+    retour.enregistrer(voiture, tutoriel)
+    ordonnanceur = Ordonnanceur(voiture, frequence)
+    enregistreur = Enregistreur(chemin, frequence, profil)
+
+    def evenement(code):
+        appliquer_evenement(code, voiture, tutoriel, retour)
+        enregistreur.evenement(code)
+
+    def commandes(t):
+        # Embrayage : enfoncé, niveau 3 pour démarrer, relâché par niveaux entiers
+        voiture.embrayage = 4 if t < 1 else 3 if t < 2 else max(0, 3 - int(t - 2)) if t < 8 else (
+            2 if 15 < t < 17 else 0)
+        gaz = 0.0 if t < 2 else 0.3 + 0.2 * math.sin(t)
+        voiture.accelerateur = niveau_analogique(quantifier_pedale(gaz))
+        voiture.frein = niveau_analogique(quantifier_pedale(0.4 if 20 < t < 23 else 0.0))
+        voiture.direction = direction_analogique(quantifier_direction(0.3 * math.sin(t / 3)))
+
+    def avant_pas(tick):
+        commandes(tick * ordonnanceur.dt)
+        enregistreur.pedales(voiture)
+
+    def apres_pas(tick):
+        enregistreur.ticks(1)
+        tutoriel.mettre_a_jour(voiture)
+        retour.enregistrer(voiture, tutoriel)
+
+    # Événements aux mêmes instants que dans la boucle principale : entre deux pas
+    scenario = {int(1.5 * frequence): [EVT_ESPACE, EVT_ESPACE, EVT_MOTEUR, EVT_VITESSE + 2],
+                int(1.6 * frequence): [EVT_ESPACE],  # Frein à main desserré
+                int(16 * frequence): [EVT_VITESSE + 3]}
+    for tick in range(int(duree * frequence)):
+        for code in scenario.get(tick, ()):
+            evenement(code)
+        ordonnanceur.pas(avant_pas, apres_pas)
+    enregistreur.fermer()
+
+    relue, _, _ = rejouer(chemin)
+    return {nom: (getattr(voiture, nom), getattr(relue, nom))
+            for nom in ETAT_COMPARE if getattr(voiture, nom) != getattr(relue, nom)}
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import tempfile
+
+    from motorisation import profils_disponibles
+
+    parser = argparse.ArgumentParser(description="Relecture sans affichage d'une séance")
+    parser.add_argument("fichier", nargs="?")
+    parser.add_argument("--verifier", action="store_true",
+                        help="enregistrer puis rejouer une séance scriptée et comparer l'état final")
+    parser.add_argument("--voiture", choices=profils_disponibles())
+    args = parser.parse_args()
+
+    if args.verifier:
+        with tempfile.TemporaryDirectory() as dossier:
+            ecarts = verifier_aller_retour(os.path.join(dossier, "verification.simc"), args.voiture)
+        for nom, (seance, relecture) in ecarts.items():
+            print(f"ÉCART {nom} : séance {seance!r}, relecture {relecture!r}")
+        if not ecarts:
+            print("Relecture identique à la séance")
+        sys.exit(1 if ecarts else 0)
+    if not args.fichier:
+        parser.error("fichier requis (ou --verifier)")
+
+    voiture, tutoriel, m = rejouer(args.fichier)
+    facteur = m["duree_seance_s"] / m["duree_relecture_s"] if m["duree_relecture_s"] else float("inf")
+    print(f"Voiture : {voiture.chaine.profil['nom'] if voiture.chaine else 'modèle historique'}")
+    print(f"Séance : {m['duree_seance_s']:.1f} s ({m['pas']} pas), "
+          f"relue en {m['duree_relecture_s'] * 1000:.0f} ms (x{facteur:.0f})")
+    print(f"Vitesse : {voiture.vitesse_actuelle:.1f} km/h, "
+          f"régime : {voiture.regime_moteur:.0f} tr/min, "
+          f"rapport : {voiture.vitesse_engagee}, calé : {voiture.cale}")
+    print(f"Étape du tutoriel : {tutoriel.etape + 1}")
@@ -0,0 +1,203 @@
+"""
+Simulateur de Conduite - Permis B
+Entrées : clavier, manettes et pédaliers USB, latence entrée -> affichage
+
+SDL ne met à jour l'état du clavier et des axes qu'en pompant ses
+événements, et les événements Pygame ne sont pas datés. Entrees.relever
+pompe et relit donc les commandes toutes les quelques millisecondes
+(pendant l'attente du Cadenceur, voir cadence.py, et à chaque image) et
+date chaque changement. Les pas de physique d'une image s'exécutent d'un
+coup, mais chacun correspond à un instant réel (début de l'image moins le
+temps restant à simuler) : Entrees.appliquer donne à chaque pas les
+commandes relevées avant cet instant. La latence affichée va de la date
+du relevé à la présentation de l'image. En vsync, la présentation bloque
+sans relevé : les commandes ne sont alors datées qu'à l'image.
+
+Le clavier garde ses niveaux
+progressifs (AZER, QSDF, WXCV : 0 à 4). Les axes des manettes et
+pédaliers donnent une valeur continue de 0.0 à 1.0, après zone morte et
+courbe de réponse réglables, quantifiée sur 12 bits pour que les séances
+enregistrées se rejouent à l'identique.
+
+Réglage des axes (--manette FICHIER, JSON) : liste de périphériques,
+reconnus par une partie de leur nom (sans nom : tous), et pour chacun les
+axes utilisés :
+    {"peripheriques": [
+        {"nom": "Pedals", "axes": {
+            "embrayage": {"axe": 0, "repos": 1.0, "enfonce": -1.0},
+            "frein": {"axe": 1, "repos": 1.0, "enfonce": -1.0, "courbe": 1.6},
+            "accelerateur": {"axe": 2, "repos": 1.0, "enfonce": -1.0}}},
+        {"axes": {"direction": {"axe": 0, "zone_morte": 0.08, "courbe": 1.5}}}
+    ]}
+"""
+
+import json
+import time
+from array import array
+from collections import deque
+
+import pygame
+
+from simulation import (
+    niveau_analogique, direction_analogique, quantifier_pedale, quantifier_direction,
+)
+
+PEDALES = ("embrayage", "frein", "accelerateur")
+RELEVES_MAX = 256  # Changements datés en attente d'un pas (au-delà, les plus anciens sont oubliés)
+
+# Touches progressives du clavier, de la plus légère à la plus appuyée
+TOUCHES_PEDALES = {
+    "embrayage": (pygame.K_a, pygame.K_z, pygame.K_e, pygame.K_r),
+    "frein": (pygame.K_q, pygame.K_s, pygame.K_d, pygame.K_f),
+    "accelerateur": (pygame.K_w, pygame.K_x, pygame.K_c, pygame.K_v),
+}
+
+# Manette de jeu courante : stick gauche pour tourner, gâchettes pour les pédales
+MANETTE_DEFAUT = {
+    "peripheriques": [
+        {"axes": {
+            "direction": {"axe": 0, "zone_morte": 0.08, "courbe": 1.5},
+            "frein": {"axe": 4, "repos": -1.0, "enfonce": 1.0},
+            "accelerateur": {"axe": 5, "repos": -1.0, "enfonce": 1.0},
+        }},
+    ],
+}
+
+
+def charger_config_manette(chemin):
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def niveau_clavier(keys, touches):
+    """Niveau 0-4 : nombre de touches enfoncées à la suite, dans l'ordre"""
+    niveau = 0
+    for touche in touches:
+        if not keys[touche]:
+            break
+        niveau += 1
+    return niveau
+
+
+class Axe:
+    """Axe d'un périphérique ramené à 0.0-1.0 (pédale) ou -1.0-1.0 (direction centrée)"""
+
+    def __init__(self, axe, repos=-1.0, enfonce=1.0, zone_morte=0.05, courbe=1.0, centre=False):
+        self.axe = axe
+        self.repos = repos
+        self.enfonce = enfonce
+        self.zone_morte = zone_morte
+        self.courbe = courbe  # Exposant : > 1 pour plus de finesse en début de course
+        self.centre = centre
+
+    def lire(self, joystick):
+        brut = joystick.get_axis(self.axe)
+        if self.centre:
+            signe = -1.0 if brut < 0 else 1.0
+            x = abs(brut)
+        else:
+            signe = 1.0
+            x = (brut - self.repos) / (self.enfonce - self.repos)
+        x = min(1.0, max(0.0, x))
+        if x <= self.zone_morte:
+            return 0.0
+        x = (x - self.zone_morte) / (1.0 - self.zone_morte)
+        return signe * x ** self.courbe
+
+
+class Entrees:
+    """Relève et date clavier et manettes, les applique pas par pas et mesure la latence"""
+
+    def __init__(self, config=None, taille_mesures=120):
+        self.config = config if config is not None else MANETTE_DEFAUT
+        self.manettes = []  # (joystick, {commande: Axe})
+        pygame.joystick.init()
+        self.actualiser_manettes()
+
+        self.etat = self.lire()  # Dernier état relevé
+        self.etat_applique = self.etat  # État donné au dernier pas
+        self.releves = deque(maxlen=RELEVES_MAX)  # (instant, état) pas encore appliqués
+        self.changement = None  # Date du premier relevé appliqué, pas encore à l'écran
+        self.latences = array("d", [0.0]) * taille_mesures
+        self.n_latences = 0
+
+    def actualiser_manettes(self):
+        """Associe chaque manette branchée au premier réglage qui la reconnaît"""
+        self.manettes = []
+        for i in range(pygame.joystick.get_count()):
+            joystick = pygame.joystick.Joystick(i)
+            nom = joystick.get_name()
+            for peripherique in self.config["peripheriques"]:
+                if peripherique.get("nom", "") in nom:
+                    axes = {
+                        commande: Axe(centre=(commande == "direction"), **reglage)
+                        for commande, reglage in peripherique["axes"].items()
+                        if reglage["axe"] < joystick.get_numaxes()
+                    }
+                    self.manettes.append((joystick, axes))
+                    break
+
+    def gerer_evenement(self, event):
+        if event.type in (pygame.JOYDEVICEADDED, pygame.JOYDEVICEREMOVED):
+            self.actualiser_manettes()
+
+    def lire(self):
+        """État courant des commandes : (embrayage, frein, accelerateur, direction)"""
+        keys = pygame.key.get_pressed()
+        niveaux = [niveau_clavier(keys, TOUCHES_PEDALES[p]) for p in PEDALES]
+        direction = -1 if keys[pygame.K_LEFT] else 1 if keys[pygame.K_RIGHT] else 0
+
+        # Axes analogiques : la commande la plus appuyée l'emporte sur le clavier
+        for joystick, axes in self.manettes:
+            for k, pedale in enumerate(PEDALES):
+                axe = axes.get(pedale)
+                if axe is not None:
+                    niveau = niveau_analogique(quantifier_pedale(axe.lire(joystick)))
+                    if niveau > niveaux[k]:
+                        niveaux[k] = niveau
+            axe = axes.get("direction")
+            if axe is not None and direction == 0:
+                valeur = axe.lire(joystick)
+                if valeur:
+                    direction = direction_analogique(quantifier_direction(valeur))
+
+        return (*niveaux, direction)
+
+    def relever(self, pomper=True):
+        """Relit les commandes et date leur changement (pomper : faire lire ses événements à SDL)"""
+        if pomper:
+            pygame.event.pump()  # Les événements restent en file pour pygame.event.get()
+        etat = self.lire()
+        if etat != self.etat:
+            self.etat = etat
+            self.releves.append((time.perf_counter(), etat))
+
+    def appliquer(self, voiture, instant=None):
+        """Applique à la voiture les commandes relevées avant `instant` (avant un pas)
+
+        instant : moment réel (time.perf_counter) auquel correspond le début
+        du pas ; None : toutes les commandes relevées.
+        """
+        releves = self.releves
+        while releves and (instant is None or releves[0][0] <= instant):
+            date, self.etat_applique = releves.popleft()
+            if self.changement is None:
+                self.changement = date
+
+        *niveaux, direction = self.etat_applique
+        voiture.embrayage, voiture.frein, voiture.accelerateur = niveaux
+        voiture.direction = direction
+
+    def image_presentee(self):
+        """À appeler après la présentation d'une image : clôt la mesure de latence en cours"""
+        if self.changement is not None:
+            self.latences[self.n_latences % len(self.latences)] = time.perf_counter() - self.changement
+            self.n_latences += 1
+            self.changement = None
+
+    def latence_ms(self):
+        """Latence moyenne (ms) entre le relevé d'une entrée et l'écran, sur les dernières mesures"""
+        n = min(self.n_latences, len(self.latences))
+        if n == 0:
+            return None
+        return sum(self.latences[:n]) / n * 1000
@@ -0,0 +1,149 @@
+"""
+Simulateur de Conduite - Permis B
+Mode examen : relevés de conduite mis à jour à chaque pas de physique
+
+Le tutoriel vérifie qu'une étape est franchie ; l'examen note comment la
+voiture est conduite. Chaque relevé est un compteur ou une somme mis à
+jour en temps constant (aucune liste ne grandit avec la séance), si bien
+que le même objet sert en direct dans simulateur.py, dans la relecture et
+dans la correction par lots :
+- régime au-dessus (surrégime) ou au-dessous (sous-régime) de la plage
+  du rapport engagé ;
+- calages ;
+- freinages brusques : frein à fond (niveau 4) au-dessus de VITESSE_FREINAGE ;
+- écart latéral : moyenne et maximum de l'écart au centre de la voie de
+  départ (100 : une largeur de voie) en roulant, temps passé au-delà de
+  ECART_TOLERE. La voiture part au centre de sa voie (CENTRE_VOIE, à
+  +1,75 m de la ligne médiane) ; les enregistrements antérieurs à la
+  version 4 partaient sur la ligne médiane et sont notés par rapport à
+  elle ;
+- embrayage patiné : pédale entre les niveaux 1 et 2 en roulant.
+
+Ce module n'importe pas Pygame.
+"""
+
+VITESSE_ROULE = 1.0  # km/h : en dessous, la voiture est considérée à l'arrêt
+VITESSE_FREINAGE = 30.0  # km/h : frein à fond au-delà = freinage brusque
+ECART_TOLERE = 30.0  # Écart latéral toléré (30 % de la largeur de voie)
+
+
+class Examen:
+    """Relevés de conduite, à appeler après chaque pas : examen(tick, voiture, tutoriel)"""
+
+    __slots__ = (
+        "ticks", "ticks_roule", "ticks_en_prise", "ticks_surregime", "ticks_sous_regime",
+        "calages", "cale", "freinages", "ticks_freinage", "freinage",
+        "centre", "somme_ecart", "ecart_max", "ticks_hors_voie", "ticks_patinage",
+    )
+
+    def __init__(self):
+        self.ticks = 0  # Dernier pas vu (numérotés depuis 1)
+        self.ticks_roule = 0
+        self.ticks_en_prise = 0  # Moteur tournant, rapport avant engagé
+        self.ticks_surregime = 0
+        self.ticks_sous_regime = 0
+        self.calages = 0
+        self.cale = False
+        self.freinages = 0  # Freinages brusques (un par appui)
+        self.ticks_freinage = 0
+        self.freinage = False
+        self.centre = None  # Position latérale au premier pas : centre de la voie de départ
+        self.somme_ecart = 0.0
+        self.ecart_max = 0.0
+        self.ticks_hors_voie = 0
+        self.ticks_patinage = 0
+
+    def __call__(self, tick, voiture, tutoriel=None):
+        self.ticks = tick
+        if self.centre is None:
+            self.centre = voiture.position_laterale
+
+        cale = voiture.cale
+        if cale and not self.cale:
+            self.calages += 1
+        self.cale = cale
+
+        rapport = voiture.vitesse_engagee
+        if rapport > 0 and voiture.moteur_demarre:
+            self.ticks_en_prise += 1
+            bas, haut = voiture.plages_regime[rapport]
+            regime = voiture.regime_moteur
+            if regime > haut:
+                self.ticks_surregime += 1
+            elif regime < bas:
+                self.ticks_sous_regime += 1
+
+        vitesse = abs(voiture.vitesse_actuelle)
+        if vitesse < VITESSE_ROULE:
+            self.freinage = False
+            return
+        self.ticks_roule += 1
+
+        freinage = voiture.frein >= 4 and vitesse > VITESSE_FREINAGE
+        if freinage:
+            self.ticks_freinage += 1
+            if not self.freinage:
+                self.freinages += 1
+        self.freinage = freinage
+
+        ecart = abs(voiture.position_laterale - self.centre)
+        self.somme_ecart += ecart
+        if ecart > self.ecart_max:
+            self.ecart_max = ecart
+        if ecart > ECART_TOLERE:
+            self.ticks_hors_voie += 1
+
+        if 1 <= voiture.embrayage <= 2:
+            self.ticks_patinage += 1
+
+    def resultats(self, frequence):
+        """Relevés en secondes et en % de voie (dictionnaire sérialisable en JSON)"""
+        dt = 1.0 / frequence
+        n = self.ticks_roule
+        return {
+            "duree_s": round(self.ticks * dt, 3),
+            "roule_s": round(n * dt, 3),
+            "en_prise_s": round(self.ticks_en_prise * dt, 3),
+            "surregime_s": round(self.ticks_surregime * dt, 3),
+            "sous_regime_s": round(self.ticks_sous_regime * dt, 3),
+            "calages": self.calages,
+            "freinages_brusques": self.freinages,
+            "freinage_brusque_s": round(self.ticks_freinage * dt, 3),
+            "ecart_moyen": round(self.somme_ecart / n, 2) if n else 0.0,
+            "ecart_max": round(self.ecart_max, 2),
+            "hors_voie_s": round(self.ticks_hors_voie * dt, 3),
+            "embrayage_patine_s": round(self.ticks_patinage * dt, 3),
+        }
+
+
+def lignes_resume(resultats):
+    """Résumé lisible, une ligne par relevé (affichage en direct et fin de séance)"""
+    r = resultats
+    return [
+        f"Surrégime : {r['surregime_s']:.1f} s   Sous-régime : {r['sous_regime_s']:.1f} s "
+        f"(en prise {r['en_prise_s']:.1f} s)",
+        f"Calages : {r['calages']}   Freinages brusques : {r['freinages_brusques']}",
+        f"Écart latéral : moyen {r['ecart_moyen']:.0f} %, max {r['ecart_max']:.0f} %, "
+        f"hors voie {r['hors_voie_s']:.1f} s",
+        f"Embrayage patiné : {r['embrayage_patine_s']:.1f} s (sur {r['roule_s']:.1f} s en roulant)",
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from enregistrement import rejouer
+
+    parser = argparse.ArgumentParser(description="Relevés d'examen d'une séance enregistrée")
+    parser.add_argument("fichier")
+    args = parser.parse_args()
+
+    examen = Examen()
+    _, _, mesures = rejouer(args.fichier, examen)
+    for ligne in lignes_resume(examen.resultats(mesures["pas"] / mesures["duree_seance_s"])):
+        print(ligne)
+
+    # Coût par pas : meilleure relecture avec et sans examen
+    sans = min(rejouer(args.fichier)[2]["duree_relecture_s"] for _ in range(3))
+    avec = min(rejouer(args.fichier, Examen())[2]["duree_relecture_s"] for _ in range(3))
+    print(f"Coût de l'examen : environ {(avec - sans) / max(mesures['pas'], 1) * 1e9:.0f} ns par pas")
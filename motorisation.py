@@ -0,0 +1,228 @@
+"""
+Simulateur de Conduite - Permis B
+Chaîne de traction tabulée : courbe de couple, rapports, embrayage, frein moteur
+
+Les profils de voiture (profils/*.json) décrivent le moteur par quelques
+points (couple à pleine charge et frottements en fonction du régime), la
+boîte (rapports, pont, rayon de roue) et l'embrayage (couple transmissible
+par niveau de pédale). À la construction, tout est interpolé en tables
+indexées par tranche de régime : un pas de physique se résume à quelques
+lectures de tableau et une dizaine d'opérations.
+
+Ce module n'importe pas Pygame.
+
+Comparaison avec le modèle historique :
+    python motorisation.py --voiture clio_diesel
+"""
+
+import json
+import math
+import os
+from array import array
+
+DOSSIER_PROFILS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profils")
+
+PAS_REGIME = 10  # tr/min par case des tables
+RPM_VERS_RAD = 2 * math.pi / 60
+GRAVITE = 9.81
+DENSITE_AIR = 1.2
+
+SUBDIVISIONS_PEDALE = 32  # Cases par niveau de pédale (pédales analogiques)
+GAIN_RALENTI = 0.004  # Ouverture ajoutée par tr/min sous le ralenti
+PAPILLON_RALENTI_MAX = 0.35
+VITESSE_ROULEMENT = 0.5  # m/s : en dessous, résistance au roulement progressive
+
+
+def profils_disponibles():
+    """Noms des profils présents dans le dossier profils/"""
+    return sorted(
+        os.path.splitext(f)[0] for f in os.listdir(DOSSIER_PROFILS) if f.endswith(".json")
+    )
+
+
+def charger_profil(nom):
+    """Lit le profil `nom` (profils/nom.json) ou un chemin de fichier JSON"""
+    chemin = nom if nom.endswith(".json") else os.path.join(DOSSIER_PROFILS, nom + ".json")
+    with open(chemin, encoding="utf-8") as f:
+        profil = json.load(f)
+    profil.setdefault("id", os.path.splitext(os.path.basename(chemin))[0])
+    return profil
+
+
+def interpoler(points, n, pas=PAS_REGIME):
+    """Table de n valeurs, interpolées linéairement entre des points (régime, valeur)"""
+    table = array("d", [0.0]) * n
+    j = 0
+    for i in range(n):
+        x = i * pas
+        while j < len(points) - 2 and x > points[j + 1][0]:
+            j += 1
+        (x0, y0), (x1, y1) = points[j], points[j + 1]
+        f = min(1.0, max(0.0, (x - x0) / (x1 - x0)))
+        table[i] = y0 + (y1 - y0) * f
+    return table
+
+
+class ChaineTraction:
+    """Tables précalculées d'un profil et intégration d'un pas de physique"""
+
+    def __init__(self, profil):
+        self.profil = profil
+        self.id = profil.get("id")
+        self.masse = profil["masse"]
+        self.inertie = profil["inertie_moteur"]
+        self.regime_ralenti = profil["regime_ralenti"]
+        self.regime_calage = profil["regime_calage"]
+        self.regime_max = profil["regime_max"]
+        self.omega_calage = self.regime_calage * RPM_VERS_RAD
+        self.omega_max = self.regime_max * RPM_VERS_RAD
+
+        # Couple à pleine charge et frottements (frein moteur), par tranche de régime
+        self.n_regimes = self.regime_max // PAS_REGIME + 2
+        self.couple_plein = interpoler(profil["couple"], self.n_regimes)
+        self.couple_frottement = interpoler(profil["frein_moteur"], self.n_regimes)
+
+        # Démultiplication totale rapportée à la roue (rad/s moteur par m/s),
+        # indexée par vitesse_engagee + 1 : marche arrière, point mort, 1 à 5
+        rapports = profil["rapports"]
+        rayon = profil["rayon_roue"]
+        self.demultiplication = [-rapports["-1"] * profil["pont"] / rayon, 0.0]
+        self.demultiplication += [rapports[str(r)] * profil["pont"] / rayon for r in range(1, 6)]
+        # Masse équivalente en prise (voiture + inertie du moteur ramenée à la roue)
+        self.masse_equivalente = [self.masse + self.inertie * g * g for g in self.demultiplication]
+
+        # Couple transmissible par l'embrayage selon la pédale (0 = relâché, 4 = enfoncé),
+        # par fraction de niveau pour suivre une pédale analogique
+        embrayage = profil["embrayage"]
+        points = [
+            (niveau * SUBDIVISIONS_PEDALE, embrayage["couple_max"] * p)
+            for niveau, p in enumerate(embrayage["progressivite"])
+        ]
+        self.capacite_embrayage = interpoler(points, 4 * SUBDIVISIONS_PEDALE + 1, pas=1)
+
+        resistance = profil["resistance"]
+        self.roulement = resistance["roulement"] * self.masse * GRAVITE
+        self.aero = 0.5 * DENSITE_AIR * resistance["scx"]
+
+    def vitesses_max(self):
+        """Vitesse (km/h) au régime maximal sur chaque rapport"""
+        return {
+            r: abs(self.omega_max / self.demultiplication[r + 1]) * 3.6
+            for r in (-1, 1, 2, 3, 4, 5)
+        }
+
+    def pas(self, voiture, dt):
+        """Avance le moteur et la voiture de dt secondes (les freins restent dans Voiture)"""
+        omega = voiture.regime_moteur * RPM_VERS_RAD
+        v = voiture.vitesse_actuelle / 3.6  # m/s
+        moteur = voiture.moteur_demarre
+
+        # Couple moteur : papillon x pleine charge - frottements, régulation du ralenti
+        regime = voiture.regime_moteur
+        i = int(regime) // PAS_REGIME
+        if i >= self.n_regimes:
+            i = self.n_regimes - 1
+        if moteur:
+            papillon = voiture.accelerateur * 0.25  # Ouverture des gaz (niveau 0-4)
+            if regime < self.regime_ralenti:
+                papillon = max(papillon, min(PAPILLON_RALENTI_MAX,
+                                             (self.regime_ralenti - regime) * GAIN_RALENTI))
+            elif omega >= self.omega_max:
+                papillon = 0.0  # Coupure d'injection
+            couple = papillon * self.couple_plein[i] - self.couple_frottement[i]
+        else:
+            # Moteur coupé : il ne fait que freiner s'il est entraîné par les roues
+            couple = -self.couple_frottement[i] if omega > 1.0 else 0.0
+
+        # Résistances à l'avancement (roulement progressif près de l'arrêt, air)
+        if v > VITESSE_ROULEMENT:
+            resistance = self.roulement + self.aero * v * v
+        elif v < -VITESSE_ROULEMENT:
+            resistance = -self.roulement - self.aero * v * v
+        else:
+            resistance = self.roulement * v / VITESSE_ROULEMENT
+
+        roues_libres = not voiture.frein_main
+        g = self.demultiplication[voiture.vitesse_engagee + 1]
+        capacite = (self.capacite_embrayage[int(voiture.embrayage * SUBDIVISIONS_PEDALE)]
+                    if g else 0.0)
+        if capacite > 0:
+            glissement = omega - v * g
+            # En prise : moteur et roues solidaires, si l'embrayage tient le couple
+            a = (couple * g - resistance) / self.masse_equivalente[voiture.vitesse_engagee + 1]
+            if not roues_libres:
+                a = 0.0
+            couple_transmis = couple - self.inertie * a * g
+            sens = glissement
+            if -1.0 < glissement < 1.0:
+                if -capacite <= couple_transmis <= capacite:
+                    sens = 0.0
+                else:
+                    sens = couple_transmis  # Le couple dépasse la capacité : décrochage
+            if sens == 0.0:
+                v += a * dt
+                omega = v * g
+            else:
+                # Patinage : l'embrayage transmet sa capacité dans le sens du glissement
+                transmis = capacite if sens > 0 else -capacite
+                omega += (couple - transmis) / self.inertie * dt
+                if roues_libres:
+                    v += (transmis * g - resistance) / self.masse * dt
+                if (omega - v * g) * sens <= 0:
+                    omega = v * g  # Les disques se sont rejoints
+        else:
+            omega += couple / self.inertie * dt
+            if roues_libres:
+                v -= resistance / self.masse * dt
+
+        voiture.vitesse_actuelle = v * 3.6
+        voiture.regime_moteur = omega / RPM_VERS_RAD if omega > 0 else 0.0
+
+        # Calage : régime trop bas avec un rapport engagé et l'embrayage en prise
+        if moteur and omega < self.omega_calage and capacite > 0:
+            voiture.cale = True
+            voiture.moteur_demarre = False
+            voiture.regime_moteur = 0
+
+
+def comparer_modele(profil, pas=20000, repetitions=5, frequence=120):
+    """Pas par seconde du modèle historique et de la chaîne tabulée (roulage en 3e)"""
+    import time
+
+    from simulation import Voiture
+
+    resultats = {}
+    for nom, argument in (("historique", None), (profil, profil)):
+        meilleur = float("inf")
+        for _ in range(repetitions):
+            voiture = Voiture(argument)
+            voiture.moteur_demarre = True
+            voiture.frein_main = False
+            voiture.vitesse_engagee = 3
+            voiture.vitesse_actuelle = 50.0
+            voiture.regime_moteur = 2500
+            voiture.accelerateur = 2
+            update = voiture.update
+            dt = 1.0 / frequence
+            debut = time.perf_counter()
+            for _ in range(pas):
+                update(dt)
+            meilleur = min(meilleur, time.perf_counter() - debut)
+        resultats[nom] = pas / meilleur
+    return resultats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Chaîne de traction tabulée")
+    parser.add_argument("--voiture", default="clio_essence", choices=profils_disponibles())
+    args = parser.parse_args()
+
+    chaine = ChaineTraction(charger_profil(args.voiture))
+    print(chaine.profil["nom"])
+    for rapport, vitesse in chaine.vitesses_max().items():
+        print(f"  rapport {rapport:>2} : {vitesse:5.0f} km/h à {chaine.regime_max} tr/min")
+    r = comparer_modele(args.voiture)
+    for nom, valeur in r.items():
+        print(f"{nom} : {valeur:,.0f} pas/s ({1e6 / valeur:.2f} µs/pas)")
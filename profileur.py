@@ -0,0 +1,114 @@
+"""
+Simulateur de Conduite - Permis B
+Profileur de la boucle principale : temps par étape et par image
+
+Les mesures sont rangées dans un tampon circulaire préalloué (une ligne
+par image, une colonne par étape) : l'instrumentation n'agrandit aucune
+structure pendant la partie. Les statistiques (min/moy/p99) ne sont
+calculées qu'à la demande, pour l'affichage ou l'export CSV.
+"""
+
+import csv
+import time
+from array import array
+
+ETAPES = (
+    "evenements",
+    "pedales",
+    "physique",
+    "trafic",
+    "tutoriel",
+    "son",
+    "ciel",
+    "paysage",
+    "route",
+    "mise_a_l_echelle",
+    "tableau_bord",
+    "pedales_hud",
+    "aide_touches",
+    "tutoriel_hud",
+    "retroviseurs",
+    "rendu_partiel",
+    "profileur",
+    "capture",
+    "presentation",
+)
+
+
+class Profileur:
+    """Chronomètre les étapes de chaque image dans un tampon circulaire"""
+
+    def __init__(self, taille=600, etapes=ETAPES):
+        self.taille = taille
+        self.etapes = etapes
+        self.indices = {nom: i for i, nom in enumerate(etapes)}
+        self.colonnes = len(etapes) + 1  # Dernière colonne : durée totale de l'image
+        self.mesures = array("d", [0.0]) * (taille * self.colonnes)
+        self.images = 0  # Nombre total d'images enregistrées
+        self.ligne = 0  # Début de la ligne de l'image en cours
+        self.debut = 0.0
+        self.dernier = 0.0
+
+    def debut_image(self):
+        self.ligne = (self.images % self.taille) * self.colonnes
+        for i in range(self.ligne, self.ligne + self.colonnes):
+            self.mesures[i] = 0.0
+        self.debut = self.dernier = time.perf_counter()
+
+    def marquer(self, etape):
+        """Attribue à l'étape le temps écoulé depuis la marque précédente"""
+        t = time.perf_counter()
+        self.mesures[self.ligne + self.indices[etape]] += t - self.dernier
+        self.dernier = t
+
+    def fin_image(self):
+        self.mesures[self.ligne + self.colonnes - 1] = time.perf_counter() - self.debut
+        self.images += 1
+
+    def derniere_image(self):
+        """Durée totale (s) de la dernière image terminée"""
+        if self.images == 0:
+            return 0.0
+        ligne = ((self.images - 1) % self.taille) * self.colonnes
+        return self.mesures[ligne + self.colonnes - 1]
+
+    def nombre(self):
+        """Nombre d'images présentes dans le tampon"""
+        return min(self.images, self.taille)
+
+    def serie(self, colonne):
+        """Valeurs d'une colonne, de la plus ancienne à la plus récente (secondes)"""
+        n = self.nombre()
+        premiere = self.images - n
+        return [
+            self.mesures[((premiere + k) % self.taille) * self.colonnes + colonne]
+            for k in range(n)
+        ]
+
+    def statistiques(self):
+        """Min, moyenne et 99e centile (ms) de chaque étape et de l'image complète"""
+        stats = {}
+        for colonne, nom in enumerate(self.etapes + ("image",)):
+            valeurs = sorted(self.serie(colonne))
+            if not valeurs:
+                continue
+            p99 = valeurs[min(len(valeurs) - 1, int(len(valeurs) * 0.99))]
+            stats[nom] = (
+                valeurs[0] * 1000,
+                sum(valeurs) / len(valeurs) * 1000,
+                p99 * 1000,
+            )
+        return stats
+
+    def exporter_csv(self, chemin):
+        """Écrit le contenu du tampon (ms par étape et par image) dans un fichier CSV"""
+        n = self.nombre()
+        premiere = self.images - n
+        with open(chemin, "w", newline="", encoding="utf-8") as f:
+            ecrivain = csv.writer(f)
+            ecrivain.writerow(("image",) + self.etapes + ("total",))
+            for k in range(n):
+                debut = ((premiere + k) % self.taille) * self.colonnes
+                ligne = self.mesures[debut:debut + self.colonnes]
+                ecrivain.writerow([premiere + k] + [f"{x * 1000:.4f}" for x in ligne])
+        return chemin
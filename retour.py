@@ -0,0 +1,64 @@
+"""
+Simulateur de Conduite - Permis B
+Retour en arrière : les 60 dernières secondes de conduite, pas par pas
+
+Après chaque pas de physique, l'état de la voiture (sans les pédales, qui
+restent celles de l'élève) et l'étape du tutoriel sont empaquetés dans un
+tampon circulaire d'octets préalloué : 37 octets par pas, soit environ
+260 Ko pour une minute à 120 Hz, quelle que soit la durée de la séance.
+
+Un retour en arrière est un événement (EVT_RETOUR) qui recule d'une durée
+fixe : enregistré comme les autres, il se rejoue à l'identique.
+
+Ce module n'importe pas Pygame.
+"""
+
+import struct
+
+# Moteur, vitesse, régime, rapport, frein à main, position, latéral, calé, étape du tutoriel
+INSTANTANE = struct.Struct("<?ddb?dd?B")
+
+DUREE_TAMPON = 60.0  # s
+DUREE_RECUL = 0.05  # s reculées par événement (une image à 60 Hz : retour à x3)
+
+
+class TamponRetour:
+    """Instantanés compacts des derniers pas, dans un tampon circulaire"""
+
+    def __init__(self, frequence, duree=DUREE_TAMPON):
+        self.capacite = int(duree * frequence) + 1
+        self.donnees = bytearray(self.capacite * INSTANTANE.size)
+        self.recul = max(1, round(DUREE_RECUL * frequence))  # Pas reculés par événement
+        self.frequence = frequence
+        self.suivant = 0  # Indice du prochain instantané
+        self.nombre = 0  # Instantanés disponibles
+
+    def enregistrer(self, voiture, tutoriel):
+        """Ajoute l'état courant (après chaque pas de physique)"""
+        v = voiture
+        INSTANTANE.pack_into(
+            self.donnees, self.suivant * INSTANTANE.size,
+            v.moteur_demarre, v.vitesse_actuelle, v.regime_moteur, v.vitesse_engagee,
+            v.frein_main, v.position_route, v.position_laterale, v.cale, tutoriel.etape,
+        )
+        self.suivant = (self.suivant + 1) % self.capacite
+        if self.nombre < self.capacite:
+            self.nombre += 1
+
+    def reculer(self, voiture, tutoriel, pas=None):
+        """Restaure l'état d'il y a `pas` pas (au plus le plus ancien) ; renvoie les pas reculés"""
+        if self.nombre <= 1:
+            return 0
+        pas = min(self.recul if pas is None else pas, self.nombre - 1)
+        # Les instantanés plus récents sont abandonnés : la conduite reprend d'ici
+        self.suivant = (self.suivant - pas) % self.capacite
+        self.nombre -= pas
+        indice = (self.suivant - 1) % self.capacite
+        (voiture.moteur_demarre, voiture.vitesse_actuelle, voiture.regime_moteur,
+         voiture.vitesse_engagee, voiture.frein_main, voiture.position_route,
+         voiture.position_laterale, voiture.cale, tutoriel.etape) = INSTANTANE.unpack_from(
+            self.donnees, indice * INSTANTANE.size)
+        return pas
+
+    def secondes_disponibles(self):
+        return (self.nombre - 1) / self.frequence if self.nombre else 0.0
@@ -0,0 +1,125 @@
+"""
+Simulateur de Conduite - Permis B
+Modèle de route en segments (virages, côtes, marquages) et projection
+
+La route est une suite de segments de longueur fixe. À la construction,
+la courbure et la pente de chaque segment sont intégrées une fois pour
+toutes en positions latérales et en altitudes cumulées : retrouver le
+tracé à une distance donnée coûte deux lectures de tableau, quelle que
+soit la longueur totale de l'itinéraire.
+
+Ce module n'importe pas Pygame.
+"""
+
+import random
+from array import array
+
+UNITES_PAR_METRE = 36  # position_route avance de v (km/h) * 10 par seconde
+LONGUEUR_SEGMENT = 5.0  # m
+
+# Marquage au sol du segment
+AUCUN = 0
+DISCONTINU = 1
+CONTINU = 2
+CARREFOUR = 3
+
+
+class Route:
+    """Tracé précalculé : position latérale et altitude au début de chaque segment"""
+
+    def __init__(self, courbures, pentes, marquages, longueur_segment=LONGUEUR_SEGMENT):
+        n = len(courbures)
+        self.n = n
+        self.longueur_segment = longueur_segment
+        self.longueur = n * longueur_segment
+        self.marquages = array("b", marquages)
+
+        # Intégration : courbure -> cap -> position latérale, pente -> altitude
+        self.x = array("d", [0.0]) * (n + 1)
+        self.h = array("d", [0.0]) * (n + 1)
+        cap = 0.0
+        for i in range(n):
+            cap += courbures[i] * longueur_segment
+            self.x[i + 1] = self.x[i] + cap * longueur_segment
+            self.h[i + 1] = self.h[i] + pentes[i] * longueur_segment
+
+    @classmethod
+    def depuis_sections(cls, sections, longueur_segment=LONGUEUR_SEGMENT):
+        """Construit une route à partir de sections (longueur m, courbure 1/rayon, pente, marquage)"""
+        courbures, pentes, marquages = [], [], []
+        for longueur, courbure, pente, marquage in sections:
+            nombre = max(1, int(round(longueur / longueur_segment)))
+            courbures += [courbure] * nombre
+            pentes += [pente] * nombre
+            marquages += [marquage] * nombre
+        return cls(courbures, pentes, marquages, longueur_segment)
+
+    def echantillonner(self, s):
+        """Position latérale et altitude à l'abscisse s (m), la route bouclant sur elle-même"""
+        tours, s = divmod(s, self.longueur)
+        u = s / self.longueur_segment
+        i = int(u)
+        f = u - i
+        x = self.x[i] + (self.x[i + 1] - self.x[i]) * f + tours * self.x[self.n]
+        h = self.h[i] + (self.h[i + 1] - self.h[i]) * f + tours * self.h[self.n]
+        return x, h
+
+    def cap(self, s):
+        """Pente latérale du tracé à l'abscisse s"""
+        i = int((s % self.longueur) / self.longueur_segment)
+        return (self.x[i + 1] - self.x[i]) / self.longueur_segment
+
+    def marquage(self, s):
+        return self.marquages[int((s % self.longueur) / self.longueur_segment)]
+
+    def objets_entre(self, s_min, s_max):
+        """Objets posés le long de la route (aucun : le décor vient des cartes, voir carte.py)"""
+        return []
+
+
+def route_sinueuse(longueur_km=20.0, graine=0):
+    """Itinéraire de test : lignes droites, virages, côtes et carrefours en alternance"""
+    rng = random.Random(graine)
+    sections = [(100, 0.0, 0.0, DISCONTINU)]
+    while sum(s[0] for s in sections) < longueur_km * 1000:
+        # Virage et contre-virage de même amplitude : le cap revient à zéro
+        longueur = rng.choice((60, 100, 150))
+        rayon = rng.uniform(150, 1000)
+        courbure = rng.choice((-1, 1)) / rayon
+        marquage = CONTINU if rayon < 300 else DISCONTINU
+        # Côte puis descente : l'altitude revient à zéro
+        pente = rng.choice((0.0, 0.0, 0.04, -0.04, 0.07))
+        sections += [
+            (longueur, courbure, pente, marquage),
+            (longueur, -courbure, -pente, marquage),
+            (rng.choice((50, 150, 300)), 0.0, 0.0, DISCONTINU),
+        ]
+        if rng.random() < 0.3:
+            sections.append((10, 0.0, 0.0, CARREFOUR))
+    return Route.depuis_sections(sections)
+
+
+class TableProjection:
+    """Profondeur de chaque tranche de lignes de l'écran, pour une route plate
+
+    Calculée une fois par résolution : à la tranche k, située à `ecart`
+    pixels sous l'horizon, correspondent la distance z (m) et l'échelle
+    focale / z. Les tranches vont de la plus proche à la plus lointaine.
+    """
+
+    def __init__(self, y_horizon, y_bas, focale, hauteur_camera, pas_lignes=3,
+                 distance_max=300.0):
+        self.y_horizon = y_horizon
+        self.y_bas = y_bas
+        self.focale = focale
+        self.hauteur_camera = hauteur_camera
+
+        ecart_min = focale * hauteur_camera / distance_max
+        self.z = array("d")
+        self.echelle = array("d")
+        ecart = float(y_bas - y_horizon)
+        while ecart >= ecart_min:
+            z = focale * hauteur_camera / ecart
+            self.z.append(z)
+            self.echelle.append(focale / z)
+            ecart -= pas_lignes
@@ -9,22 +9,73 @@ Contrôles:
 - Accélérateur: W, X, C, V (progressif, maintenir les touches précédentes)
 - Vitesses: 1-5 pour les vitesses, 0 pour point mort, N pour marche arrière
 - Flèches gauche/droite: Direction
+- Manette, volant ou pédalier USB: pédales et direction analogiques
 - Espace: Frein à main
 - Entrée: Démarrer/Couper le moteur
+- Retour arrière (maintenu): revenir jusqu'à 60 s en arrière, la conduite reprend au relâcher
+- F3: Profileur (temps par étape), F4: export CSV du profileur
+
+Options:
+- --rendu-partiel: ne redessiner que les zones modifiées
+- --headless: simuler sans affichage, physique en mode libre (voir simulation.py)
+- --frequence: fréquence de la physique à pas fixe (120 Hz par défaut)
+- --enregistrer FICHIER / --rejouer FICHIER: enregistrer ou revoir une séance
+- --voiture PROFIL: chaîne de traction d'un profil (profils/*.json)
+- --telemetrie DOSSIER: état de la voiture à chaque pas, lisible avec NumPy
+- --manette FICHIER: axes des manettes, volants et pédaliers (zone morte, courbe)
+- --echelle / --qualite-auto: résolution interne de la scène, fixe ou adaptative
+- --plein-ecran / --redimensionnable: adapter l'image à l'écran
+- --retroviseurs [N]: intérieur et extérieurs, redessinés une image sur N
+- --trafic N: autres usagers sur la route (distance avec le véhicule de devant)
+- --carte FICHIER: itinéraire avec panneaux, carrefours et décor (voir carte.py)
+- --muet: sans le son du moteur (synthétisé d'après le régime, voir son.py)
+- --examen: relevés de conduite en direct (régime, calages, freinages, trajectoire)
+- --fps N / --vsync / --libre: cadence d'affichage (voir cadence.py)
+- --capture DOSSIER: vidéo de la séance, PNG ou brute, une image sur N (voir capture.py)
+- --classe HOTE:PORT / --poste NOM: état en direct pour le moniteur (voir classe.py)
 """
 
+import time
+
+# Avant l'import de Pygame (environ 300 ms) : --headless mesure depuis le lancement
+_T_LANCEMENT = time.perf_counter()
+
 import pygame
+import argparse
 import math
+import os
+import socket
 import sys
-
-# Initialisation de Pygame
-pygame.init()
+from collections import OrderedDict
+
+from simulation import (
+    Voiture, Tutoriel, Ordonnanceur, FREQUENCE_PHYSIQUE,
+    EVT_MOTEUR, EVT_ESPACE, EVT_TUTORIEL, EVT_VITESSE, EVT_RETOUR, appliquer_evenement,
+    executer_headless, afficher_resultat_headless,
+)
+from enregistrement import Enregistreur, Relecteur
+from motorisation import profils_disponibles
+from profileur import Profileur
+from retour import TamponRetour
+from telemetrie import Telemetrie
+from entrees import Entrees, charger_config_manette
+from classe import PosteClasse
+from cadence import Cadenceur, afficher_resume
+from examen import Examen, lignes_resume
+from son import creer_moteur_sonore
+from capture import Capture, FORMATS as FORMATS_CAPTURE, afficher_capture
+from route import (
+    UNITES_PAR_METRE, DISCONTINU, CONTINU, CARREFOUR, TableProjection, route_sinueuse,
+)
+from carte import (
+    ouvrir_carte, ARBRE, BUISSON, MAISON, PANNEAU_LIMITATION, PANNEAU_CEDER, PANNEAU_STOP,
+)
 
 # Configuration de l'écran
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Simulateur de Conduite - Permis B")
+screen = None  # Fenêtre créée par initialiser_affichage()
+vsync_actif = False  # Synchronisation verticale obtenue à l'ouverture de la fenêtre
 
 # Couleurs
 BLACK = (0, 0, 0)
@@ -43,405 +94,557 @@ ROAD_GRAY = (70, 70, 70)
 DASHBOARD_BROWN = (101, 67, 33)
 PEDAL_GRAY = (50, 50, 50)
 
-# Polices
-font_small = pygame.font.Font(None, 24)
-font_medium = pygame.font.Font(None, 32)
-font_large = pygame.font.Font(None, 48)
-font_title = pygame.font.Font(None, 64)
-
-# Classe Voiture
-class Voiture:
-    def __init__(self):
-        self.moteur_demarre = False
-        self.vitesse_actuelle = 0  # km/h
-        self.regime_moteur = 800  # RPM au ralenti
-        self.vitesse_engagee = 0  # 0 = point mort, 1-5 = vitesses, -1 = marche arrière
-        self.embrayage = 0  # 0-4 (0 = relâché, 4 = enfoncé à fond)
-        self.frein = 0  # 0-4
-        self.accelerateur = 0  # 0-4
-        self.direction = 0  # -1 gauche, 0 centre, 1 droite
-        self.frein_main = True
-        self.position_route = 0  # Position sur la route (pour l'animation)
-        self.position_laterale = 0  # Position latérale (-100 à 100)
-        self.cale = False
-
-        # Plages de régime pour chaque vitesse (min optimal, max optimal)
-        self.plages_regime = {
-            1: (1000, 2500),
-            2: (1500, 3000),
-            3: (2000, 3500),
-            4: (2500, 4000),
-            5: (3000, 4500),
-        }
-
-        # Vitesses max par rapport
-        self.vitesse_max_rapport = {
-            -1: 20,
-            1: 30,
-            2: 50,
-            3: 70,
-            4: 100,
-            5: 130,
+# Polices (chargées par initialiser_affichage())
+font_small = None
+font_medium = None
+font_large = None
+font_title = None
+
+
+def initialiser_affichage(plein_ecran=False, mise_a_l_echelle=False, vsync=False):
+    """Initialise Pygame, ouvre la fenêtre et charge les polices (une seule fois)
+
+    L'écran garde toujours sa taille logique (1280x720). Avec la mise à
+    l'échelle, SDL l'adapte à la fenêtre redimensionnable ou au plein écran.
+    La synchronisation verticale passe par le rendu SDL (drapeau SCALED) ;
+    si la plateforme la refuse, la fenêtre s'ouvre sans elle.
+    """
+    global screen, font_small, font_medium, font_large, font_title, vsync_actif
+    if screen is not None:
+        return screen
+
+    pygame.init()
+    drapeaux = 0
+    if plein_ecran:
+        drapeaux = pygame.SCALED | pygame.FULLSCREEN
+    elif mise_a_l_echelle:
+        drapeaux = pygame.SCALED | pygame.RESIZABLE
+    vsync_actif = False
+    if vsync:
+        try:
+            screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT),
+                                             drapeaux | pygame.SCALED, vsync=1)
+            vsync_actif = True
+        except pygame.error:
+            pass
+    if not vsync_actif:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), drapeaux)
+    pygame.display.set_caption("Simulateur de Conduite - Permis B")
+
+    font_small = pygame.font.Font(None, 24)
+    font_medium = pygame.font.Font(None, 32)
+    font_large = pygame.font.Font(None, 48)
+    font_title = pygame.font.Font(None, 64)
+    return screen
+
+
+# Cache des surfaces de texte et des fonds semi-transparents
+class CacheTexte:
+    """Cache LRU borné des surfaces rendues par le HUD"""
+
+    def __init__(self, capacite=256):
+        self.capacite = capacite
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _obtenir(self, cle, creer):
+        surface = self.surfaces.get(cle)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(cle)
+            return surface
+
+        self.misses += 1
+        surface = creer()
+        self.surfaces[cle] = surface
+        if len(self.surfaces) > self.capacite:
+            self.surfaces.popitem(last=False)  # Évince l'entrée la moins récente
+        return surface
+
+    def texte(self, police, texte, couleur, alpha=None):
+        """Renvoie la surface d'un texte rendu (antialiasé)"""
+        def creer():
+            surface = police.render(texte, True, couleur)
+            if alpha is not None:
+                surface.set_alpha(alpha)
+            return surface
+        return self._obtenir(("texte", police, texte, couleur, alpha), creer)
+
+    def fond(self, taille, couleur, alpha):
+        """Renvoie un rectangle uni semi-transparent"""
+        def creer():
+            surface = pygame.Surface(taille)
+            surface.set_alpha(alpha)
+            surface.fill(couleur)
+            return surface
+        return self._obtenir(("fond", taille, couleur, alpha), creer)
+
+    def statistiques(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entrees": len(self.surfaces),
+            "capacite": self.capacite,
         }
 
-    def update(self, dt):
-        if not self.moteur_demarre:
-            self.regime_moteur = 0
-            return
-
-        # Calcul du régime moteur
-        if self.vitesse_engagee == 0:  # Point mort
-            regime_cible = 800 + (self.accelerateur * 1500)
-        else:
-            # Régime basé sur la vitesse et le rapport engagé
-            if self.vitesse_engagee > 0:
-                rapport = self.vitesse_engagee
-                vitesse_max = self.vitesse_max_rapport[rapport]
-                regime_base = 800 + (self.vitesse_actuelle / vitesse_max) * 5200
-            else:  # Marche arrière
-                regime_base = 800 + (abs(self.vitesse_actuelle) / 20) * 3000
-
-            # Influence de l'accélérateur
-            if self.embrayage >= 3:  # Embrayage suffisamment enfoncé
-                regime_cible = 800 + (self.accelerateur * 1500)
-            else:
-                regime_cible = regime_base + (self.accelerateur * 500)
-
-        # Transition douce du régime
-        self.regime_moteur += (regime_cible - self.regime_moteur) * dt * 3
-        self.regime_moteur = max(0, min(7000, self.regime_moteur))
-
-        # Détection du calage
-        if self.vitesse_engagee != 0 and self.embrayage < 2:
-            if self.regime_moteur < 500 and self.vitesse_actuelle < 5:
-                self.cale = True
-                self.moteur_demarre = False
-                self.regime_moteur = 0
-
-        # Calcul de la vitesse
-        if self.vitesse_engagee != 0 and self.embrayage < 4:
-            # Force motrice (dépend du régime et de l'embrayage)
-            coeff_embrayage = 1 - (self.embrayage / 4)
-            force_motrice = (self.accelerateur / 4) * coeff_embrayage
-
-            if self.vitesse_engagee > 0:
-                vitesse_cible = force_motrice * self.vitesse_max_rapport[self.vitesse_engagee]
-            else:  # Marche arrière
-                vitesse_cible = -force_motrice * 20
-
-            # Accélération/décélération
-            if not self.frein_main:
-                acceleration = (vitesse_cible - self.vitesse_actuelle) * dt * 2
-                self.vitesse_actuelle += acceleration
-
-        # Freinage
-        if self.frein > 0:
-            freinage = self.frein * 30 * dt
-            if self.vitesse_actuelle > 0:
-                self.vitesse_actuelle = max(0, self.vitesse_actuelle - freinage)
-            elif self.vitesse_actuelle < 0:
-                self.vitesse_actuelle = min(0, self.vitesse_actuelle + freinage)
-
-        # Frein à main
-        if self.frein_main and abs(self.vitesse_actuelle) > 0:
-            self.vitesse_actuelle *= 0.95
-            if abs(self.vitesse_actuelle) < 0.5:
-                self.vitesse_actuelle = 0
-
-        # Friction naturelle
-        if self.accelerateur == 0 and self.vitesse_engagee == 0:
-            self.vitesse_actuelle *= 0.99
-
-        # Mise à jour de la position
-        self.position_route += self.vitesse_actuelle * dt * 10
-
-        # Direction
-        if abs(self.vitesse_actuelle) > 1:
-            self.position_laterale += self.direction * abs(self.vitesse_actuelle) * dt * 0.5
-            self.position_laterale = max(-100, min(100, self.position_laterale))
-
-    def demarrer_moteur(self):
-        if not self.moteur_demarre and self.embrayage >= 3:
-            self.moteur_demarre = True
-            self.cale = False
-            self.regime_moteur = 800
-            return True
-        return False
-
-    def couper_moteur(self):
-        self.moteur_demarre = False
-        self.regime_moteur = 0
-
-    def changer_vitesse(self, nouvelle_vitesse):
-        if self.embrayage >= 3:  # Embrayage enfoncé suffisamment
-            self.vitesse_engagee = nouvelle_vitesse
-            return True
-        return False
-
-
-# Classe Tutoriel
-class Tutoriel:
-    def __init__(self):
-        self.etape = 0
-        self.etapes = [
-            {
-                "titre": "Bienvenue au Simulateur de Conduite !",
-                "texte": [
-                    "Apprenez à conduire une voiture manuelle.",
-                    "",
-                    "Contrôles des pédales (progressifs) :",
-                    "- Embrayage : A, Z, E, R (de léger à fond)",
-                    "- Frein : Q, S, D, F",
-                    "- Accélérateur : W, X, C, V",
-                    "",
-                    "Appuyez sur ESPACE pour continuer..."
-                ],
-                "condition": lambda v: True
-            },
-            {
-                "titre": "Étape 1 : Vérifications avant démarrage",
-                "texte": [
-                    "Avant de démarrer :",
-                    "1. Vérifiez que le frein à main est serré (case verte)",
-                    "2. Vérifiez que vous êtes au point mort (N sur l'indicateur)",
-                    "",
-                    "Le frein à main est actuellement SERRÉ.",
-                    "Appuyez sur 0 pour mettre au point mort si nécessaire.",
-                    "",
-                    "Appuyez sur ESPACE quand c'est fait..."
-                ],
-                "condition": lambda v: v.frein_main and v.vitesse_engagee == 0
-            },
-            {
-                "titre": "Étape 2 : Démarrer le moteur",
-                "texte": [
-                    "Pour démarrer le moteur :",
-                    "1. Enfoncez l'embrayage à fond (A+Z+E+R)",
-                    "2. Appuyez sur ENTRÉE pour démarrer",
-                    "",
-                    "Maintenez A, puis ajoutez Z, E, et R",
-                    "L'indicateur d'embrayage doit être au maximum.",
-                    "",
-                    "Démarrez le moteur..."
-                ],
-                "condition": lambda v: v.moteur_demarre
-            },
-            {
-                "titre": "Étape 3 : Engager la première vitesse",
-                "texte": [
-                    "Moteur démarré ! Maintenant :",
-                    "1. Gardez l'embrayage enfoncé (A+Z+E+R)",
-                    "2. Appuyez sur 1 pour la première vitesse",
-                    "",
-                    "L'indicateur de vitesse passera de N à 1.",
-                    "",
-                    "Engagez la première..."
-                ],
-                "condition": lambda v: v.vitesse_engagee == 1
-            },
-            {
-                "titre": "Étape 4 : Desserrer le frein à main",
-                "texte": [
-                    "Parfait ! Première engagée.",
-                    "",
-                    "Appuyez sur ESPACE pour desserrer",
-                    "le frein à main.",
-                    "",
-                    "Gardez l'embrayage enfoncé !",
-                ],
-                "condition": lambda v: not v.frein_main
-            },
-            {
-                "titre": "Étape 5 : Démarrer en douceur",
-                "texte": [
-                    "C'est le moment délicat !",
-                    "",
-                    "1. Accélérez légèrement (W)",
-                    "2. Relâchez DOUCEMENT l'embrayage",
-                    "   (lâchez R, puis E, puis Z...)",
-                    "",
-                    "Si vous calez, recommencez !",
-                    "Objectif : atteindre 10 km/h"
-                ],
-                "condition": lambda v: v.vitesse_actuelle >= 10
-            },
-            {
-                "titre": "Bravo ! Vous roulez !",
-                "texte": [
-                    "Félicitations ! Vous avez réussi à démarrer !",
-                    "",
-                    "Continuez à pratiquer :",
-                    "- Passez la 2ème vers 20 km/h",
-                    "- Utilisez les flèches pour tourner",
-                    "- Freinez avec Q, S, D, F",
-                    "",
-                    "Bonne route !"
-                ],
-                "condition": lambda v: True
-            }
-        ]
-        self.afficher = True
 
-    def verifier_etape(self, voiture):
-        if self.etape < len(self.etapes) - 1:
-            if self.etapes[self.etape]["condition"](voiture):
-                pass  # Condition remplie, on peut passer à la suite
+cache_texte = CacheTexte()
 
-    def etape_suivante(self, voiture):
-        if self.etape < len(self.etapes) - 1:
-            if self.etapes[self.etape]["condition"](voiture):
-                self.etape += 1
 
-    def get_etape_actuelle(self):
-        return self.etapes[self.etape]
+# Fonctions de dessin
+# Décor pré-rendu : chaque élément est dessiné une fois dans un sprite, puis
+# les sprites sont assemblés dans une bande répétée horizontalement
+COULEUR_TRANSPARENTE = (255, 0, 255)
+
+# Placement des éléments dans chaque bande (x, y à l'écran)
+DECOR_NUAGES = [(i * 300, 40 + (i % 3) * 30) for i in range(5)]
+DECOR_ARBRES = [(i * 200, 160) for i in range(10)]
+
+
+def sprite_soleil():
+    sprite = pygame.Surface((80, 80), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, YELLOW, (40, 40), 40)
+    return sprite
+
+
+def sprite_nuage():
+    sprite = pygame.Surface((160, 50), pygame.SRCALPHA)
+    pygame.draw.ellipse(sprite, WHITE, (0, 10, 120, 40))
+    pygame.draw.ellipse(sprite, WHITE, (30, 0, 80, 50))
+    pygame.draw.ellipse(sprite, WHITE, (60, 10, 100, 40))
+    return sprite
+
+
+def sprite_arbre():
+    sprite = pygame.Surface((50, 120), pygame.SRCALPHA)
+    # Tronc
+    pygame.draw.rect(sprite, DASHBOARD_BROWN, (15, 70, 20, 50))
+    # Feuillage
+    pygame.draw.polygon(sprite, (0, 100, 0), [(0, 80), (25, 20), (50, 80)])
+    pygame.draw.polygon(sprite, (0, 120, 0), [(5, 60), (25, 0), (45, 60)])
+    return sprite
+
+
+class BandeParallaxe:
+    """Bande de décor pré-rendue, défilant à une fraction de la vitesse de la route"""
+
+    def __init__(self, periode, y, hauteur, facteur, sprite, placements, echelle=1.0, marge=100):
+        # Coordonnées logiques (1280x720) ramenées à la résolution de la surface cible
+        self.periode = round(periode * echelle)
+        self.y = round(y * echelle)
+        self.facteur = facteur * echelle
+        self.marge = round(marge * echelle)  # Décalage à gauche, pour que les éléments entrent progressivement
+
+        if echelle != 1.0:
+            sprite = pygame.transform.smoothscale(
+                sprite, (round(sprite.get_width() * echelle), round(sprite.get_height() * echelle)))
+        self.surface = pygame.Surface((self.periode, round(hauteur * echelle))).convert()
+        self.surface.fill(COULEUR_TRANSPARENTE)
+        self.surface.set_colorkey(COULEUR_TRANSPARENTE, pygame.RLEACCEL)
+        for x, ys in placements:
+            # Un élément à cheval sur la fin de la bande est aussi copié au début
+            for dx in (0, -self.periode):
+                self.surface.blit(sprite, (round(x * echelle) + dx, round(ys * echelle) - self.y))
+
+    def dessiner(self, screen, position_route):
+        """Une ou deux copies de la bande suffisent pour couvrir l'écran"""
+        x = -(int(position_route * self.facteur) % self.periode) - self.marge
+        largeur = screen.get_width()
+        while x < largeur:
+            screen.blit(self.surface, (x, self.y))
+            x += self.periode
+
+
+_decor = {}
+
+
+def echelle_surface(screen):
+    """Rapport entre la largeur de la surface et la largeur logique de l'écran"""
+    return screen.get_width() / SCREEN_WIDTH
+
+
+def get_decor(echelle=1.0):
+    """Construit les sprites et bandes de décor au premier dessin à cette échelle"""
+    decor = _decor.get(echelle)
+    if decor is None:
+        soleil = sprite_soleil()
+        if echelle != 1.0:
+            soleil = pygame.transform.smoothscale(soleil, (round(80 * echelle), round(80 * echelle)))
+        decor = _decor[echelle] = {
+            "soleil": soleil.convert_alpha(),
+            "nuages": BandeParallaxe(1500, 40, 110, 0.1, sprite_nuage(), DECOR_NUAGES, echelle),
+            "arbres": BandeParallaxe(1600, 160, 120, 0.5, sprite_arbre(), DECOR_ARBRES, echelle),
+        }
+    return decor
 
 
-# Fonctions de dessin
 def dessiner_ciel(screen, position_route):
     """Dessine le ciel avec des nuages"""
-    screen.fill(SKY_BLUE, (0, 0, SCREEN_WIDTH, 300))
+    k = echelle_surface(screen)
+    decor = get_decor(k)
+    screen.fill(SKY_BLUE, (0, 0, screen.get_width(), round(300 * k)))
 
     # Soleil
-    pygame.draw.circle(screen, YELLOW, (100, 80), 40)
+    screen.blit(decor["soleil"], (round(60 * k), round(40 * k)))
 
     # Nuages (se déplacent avec la route)
-    offset = int(position_route * 0.1) % 400
-    for i in range(5):
-        x = (i * 300 - offset) % 1500 - 100
-        pygame.draw.ellipse(screen, WHITE, (x, 50 + (i % 3) * 30, 120, 40))
-        pygame.draw.ellipse(screen, WHITE, (x + 30, 40 + (i % 3) * 30, 80, 50))
-        pygame.draw.ellipse(screen, WHITE, (x + 60, 50 + (i % 3) * 30, 100, 40))
+    decor["nuages"].dessiner(screen, position_route)
 
 
 def dessiner_paysage(screen, position_route):
     """Dessine le paysage (herbe, arbres)"""
+    k = echelle_surface(screen)
+
     # Herbe
-    pygame.draw.rect(screen, GRASS_GREEN, (0, 250, SCREEN_WIDTH, 100))
+    pygame.draw.rect(screen, GRASS_GREEN, (0, round(250 * k), screen.get_width(), round(100 * k)))
 
     # Arbres (se déplacent avec la route)
-    offset = int(position_route * 0.5) % 200
-    for i in range(10):
-        x = (i * 200 - offset) % 1600 - 100
-        # Tronc
-        pygame.draw.rect(screen, DASHBOARD_BROWN, (x + 15, 230, 20, 50))
-        # Feuillage
-        pygame.draw.polygon(screen, (0, 100, 0), [(x, 240), (x + 25, 180), (x + 50, 240)])
-        pygame.draw.polygon(screen, (0, 120, 0), [(x + 5, 220), (x + 25, 160), (x + 45, 220)])
-
-
-def dessiner_route(screen, position_route, position_laterale):
-    """Dessine la route en perspective"""
-    # Route principale
-    points_route = [
-        (400 + position_laterale, 350),  # Haut gauche
-        (880 + position_laterale, 350),  # Haut droit
-        (SCREEN_WIDTH + 200, 500),  # Bas droit
-        (-200, 500),  # Bas gauche
-    ]
-    pygame.draw.polygon(screen, ROAD_GRAY, points_route)
-
-    # Lignes blanches sur les côtés
-    pygame.draw.line(screen, WHITE, (400 + position_laterale, 350), (-200, 500), 3)
-    pygame.draw.line(screen, WHITE, (880 + position_laterale, 350), (SCREEN_WIDTH + 200, 500), 3)
-
-    # Ligne centrale pointillée
-    offset = int(position_route) % 60
-    for i in range(15):
-        y1 = 350 + i * 15 - offset * 0.25
-        y2 = y1 + 10
-        if y1 < 350:
-            continue
-        if y2 > 500:
-            break
-        # Calcul de la position X en fonction de Y (perspective)
-        ratio = (y1 - 350) / 150
-        x = 640 + position_laterale * (1 - ratio * 0.5)
-        largeur = 3 + ratio * 5
-        pygame.draw.line(screen, WHITE, (x, y1), (x, min(y2, 500)), int(largeur))
-
+    get_decor(k)["arbres"].dessiner(screen, position_route)
+
+
+# Route en pseudo-3D : tracé en segments (route.py) projeté tranche par tranche
+Y_HORIZON = 290
+Y_BAS_ROUTE = 500  # Haut du tableau de bord
+FOCALE = 640  # px
+HAUTEUR_CAMERA = 1.2  # m
+DEMI_LARGEUR_ROUTE = 3.5  # m
+METRES_PAR_LATERAL = 0.035  # position_laterale de -100 à 100 : une voie de chaque côté
+LONGUEUR_TIRET = 4.0  # m, un tiret tous les 12 m
+GRASS_DARK = (30, 125, 30)
+
+LARGEUR_VEHICULE = 1.8  # m
+HAUTEUR_VEHICULE = 1.45  # m
+COULEURS_VEHICULES = (  # Une par indice de couleur du trafic (trafic.NOMBRE_COULEURS)
+    (200, 30, 30), (30, 60, 170), (230, 230, 230), (40, 40, 40),
+    (120, 120, 130), (230, 180, 20), (20, 120, 60), (150, 80, 30),
+)
+VITRE = (70, 90, 110)
+PHARES = (255, 250, 200)
+FEUX_ARRIERE = (220, 0, 0)
+
+# Objets des cartes (carte.py) : dimensions en m, couleurs par paramètre
+TRONC = (90, 60, 30)
+FEUILLAGES = ((0, 100, 0), (0, 120, 0), (30, 110, 20), (10, 90, 40))
+COULEURS_MAISONS = ((230, 220, 190), (210, 190, 160), (240, 240, 235), (200, 170, 140))
+TOIT = (150, 60, 40)
+ROUGE_PANNEAU = (200, 0, 0)
+DOS_PANNEAU = (150, 150, 150)
+HAUTEUR_PANNEAU = 2.0
+RAYON_PANNEAU = 0.35
+
+_cache_route = {"route": None, "tables": {}}
+
+
+def get_route():
+    """Itinéraire chargé par charger_carte(), sinon itinéraire par défaut (20 km) construit au premier dessin"""
+    if _cache_route["route"] is None:
+        _cache_route["route"] = route_sinueuse(20.0)
+    return _cache_route["route"]
+
+
+def charger_carte(chemin):
+    """Remplace l'itinéraire par une carte (lue par blocs au fil de la route, voir carte.py)"""
+    _cache_route["route"] = ouvrir_carte(chemin)
+    return _cache_route["route"]
+
+
+def get_table_projection(screen):
+    """Table de projection par tranches, calculée une fois par résolution"""
+    taille = screen.get_size()
+    table = _cache_route["tables"].get(taille)
+    if table is None:
+        k = echelle_surface(screen)
+        table = _cache_route["tables"][taille] = TableProjection(
+            Y_HORIZON * k, Y_BAS_ROUTE * k, FOCALE * k, HAUTEUR_CAMERA)
+    return table
+
+
+def dessiner_route(screen, position_route, position_laterale, route=None,
+                   arriere=False, decalage=0.0, lacet=0.0, trafic=None):
+    """Dessine la route en perspective (virages, côtes, marquages) et le trafic
+
+    Caméra des rétroviseurs : arriere=True regarde derrière la voiture (image
+    déjà inversée comme dans un miroir), decalage (m) déplace la caméra sur
+    le côté et lacet (m par m) tourne son axe vers l'extérieur.
+    """
+    if route is None:
+        route = get_route()
+    table = get_table_projection(screen)
+    largeur = screen.get_width()
+    cx = largeur // 2
+    y_horizon = table.y_horizon
+
+    # Caméra : abscisse sur la route, décalage latéral, cap et altitude
+    s_cam = position_route / UNITES_PAR_METRE
+    x_cam, h_cam = route.echantillonner(s_cam)
+    x_cam += position_laterale * METRES_PAR_LATERAL + decalage
+    sens = -1 if arriere else 1
+    cap_cam = route.cap(s_cam) * sens + lacet
+    y_cam = h_cam + table.hauteur_camera
+    longueur_segment = route.longueur_segment
+
+    # Sol
+    screen.fill(GRASS_GREEN, (0, y_horizon, largeur, table.y_bas - y_horizon))
+
+    # Tranches de la plus proche à la plus lointaine : seule la partie encore
+    # visible au-dessus de la tranche précédente est dessinée (crêtes)
+    y_max = table.y_bas
+    x0 = y0 = w0 = z0 = None
+    for z, echelle in zip(table.z, table.echelle):
+        s = s_cam + z * sens
+        x, h = route.echantillonner(s)
+        x = cx + (x - x_cam - cap_cam * z) * echelle
+        y = y_horizon + (y_cam - h) * echelle
+        w = DEMI_LARGEUR_ROUTE * echelle
+
+        if y0 is not None and y < y_max:
+            if y0 > y_max:  # Bas de la tranche caché : on le ramène à y_max
+                t = (y0 - y_max) / (y0 - y)
+                x0 += (x - x0) * t
+                w0 += (w - w0) * t
+                y0 = y_max
+            dz = z - z0
+            marquage = route.marquage(s)
+
+            # Bandes d'herbe alternées (seulement là où elles restent lisibles)
+            if dz < longueur_segment and int(s / longueur_segment) % 2:
+                screen.fill(GRASS_DARK, (0, int(y), largeur, int(y0) - int(y) + 1))
+
+            if marquage == CARREFOUR:
+                screen.fill(ROAD_GRAY, (0, int(y), largeur, int(y0) - int(y) + 1))
+            else:
+                # Lignes blanches sur les côtés : chaussée blanche, puis grise à 96 %
+                pygame.draw.polygon(screen, WHITE,
+                                    [(x0 - w0, y0), (x0 + w0, y0), (x + w, y), (x - w, y)])
+                b0, b = w0 * 0.96, w * 0.96
+                pygame.draw.polygon(screen, ROAD_GRAY,
+                                    [(x0 - b0, y0), (x0 + b0, y0), (x + b, y), (x - b, y)])
+
+                # Ligne centrale (continue, ou tiret si la tranche est assez fine)
+                if marquage == CONTINU or (
+                    marquage == DISCONTINU and dz < LONGUEUR_TIRET and s % 12 < LONGUEUR_TIRET
+                ):
+                    l0, l = w0 * 0.02, w * 0.02
+                    pygame.draw.polygon(screen, WHITE, [(x0 - l0, y0), (x0 + l0, y0), (x + l, y), (x - l, y)])
+            y_max = y
+
+        x0, y0, w0, z0 = x, y, w, z
+
+    dessiner_objets(screen, route, table, s_cam, x_cam, y_cam, cap_cam, sens)
+    if trafic is not None:
+        dessiner_vehicules(screen, trafic, route, table, s_cam, x_cam, y_cam, cap_cam, sens)
+
+
+def dessiner_objets(screen, route, table, s_cam, x_cam, y_cam, cap_cam, sens):
+    """Décor et panneaux de la carte, du plus lointain au plus proche"""
+    z_min, z_max = table.z[0], table.z[-1]
+    if sens > 0:
+        objets = route.objets_entre(s_cam + z_min, s_cam + z_max)
+    else:
+        objets = route.objets_entre(s_cam - z_max, s_cam - z_min)[::-1]
+    if not objets:
+        return
+    cx = screen.get_width() // 2
+    for s, type_objet, parametre, cote in reversed(objets):
+        z = (s - s_cam) * sens
+        echelle = table.focale / z
+        x, h = route.echantillonner(s)
+        x = cx + (x + cote - x_cam - cap_cam * z) * echelle
+        y = table.y_horizon + (y_cam - h) * echelle  # Pied de l'objet
+        if type_objet == ARBRE:
+            hauteur = (4.0 + parametre) * echelle
+            if hauteur < 2:
+                continue
+            demi = hauteur * 0.3
+            screen.fill(TRONC, (x - hauteur * 0.04, y - hauteur * 0.3, hauteur * 0.08 + 1, hauteur * 0.3))
+            pygame.draw.polygon(screen, FEUILLAGES[parametre],
+                                [(x - demi, y - hauteur * 0.25), (x, y - hauteur), (x + demi, y - hauteur * 0.25)])
+        elif type_objet == BUISSON:
+            largeur = (1.5 + parametre * 0.3) * echelle
+            if largeur < 2:
+                continue
+            pygame.draw.ellipse(screen, FEUILLAGES[parametre],
+                                (x - largeur / 2, y - largeur * 0.6, largeur, largeur * 0.6))
+        elif type_objet == MAISON:
+            largeur, hauteur = 8.0 * echelle, 5.0 * echelle
+            if largeur < 2:
+                continue
+            screen.fill(COULEURS_MAISONS[parametre], (x - largeur / 2, y - hauteur, largeur + 1, hauteur))
+            pygame.draw.polygon(screen, TOIT, [(x - largeur * 0.55, y - hauteur),
+                                               (x, y - hauteur * 1.6), (x + largeur * 0.55, y - hauteur)])
+        else:
+            hauteur = HAUTEUR_PANNEAU * echelle
+            if hauteur < 3:
+                continue
+            r = max(1.0, RAYON_PANNEAU * echelle)
+            screen.fill(GRAY, (x - r * 0.1, y - hauteur, max(1, r * 0.2), hauteur))
+            centre = (x, y - hauteur)
+            if sens < 0:  # Vus de dos dans les rétroviseurs
+                pygame.draw.circle(screen, DOS_PANNEAU, centre, r)
+            elif type_objet == PANNEAU_LIMITATION:
+                pygame.draw.circle(screen, ROUGE_PANNEAU, centre, r)
+                pygame.draw.circle(screen, WHITE, centre, r * 0.78)
+                if r >= 10:
+                    texte = cache_texte.texte(font_small, str(parametre * 10), BLACK)
+                    screen.blit(texte, texte.get_rect(center=centre))
+            elif type_objet == PANNEAU_CEDER:
+                pointes = [(-1, -0.8), (1, -0.8), (0, 1)]  # Triangle pointe en bas
+                pygame.draw.polygon(screen, ROUGE_PANNEAU,
+                                    [(x + r * px, y - hauteur + r * py) for px, py in pointes])
+                if r >= 4:
+                    pygame.draw.polygon(screen, WHITE, [(x + r * 0.6 * px, y - hauteur + r * (0.6 * py - 0.08))
+                                                        for px, py in pointes])
+            elif type_objet == PANNEAU_STOP:
+                pygame.draw.polygon(screen, ROUGE_PANNEAU, [
+                    (x + r * math.cos(a), y - hauteur + r * math.sin(a))
+                    for a in (math.pi / 8 + k * math.pi / 4 for k in range(8))])
+
+
+def dessiner_vehicules(screen, trafic, route, table, s_cam, x_cam, y_cam, cap_cam, sens):
+    """Véhicules visibles, du plus lointain au plus proche, avec la caméra de la route"""
+    z_min, z_max = table.z[0], table.z[-1]
+    if sens > 0:
+        indices = trafic.indices_entre(s_cam + z_min, s_cam + z_max)
+    else:
+        indices = trafic.indices_entre(s_cam - z_max, s_cam - z_min)
+    if not len(indices):
+        return
+    cx = screen.get_width() // 2
+    longueur = trafic.longueur
+    vehicules = sorted(
+        (((s - s_cam) * sens) % longueur, s, lat, sens_vehicule, couleur)
+        for s, lat, sens_vehicule, couleur in zip(
+            trafic.s[indices].tolist(), trafic.lat[indices].tolist(),
+            trafic.sens[indices].tolist(), trafic.couleur[indices].tolist())
+    )
+    for z, s, lat, sens_vehicule, couleur in reversed(vehicules):
+        echelle = table.focale / z
+        x, h = route.echantillonner(s)
+        x = cx + (x + lat - x_cam - cap_cam * z) * echelle
+        y = table.y_horizon + (y_cam - h) * echelle
+        largeur, hauteur = LARGEUR_VEHICULE * echelle, HAUTEUR_VEHICULE * echelle
+        caisse = pygame.Rect(x - largeur / 2, y - hauteur, largeur + 1, hauteur + 1)
+        screen.fill(COULEURS_VEHICULES[couleur], caisse)
+        if largeur < 6:
+            continue  # Trop loin pour les détails
+        # Vitre, et feux : phares de face, feux arrière de dos
+        screen.fill(VITRE, (caisse.x + largeur * 0.12, caisse.y + hauteur * 0.1,
+                            largeur * 0.76, hauteur * 0.35))
+        feux = PHARES if sens_vehicule * sens < 0 else FEUX_ARRIERE
+        cote = max(1, largeur * 0.14)
+        for fx in (caisse.x + largeur * 0.06, caisse.right - largeur * 0.06 - cote):
+            screen.fill(feux, (fx, caisse.y + hauteur * 0.6, cote, max(1, hauteur * 0.12)))
+
+
+# Couche statique du tableau de bord (construite une seule fois par résolution)
+_cache_tableau_bord = {"taille": None, "surface": None}
+
+
+def construire_fond_tableau_bord(largeur, hauteur):
+    """Pré-rend les parties fixes du tableau de bord (fond, cadrans, graduations)"""
+    oy = 500  # Le fond est rendu dans une surface commençant à y = 500
+    fond = pygame.Surface((largeur, hauteur - oy)).convert()
 
-def dessiner_tableau_bord(screen, voiture):
-    """Dessine le tableau de bord"""
     # Fond du tableau de bord
-    pygame.draw.rect(screen, DASHBOARD_BROWN, (0, 500, SCREEN_WIDTH, 220))
-    pygame.draw.rect(screen, DARK_GRAY, (0, 500, SCREEN_WIDTH, 10))
+    pygame.draw.rect(fond, DASHBOARD_BROWN, (0, 0, largeur, hauteur - oy))
+    pygame.draw.rect(fond, DARK_GRAY, (0, 0, largeur, 10))
 
     # Compteur de vitesse (à gauche)
-    centre_vitesse = (250, 600)
-    pygame.draw.circle(screen, BLACK, centre_vitesse, 80)
-    pygame.draw.circle(screen, WHITE, centre_vitesse, 75, 2)
+    cx, cy = 250, 600 - oy
+    pygame.draw.circle(fond, BLACK, (cx, cy), 80)
+    pygame.draw.circle(fond, WHITE, (cx, cy), 75, 2)
 
     # Graduations vitesse
     for i in range(0, 140, 20):
         angle = math.radians(225 - i * 1.9)
-        x1 = centre_vitesse[0] + math.cos(angle) * 65
-        y1 = centre_vitesse[1] - math.sin(angle) * 65
-        x2 = centre_vitesse[0] + math.cos(angle) * 55
-        y2 = centre_vitesse[1] - math.sin(angle) * 55
-        pygame.draw.line(screen, WHITE, (x1, y1), (x2, y2), 2)
+        x1 = cx + math.cos(angle) * 65
+        y1 = cy - math.sin(angle) * 65
+        x2 = cx + math.cos(angle) * 55
+        y2 = cy - math.sin(angle) * 55
+        pygame.draw.line(fond, WHITE, (x1, y1), (x2, y2), 2)
 
         # Chiffres
         text = font_small.render(str(i), True, WHITE)
-        tx = centre_vitesse[0] + math.cos(angle) * 45 - text.get_width() // 2
-        ty = centre_vitesse[1] - math.sin(angle) * 45 - text.get_height() // 2
-        screen.blit(text, (tx, ty))
-
-    # Aiguille vitesse
-    vitesse_affichee = max(0, min(130, voiture.vitesse_actuelle))
-    angle_aiguille = math.radians(225 - vitesse_affichee * 1.9)
-    x_aiguille = centre_vitesse[0] + math.cos(angle_aiguille) * 50
-    y_aiguille = centre_vitesse[1] - math.sin(angle_aiguille) * 50
-    pygame.draw.line(screen, RED, centre_vitesse, (x_aiguille, y_aiguille), 3)
-    pygame.draw.circle(screen, RED, centre_vitesse, 8)
+        tx = cx + math.cos(angle) * 45 - text.get_width() // 2
+        ty = cy - math.sin(angle) * 45 - text.get_height() // 2
+        fond.blit(text, (tx, ty))
 
     # Texte km/h
     text_kmh = font_small.render("km/h", True, WHITE)
-    screen.blit(text_kmh, (centre_vitesse[0] - text_kmh.get_width() // 2, centre_vitesse[1] + 30))
+    fond.blit(text_kmh, (cx - text_kmh.get_width() // 2, cy + 30))
 
     # Compte-tours (à droite)
-    centre_rpm = (500, 600)
-    pygame.draw.circle(screen, BLACK, centre_rpm, 80)
-    pygame.draw.circle(screen, WHITE, centre_rpm, 75, 2)
+    cx, cy = 500, 600 - oy
+    pygame.draw.circle(fond, BLACK, (cx, cy), 80)
+    pygame.draw.circle(fond, WHITE, (cx, cy), 75, 2)
 
     # Zone rouge
     for i in range(60, 70):
         angle = math.radians(225 - i * 4)
-        x1 = centre_rpm[0] + math.cos(angle) * 70
-        y1 = centre_rpm[1] - math.sin(angle) * 70
-        x2 = centre_rpm[0] + math.cos(angle) * 55
-        y2 = centre_rpm[1] - math.sin(angle) * 55
-        pygame.draw.line(screen, RED, (x1, y1), (x2, y2), 3)
+        x1 = cx + math.cos(angle) * 70
+        y1 = cy - math.sin(angle) * 70
+        x2 = cx + math.cos(angle) * 55
+        y2 = cy - math.sin(angle) * 55
+        pygame.draw.line(fond, RED, (x1, y1), (x2, y2), 3)
 
     # Graduations RPM
     for i in range(0, 8):
         angle = math.radians(225 - i * 33.75)
-        x1 = centre_rpm[0] + math.cos(angle) * 65
-        y1 = centre_rpm[1] - math.sin(angle) * 65
-        x2 = centre_rpm[0] + math.cos(angle) * 55
-        y2 = centre_rpm[1] - math.sin(angle) * 55
-        pygame.draw.line(screen, WHITE, (x1, y1), (x2, y2), 2)
+        x1 = cx + math.cos(angle) * 65
+        y1 = cy - math.sin(angle) * 65
+        x2 = cx + math.cos(angle) * 55
+        y2 = cy - math.sin(angle) * 55
+        pygame.draw.line(fond, WHITE, (x1, y1), (x2, y2), 2)
 
         text = font_small.render(str(i), True, WHITE)
-        tx = centre_rpm[0] + math.cos(angle) * 45 - text.get_width() // 2
-        ty = centre_rpm[1] - math.sin(angle) * 45 - text.get_height() // 2
-        screen.blit(text, (tx, ty))
-
-    # Aiguille RPM
-    rpm_affiche = max(0, min(7000, voiture.regime_moteur))
-    angle_rpm = math.radians(225 - (rpm_affiche / 1000) * 33.75)
-    x_rpm = centre_rpm[0] + math.cos(angle_rpm) * 50
-    y_rpm = centre_rpm[1] - math.sin(angle_rpm) * 50
-    pygame.draw.line(screen, RED, centre_rpm, (x_rpm, y_rpm), 3)
-    pygame.draw.circle(screen, RED, centre_rpm, 8)
+        tx = cx + math.cos(angle) * 45 - text.get_width() // 2
+        ty = cy - math.sin(angle) * 45 - text.get_height() // 2
+        fond.blit(text, (tx, ty))
 
     # Texte x1000 RPM
     text_rpm = font_small.render("x1000 RPM", True, WHITE)
-    screen.blit(text_rpm, (centre_rpm[0] - text_rpm.get_width() // 2, centre_rpm[1] + 30))
+    fond.blit(text_rpm, (cx - text_rpm.get_width() // 2, cy + 30))
 
-    # Indicateur de vitesse engagée
-    pygame.draw.rect(screen, BLACK, (620, 550, 60, 80))
-    pygame.draw.rect(screen, WHITE, (620, 550, 60, 80), 2)
+    # Cadre de l'indicateur de vitesse engagée
+    pygame.draw.rect(fond, BLACK, (620, 550 - oy, 60, 80))
+    pygame.draw.rect(fond, WHITE, (620, 550 - oy, 60, 80), 2)
+
+    return fond
 
+
+def get_fond_tableau_bord(screen):
+    """Renvoie la couche statique du tableau de bord, reconstruite si la résolution change"""
+    taille = screen.get_size()
+    if _cache_tableau_bord["taille"] != taille:
+        _cache_tableau_bord["surface"] = construire_fond_tableau_bord(*taille)
+        _cache_tableau_bord["taille"] = taille
+    return _cache_tableau_bord["surface"]
+
+
+def dessiner_aiguille(screen, centre, angle_deg):
+    """Dessine une aiguille de cadran et son moyeu"""
+    angle = math.radians(angle_deg)
+    x = centre[0] + math.cos(angle) * 50
+    y = centre[1] - math.sin(angle) * 50
+    pygame.draw.line(screen, RED, centre, (x, y), 3)
+    pygame.draw.circle(screen, RED, centre, 8)
+
+
+def dessiner_tableau_bord(screen, voiture):
+    """Dessine le tableau de bord"""
+    # Parties fixes : une seule copie de la couche pré-rendue
+    screen.blit(get_fond_tableau_bord(screen), (0, 500))
+
+    # Aiguille vitesse
+    vitesse_affichee = max(0, min(130, voiture.vitesse_actuelle))
+    dessiner_aiguille(screen, (250, 600), 225 - vitesse_affichee * 1.9)
+
+    # Aiguille RPM
+    rpm_affiche = max(0, min(7000, voiture.regime_moteur))
+    dessiner_aiguille(screen, (500, 600), 225 - (rpm_affiche / 1000) * 33.75)
+
+    # Indicateur de vitesse engagée
     if voiture.vitesse_engagee == 0:
         vitesse_txt = "N"
     elif voiture.vitesse_engagee == -1:
@@ -449,14 +652,14 @@ def dessiner_tableau_bord(screen, voiture):
     else:
         vitesse_txt = str(voiture.vitesse_engagee)
 
-    text_vitesse = font_title.render(vitesse_txt, True, GREEN if voiture.moteur_demarre else RED)
+    text_vitesse = cache_texte.texte(font_title, vitesse_txt, GREEN if voiture.moteur_demarre else RED)
     screen.blit(text_vitesse, (650 - text_vitesse.get_width() // 2, 575))
 
     # Indicateurs
     # Frein à main
     frein_main_color = GREEN if voiture.frein_main else DARK_GRAY
     pygame.draw.rect(screen, frein_main_color, (700, 560, 40, 30))
-    text_fm = font_small.render("P", True, BLACK)
+    text_fm = cache_texte.texte(font_small, "P", BLACK)
     screen.blit(text_fm, (712, 565))
 
     # Moteur
@@ -465,7 +668,7 @@ def dessiner_tableau_bord(screen, voiture):
 
     # Calé
     if voiture.cale:
-        text_cale = font_medium.render("CALÉ !", True, RED)
+        text_cale = cache_texte.texte(font_medium, "CALÉ !", RED)
         screen.blit(text_cale, (SCREEN_WIDTH // 2 - text_cale.get_width() // 2, 520))
 
 
@@ -487,7 +690,7 @@ def dessiner_pedales(screen, voiture):
 def dessiner_pedale(screen, x, y, nom, niveau, touches, couleur):
     """Dessine une pédale individuelle"""
     # Nom de la pédale
-    text_nom = font_small.render(nom, True, WHITE)
+    text_nom = cache_texte.texte(font_small, nom, WHITE)
     screen.blit(text_nom, (x - text_nom.get_width() // 2, y))
 
     # Barre de niveau
@@ -507,7 +710,7 @@ def dessiner_pedale(screen, x, y, nom, niveau, touches, couleur):
         pygame.draw.rect(screen, bg_color, (x - 12, ty, 24, 16))
         pygame.draw.rect(screen, WHITE, (x - 12, ty, 24, 16), 1)
 
-        text_touche = font_small.render(touche, True, WHITE if actif else GRAY)
+        text_touche = cache_texte.texte(font_small, touche, WHITE if actif else GRAY)
         screen.blit(text_touche, (x - text_touche.get_width() // 2, ty + 1))
 
 
@@ -519,32 +722,29 @@ def dessiner_tutoriel(screen, tutoriel):
     etape = tutoriel.get_etape_actuelle()
 
     # Fond semi-transparent
-    s = pygame.Surface((500, 300))
-    s.set_alpha(230)
-    s.fill(DARK_GRAY)
-    screen.blit(s, (20, 20))
+    screen.blit(cache_texte.fond((500, 300), DARK_GRAY, 230), (20, 20))
 
     # Bordure
     pygame.draw.rect(screen, WHITE, (20, 20, 500, 300), 2)
 
     # Titre
-    text_titre = font_medium.render(etape["titre"], True, YELLOW)
+    text_titre = cache_texte.texte(font_medium, etape["titre"], YELLOW)
     screen.blit(text_titre, (30, 30))
 
     # Texte
     y_texte = 70
     for ligne in etape["texte"]:
-        text_ligne = font_small.render(ligne, True, WHITE)
+        text_ligne = cache_texte.texte(font_small, ligne, WHITE)
         screen.blit(text_ligne, (30, y_texte))
         y_texte += 25
 
     # Indicateur d'étape
-    text_etape = font_small.render(f"Étape {tutoriel.etape + 1}/{len(tutoriel.etapes)}", True, GRAY)
+    text_etape = cache_texte.texte(font_small, f"Étape {tutoriel.etape + 1}/{len(tutoriel.etapes)}", GRAY)
     screen.blit(text_etape, (30, 290))
 
     # Instruction pour masquer
-    text_masquer = font_small.render("T: Masquer/Afficher tutoriel", True, GRAY)
-    screen.blit(text_masquer, (350, 290))
+    text_masquer = cache_texte.texte(font_small, "T: Masquer/Afficher tutoriel", GRAY)
+    screen.blit(text_masquer, (510 - text_masquer.get_width(), 290))  # Dans le panneau
 
 
 def dessiner_aide_touches(screen):
@@ -555,79 +755,548 @@ def dessiner_aide_touches(screen):
         "0-5: Vitesses (0=N, 1-5)",
         "N: Marche arrière",
         "←→: Direction",
+        "RETOUR ARR.: Revenir en arrière",
         "ESC: Quitter"
     ]
 
-    y = 340
+    y = 280
     for ligne in aide:
-        text = font_small.render(ligne, True, WHITE)
+        text = cache_texte.texte(font_small, ligne, WHITE)
         # Fond semi-transparent
-        s = pygame.Surface((text.get_width() + 10, text.get_height() + 4))
-        s.set_alpha(150)
-        s.fill(BLACK)
+        s = cache_texte.fond((text.get_width() + 10, text.get_height() + 4), BLACK, 150)
         screen.blit(s, (SCREEN_WIDTH - text.get_width() - 15, y - 2))
         screen.blit(text, (SCREEN_WIDTH - text.get_width() - 10, y))
         y += 22
 
 
-def gerer_pedales(keys, voiture):
-    """Gère les entrées clavier pour les pédales (système progressif)"""
-    # Embrayage: A, Z, E, R
-    embrayage = 0
-    if keys[pygame.K_a]:
-        embrayage = 1
-        if keys[pygame.K_z]:
-            embrayage = 2
-            if keys[pygame.K_e]:
-                embrayage = 3
-                if keys[pygame.K_r]:
-                    embrayage = 4
-    voiture.embrayage = embrayage
-
-    # Frein: Q, S, D, F
-    frein = 0
-    if keys[pygame.K_q]:
-        frein = 1
-        if keys[pygame.K_s]:
-            frein = 2
-            if keys[pygame.K_d]:
-                frein = 3
-                if keys[pygame.K_f]:
-                    frein = 4
-    voiture.frein = frein
-
-    # Accélérateur: W, X, C, V
-    accelerateur = 0
-    if keys[pygame.K_w]:
-        accelerateur = 1
-        if keys[pygame.K_x]:
-            accelerateur = 2
-            if keys[pygame.K_c]:
-                accelerateur = 3
-                if keys[pygame.K_v]:
-                    accelerateur = 4
-    voiture.accelerateur = accelerateur
-
-    # Direction
-    voiture.direction = 0
-    if keys[pygame.K_LEFT]:
-        voiture.direction = -1
-    elif keys[pygame.K_RIGHT]:
-        voiture.direction = 1
-
-
-def main():
+def dessiner_retour(screen, secondes):
+    """Bandeau affiché pendant le retour en arrière"""
+    text = cache_texte.texte(font_medium, f"<< RETOUR EN ARRIÈRE ({secondes:.1f} s disponibles)",
+                             YELLOW)
+    x = (SCREEN_WIDTH - text.get_width()) // 2
+    screen.blit(cache_texte.fond((text.get_width() + 20, text.get_height() + 10), BLACK, 180),
+                (x - 10, 15))
+    screen.blit(text, (x, 20))
+
+
+# Panneau du mode examen (textes re-rendus seulement quand ils changent)
+_affichage_examen = {"lignes": None, "surfaces": []}
+
+
+def dessiner_examen(screen, lignes):
+    """Relevés de l'examen en cours, sous le tutoriel"""
+    if lignes != _affichage_examen["lignes"]:
+        _affichage_examen["lignes"] = lignes
+        _affichage_examen["surfaces"] = [font_small.render(l, True, WHITE) for l in lignes]
+    screen.blit(cache_texte.fond((500, 110), BLACK, 180), (20, 323))
+    pygame.draw.rect(screen, YELLOW, (20, 323, 500, 110), 1)
+    screen.blit(cache_texte.texte(font_small, "EXAMEN", YELLOW), (30, 327))
+    y = 348
+    for surface in _affichage_examen["surfaces"]:
+        screen.blit(surface, (30, y))
+        y += 20
+
+
+def _sans_mesure(etape):
+    pass
+
+
+def dessiner_frame(screen, voiture, tutoriel, profileur=None, cible=None, trafic=None):
+    """Dessine une image complète
+
+    Avec une cible de rendu, la scène (ciel, paysage, route) est dessinée à
+    la résolution interne de la cible puis agrandie ; le HUD reste dessiné
+    en résolution logique.
+    """
+    marquer = profileur.marquer if profileur is not None else _sans_mesure
+    scene = screen if cible is None else cible.scene
+
+    dessiner_ciel(scene, voiture.position_route)
+    marquer("ciel")
+    dessiner_paysage(scene, voiture.position_route)
+    marquer("paysage")
+    dessiner_route(scene, voiture.position_route, voiture.position_laterale, trafic=trafic)
+    marquer("route")
+    if cible is not None:
+        cible.composer()
+        marquer("mise_a_l_echelle")
+
+    dessiner_tableau_bord(screen, voiture)
+    marquer("tableau_bord")
+    dessiner_pedales(screen, voiture)
+    marquer("pedales_hud")
+    dessiner_aide_touches(screen)
+    marquer("aide_touches")
+    dessiner_tutoriel(screen, tutoriel)
+    marquer("tutoriel_hud")
+
+
+# Résolution interne de la scène et qualité dynamique
+class CibleRendu:
+    """Écran logique dont la scène peut être dessinée à une résolution réduite"""
+
+    def __init__(self, screen, echelle=1.0):
+        self.screen = screen
+        self.zone_scene = screen.subsurface((0, 0, screen.get_width(), Y_BAS_ROUTE))
+        self.echelle = None
+        self.scene = self.zone_scene
+        self.regler_echelle(echelle)
+
+    def regler_echelle(self, echelle):
+        """Change la résolution interne de la scène (1.0 : pleine résolution)"""
+        if echelle == self.echelle:
+            return
+        self.echelle = echelle
+        if echelle >= 1.0:
+            self.scene = self.zone_scene  # Dessin direct, sans agrandissement
+        else:
+            largeur, hauteur = self.zone_scene.get_size()
+            self.scene = pygame.Surface((round(largeur * echelle), round(hauteur * echelle))).convert()
+
+    def composer(self):
+        """Agrandit la scène dans l'écran logique (sans allocation)"""
+        if self.scene is not self.zone_scene:
+            pygame.transform.scale(self.scene, self.zone_scene.get_size(), self.zone_scene)
+
+
+class ControleurQualite:
+    """Baisse l'échelle de la scène quand le budget d'image est dépassé, la remonte avec de la marge"""
+
+    def __init__(self, budget_ms=1000 / 60, echelles=(1.0, 0.75, 0.5), fenetre=30,
+                 seuil_haut=0.85, seuil_bas=0.5, patience=4, echelle=1.0):
+        self.budget_ms = budget_ms
+        self.echelles = echelles
+        self.fenetre = fenetre  # Nombre d'images par moyenne
+        self.seuil_haut = seuil_haut
+        self.seuil_bas = seuil_bas
+        self.patience = patience  # Moyennes confortables nécessaires avant de remonter
+        # Départ : premier niveau qui ne dépasse pas l'échelle demandée (--echelle)
+        self.niveau = next((i for i, e in enumerate(echelles) if e <= echelle), len(echelles) - 1)
+        self.somme = 0.0
+        self.images = 0
+        self.confortables = 0
+
+    def ajouter(self, duree_ms):
+        """Prend en compte le temps de calcul d'une image et renvoie l'échelle à utiliser"""
+        self.somme += duree_ms
+        self.images += 1
+        if self.images >= self.fenetre:
+            moyenne = self.somme / self.images
+            self.somme = 0.0
+            self.images = 0
+            if moyenne > self.budget_ms * self.seuil_haut:
+                self.confortables = 0
+                self.niveau = min(self.niveau + 1, len(self.echelles) - 1)
+            elif moyenne < self.budget_ms * self.seuil_bas:
+                self.confortables += 1
+                if self.confortables >= self.patience:
+                    self.confortables = 0
+                    self.niveau = max(self.niveau - 1, 0)
+            else:
+                self.confortables = 0
+        return self.echelles[self.niveau]
+
+
+# Rétroviseurs : la scène vue de derrière, dessinée dans de petites surfaces
+# réutilisées, à une cadence réduite et en décalé (pas tous à la même image)
+RETROVISEURS = (
+    # Position à l'écran, taille affichée, échelle de la scène (champ étroit : on
+    # n'en montre que le bas, autour de l'horizon), décalage de la caméra (m), lacet.
+    # Cadres hors de l'affichage : le miroir intérieur entre le bandeau de retour
+    # (y < 60) et le véhicule devant (y >= 128), à droite du tutoriel (x >= 520) ;
+    # ceux des portières entre le panneau d'examen (y < 434) et le tableau de bord
+    ((560, 66), (260, 56), 0.21, 0.0, 0.0),
+    ((10, 440), (150, 56), 0.20, -1.0, -0.12),
+    ((SCREEN_WIDTH - 160, 440), (150, 56), 0.20, 1.0, 0.12),
+)
+
+
+class Retroviseurs:
+    """Vues arrière redessinées une image sur `periode`, recopiées à chaque image"""
+
+    def __init__(self, periode=2, retroviseurs=RETROVISEURS):
+        self.periode = max(1, periode)
+        self.images = 0
+        self.miroirs = []
+        for position, (largeur, hauteur), echelle, decalage, lacet in retroviseurs:
+            surface = pygame.Surface((round(SCREEN_WIDTH * echelle),
+                                      round(Y_BAS_ROUTE * echelle))).convert()
+            cadrage = pygame.Rect((surface.get_width() - largeur) // 2,
+                                  surface.get_height() - hauteur, largeur, hauteur)
+            self.miroirs.append((surface, cadrage, position, decalage, lacet))
+
+    def mettre_a_jour(self, voiture, trafic=None):
+        """Redessine les rétroviseurs dont c'est le tour ; renvoie True si l'un a changé"""
+        redessine = False
+        for i, (surface, cadrage, _, decalage, lacet) in enumerate(self.miroirs):
+            if (self.images + i) % self.periode == 0:
+                dessiner_miroir(surface, cadrage, voiture, decalage, lacet, trafic)
+                redessine = True
+        self.images += 1
+        return redessine
+
+    def dessiner(self, screen):
+        """Recopie les rétroviseurs à l'écran et renvoie les rectangles couverts"""
+        rects = []
+        for surface, cadrage, (x, y), _, _ in self.miroirs:
+            cadre = pygame.Rect(x - 4, y - 4, cadrage.width + 8, cadrage.height + 8)
+            pygame.draw.rect(screen, BLACK, cadre, border_radius=6)
+            screen.blit(surface, (x, y), cadrage)
+            rects.append(cadre)
+        return rects
+
+
+def dessiner_miroir(surface, cadrage, voiture, decalage=0.0, lacet=0.0, trafic=None):
+    """Scène vue de derrière (les décors défilent dans l'autre sens)"""
+    dessiner_ciel(surface, -voiture.position_route)
+    dessiner_paysage(surface, -voiture.position_route)
+    dessiner_route(surface, voiture.position_route, voiture.position_laterale,
+                   arriere=True, decalage=decalage, lacet=lacet, trafic=trafic)
+    if decalage:
+        # Flanc de la voiture, du côté intérieur du rétroviseur
+        largeur = cadrage.width // 6
+        x = cadrage.right - largeur if decalage < 0 else cadrage.left
+        surface.fill(DARK_GRAY, (x, cadrage.top + cadrage.height // 3, largeur, cadrage.height))
+
+
+# Affichage du profileur (F3)
+_affichage_profileur = {"images": -1, "lignes": []}
+
+
+def dessiner_profileur(screen, profileur, rafraichissement=15, latence=None):
+    """Dessine les temps par étape (min/moy/p99), la latence des entrées, l'efficacité du
+    cache de textes et la courbe des images"""
+    # Les textes ne sont re-rendus que toutes les `rafraichissement` images
+    # (hors du cache partagé, pour ne pas en évincer les textes du HUD)
+    if profileur.images - _affichage_profileur["images"] >= rafraichissement:
+        _affichage_profileur["images"] = profileur.images
+        lignes = [[font_small.render(t, True, YELLOW) for t in ("étape (ms)", "min", "moy", "p99")]]
+        for nom, valeurs in profileur.statistiques().items():
+            lignes.append([font_small.render(nom, True, WHITE)]
+                          + [font_small.render(f"{v:.2f}", True, WHITE) for v in valeurs])
+        if latence is not None:
+            lignes.append([font_small.render(f"latence entrée -> écran : {latence:.1f} ms",
+                                             True, YELLOW)])
+        cache = cache_texte.statistiques()
+        demandes = cache["hits"] + cache["misses"]
+        lignes.append([font_small.render(
+            f"cache textes : {cache['hits']} hits, {cache['misses']} misses "
+            f"({cache['hits'] / demandes * 100 if demandes else 0:.1f} %), "
+            f"{cache['entrees']}/{cache['capacite']}", True, YELLOW)])
+        _affichage_profileur["lignes"] = lignes
+
+    x, y, largeur = SCREEN_WIDTH - 440, 10, 430
+    hauteur = 15 * len(_affichage_profileur["lignes"]) + 70  # Textes, puis la courbe
+    screen.blit(cache_texte.fond((largeur, hauteur), BLACK, 200), (x, y))
+    pygame.draw.rect(screen, WHITE, (x, y, largeur, hauteur), 1)
+
+    # Colonnes : nom à gauche, valeurs alignées à droite
+    ty = y + 5
+    for ligne in _affichage_profileur["lignes"]:
+        screen.blit(ligne[0], (x + 8, ty))
+        for colonne, texte in enumerate(ligne[1:]):
+            droite = x + 230 + colonne * 70
+            screen.blit(texte, (droite - texte.get_width(), ty))
+        ty += 15
+
+    # Courbe des temps d'image (une barre par image, budget de 16,7 ms en pointillé)
+    gx, gy, gh = x + 8, y + hauteur - 8, 50
+    echelle = gh / 33.3  # Hauteur pleine : deux budgets d'image
+    n = min(profileur.nombre(), largeur - 16)
+    colonnes = profileur.colonnes
+    for k in range(n):
+        indice = ((profileur.images - n + k) % profileur.taille) * colonnes + colonnes - 1
+        ms = profileur.mesures[indice] * 1000
+        h = min(gh, int(ms * echelle))
+        pygame.draw.line(screen, GREEN if ms <= 16.7 else RED, (gx + k, gy), (gx + k, gy - h))
+    for bx in range(gx, gx + largeur - 16, 6):
+        pygame.draw.line(screen, GRAY, (bx, gy - gh // 2), (bx + 2, gy - gh // 2))
+
+
+def signature_trafic(trafic, position_route, distance=300.0):
+    """Abscisses arrondies des véhicules devant la caméra (rendu partiel)"""
+    if trafic is None:
+        return None
+    s = position_route / UNITES_PAR_METRE
+    return tuple((trafic.s[trafic.indices_entre(s, s + distance)] * 4).astype(int).tolist())
+
+
+def texte_vehicule_devant(trafic, voiture):
+    """Distance et temps d'intervalle avec le véhicule de devant (règle des deux secondes)"""
+    devant = trafic.vehicule_devant(voiture.position_route / UNITES_PAR_METRE,
+                                    voiture.position_laterale * METRES_PAR_LATERAL)
+    if devant is None:
+        return None
+    distance = devant[0]
+    vitesse = voiture.vitesse_actuelle / 3.6
+    if vitesse < 1.0:
+        return f"Véhicule devant : {distance:.0f} m", WHITE
+    intervalle = distance / vitesse
+    return f"Véhicule devant : {distance:.0f} m ({intervalle:.1f} s)", RED if intervalle < 2 else WHITE
+
+
+def dessiner_vehicule_devant(screen, texte):
+    if texte is None:
+        return
+    text = cache_texte.texte(font_small, *texte)
+    x = (SCREEN_WIDTH - text.get_width()) // 2
+    screen.blit(cache_texte.fond((text.get_width() + 12, text.get_height() + 6), BLACK, 160),
+                (x - 6, 131))
+    screen.blit(text, (x, 134))
+
+
+# Rendu par zones modifiées (rectangles sales)
+class ZoneEcran:
+    """Région de l'écran redessinée uniquement quand sa signature change"""
+
+    def __init__(self, nom, rect, signature, calques):
+        self.nom = nom
+        self.rect = pygame.Rect(rect)
+        self.signature = signature  # Fonction renvoyant l'état visible de la zone
+        self.calques = calques  # Fonctions de dessin, dans l'ordre d'empilement
+        self.derniere_signature = None
+
+
+class RenduPartiel:
+    """Ne redessine et ne présente que les zones dont l'état a changé"""
+
+    def __init__(self, screen, voiture, tutoriel, lignes_examen=None, trafic=None,
+                 secondes_retour=None):
+        self.screen = screen
+        self.voiture = voiture
+        self.tutoriel = tutoriel
+        self.premiere_image = True
+
+        v, t = voiture, tutoriel
+        # Les bords de la route ne sont couverts par aucun calque : on les efface
+        # pour que l'aide semi-transparente ne s'accumule pas d'une image à l'autre
+        effacer = lambda: screen.fill(BLACK)
+        ciel = lambda: dessiner_ciel(screen, v.position_route)
+        paysage = lambda: dessiner_paysage(screen, v.position_route)
+        route = lambda: dessiner_route(screen, v.position_route, v.position_laterale,
+                                       trafic=trafic)
+        tableau = lambda: dessiner_tableau_bord(screen, v)
+        pedales = lambda: dessiner_pedales(screen, v)
+        aide = lambda: dessiner_aide_touches(screen)
+        tuto = lambda: dessiner_tutoriel(screen, t)
+        self.lignes_examen = lignes_examen  # Fonction renvoyant les lignes du panneau d'examen
+        self.trafic = trafic
+        self.secondes_retour = None
+
+        # Scène complète (ciel, arbres, route avec le décor des cartes et le trafic, panneaux
+        # superposés) : les zones qui la recouvrent la redessinent entière sous leur rectangle.
+        # Liste partagée : les calques ajoutés plus bas valent pour toutes ces zones
+        scene = [effacer, ciel, paysage, route, aide, tuto] + (
+            [self._dessiner_examen] if lignes_examen else [])
+        self.zones = [
+            ZoneEcran("paysage", (0, 0, SCREEN_WIDTH, 500),
+                      lambda: (int(v.position_route), round(v.position_laterale, 1),
+                               signature_trafic(trafic, v.position_route)),
+                      scene),
+            # Le panneau descend sous l'horizon (Y_HORIZON) : route comprise
+            ZoneEcran("tutoriel", (20, 20, 500, 300), lambda: (t.afficher, t.etape), scene),
+            # Aiguilles (résolution d'environ un pixel en bout d'aiguille)
+            ZoneEcran("compteur", (170, 520, 160, 160),
+                      lambda: round(max(0, min(130, v.vitesse_actuelle)) * 2),
+                      [tableau]),
+            ZoneEcran("compte_tours", (420, 520, 160, 160),
+                      lambda: round(max(0, min(7000, v.regime_moteur)) / 30),
+                      [tableau]),
+            ZoneEcran("indicateurs", (590, 515, 200, 120),
+                      lambda: (v.vitesse_engagee, v.moteur_demarre, v.frein_main, v.cale),
+                      [tableau]),
+            ZoneEcran("pedales", (840, 515, 440, 205),
+                      lambda: (v.embrayage, v.frein, v.accelerateur),
+                      [tableau, pedales]),
+        ]
+        if trafic is not None:
+            # Texte arrondi au mètre et au dixième de seconde : peu de redessins
+            # Le texte est sous l'horizon et peut croiser le tutoriel : scène complète
+            scene.append(lambda: dessiner_vehicule_devant(screen, texte_vehicule_devant(trafic, v)))
+            self.zones.append(ZoneEcran("vehicule_devant", (340, 128, 600, 30),
+                                        lambda: texte_vehicule_devant(trafic, v), scene))
+        if secondes_retour is not None:
+            # Bandeau du retour en arrière : secondes disponibles, None hors recul
+            self.secondes_retour = secondes_retour
+            scene.append(self._dessiner_retour)
+            self.zones.append(ZoneEcran("retour", (SCREEN_WIDTH // 2 - 350, 10, 700, 50),
+                                        lambda: (None if secondes_retour() is None
+                                                 else round(secondes_retour(), 1)),
+                                        scene))
+        if lignes_examen is not None:
+            self.zones.append(ZoneEcran("examen", (20, 323, 500, 110), lignes_examen,
+                                        [ciel, paysage, route, self._dessiner_examen]))
+
+    def _dessiner_examen(self):
+        dessiner_examen(self.screen, self.lignes_examen())
+
+    def _dessiner_retour(self):
+        secondes = self.secondes_retour()
+        if secondes is not None:
+            dessiner_retour(self.screen, secondes)
+
+    def dessiner(self):
+        """Redessine les zones modifiées et renvoie les rectangles à présenter"""
+        if self.premiere_image:
+            self.premiere_image = False
+            for zone in self.zones:
+                zone.derniere_signature = zone.signature()
+            self.screen.fill(BLACK)
+            dessiner_frame(self.screen, self.voiture, self.tutoriel, trafic=self.trafic)
+            if self.trafic is not None:
+                dessiner_vehicule_devant(self.screen, texte_vehicule_devant(self.trafic, self.voiture))
+            if self.lignes_examen is not None:
+                self._dessiner_examen()
+            if self.secondes_retour is not None:
+                self._dessiner_retour()
+            return [self.screen.get_rect()]
+
+        rects = []
+        for zone in self.zones:
+            signature = zone.signature()
+            if signature == zone.derniere_signature:
+                continue
+            zone.derniere_signature = signature
+            if any(r.contains(zone.rect) for r in rects):
+                continue  # Déjà redessinée par une zone englobante
+            self.screen.set_clip(zone.rect)
+            for calque in zone.calques:
+                calque()
+            self.screen.set_clip(None)
+            rects.append(zone.rect)
+        return rects
+
+    def invalider(self):
+        """Force un rendu complet à la prochaine image"""
+        self.premiere_image = True
+
+
+# Touches des événements discrets
+TOUCHES_EVENEMENTS = {
+    pygame.K_RETURN: EVT_MOTEUR,
+    pygame.K_SPACE: EVT_ESPACE,
+    pygame.K_t: EVT_TUTORIEL,
+    pygame.K_n: EVT_VITESSE,  # Marche arrière
+    pygame.K_0: EVT_VITESSE + 1,  # Point mort
+    pygame.K_1: EVT_VITESSE + 2,
+    pygame.K_2: EVT_VITESSE + 3,
+    pygame.K_3: EVT_VITESSE + 4,
+    pygame.K_4: EVT_VITESSE + 5,
+    pygame.K_5: EVT_VITESSE + 6,
+}
+
+
+def main(rendu_partiel=False, frequence=FREQUENCE_PHYSIQUE, enregistrer=None, rejouer=None,
+         echelle=1.0, qualite_auto=False, plein_ecran=False, redimensionnable=False,
+         profil=None, telemetrie=None, manette=None, classe=None, poste="poste",
+         cadence_classe=10.0, fps=None, cadence="precis", examen=False, muet=False,
+         retroviseurs=0, trafic=0, carte=None, capture=None, format_capture="png",
+         decimation_capture=1):
     """Fonction principale"""
-    clock = pygame.time.Clock()
-    voiture = Voiture()
+    screen = initialiser_affichage(plein_ecran, redimensionnable, vsync=(cadence == "vsync"))
+    if cadence == "vsync" and not vsync_actif:
+        print("Synchronisation verticale indisponible : cadence logicielle", file=sys.stderr)
+        cadence = "precis"
+    if fps is None:
+        fps = 0 if cadence == "vsync" else 60.0  # En vsync, l'écran donne la cadence
+    cadenceur = Cadenceur(fps, cadence)
+    moteur_sonore = None if muet else creer_moteur_sonore()
+    # Capture vidéo : copie de chaque image présentée, écrite par un fil à part
+    dossier_capture = capture
+    capture = (Capture(dossier_capture, screen.get_size(), format_capture, decimation_capture)
+               if capture else None)
+
+    # Enregistrement des entrées ou relecture à vitesse réelle (avec la voiture enregistrée)
+    relecteur = None
+    if rejouer:
+        relecteur = Relecteur(rejouer)
+        frequence = relecteur.frequence
+        profil = relecteur.profil
+    voiture = Voiture(profil)
     tutoriel = Tutoriel()
+    # Dernières secondes de conduite (touche Retour arrière maintenue pour reculer)
+    retour = TamponRetour(frequence)
+    if relecteur is not None:
+        relecteur.demarrer(voiture, tutoriel, retour)  # Avant le premier instantané : départ enregistré
+    retour.enregistrer(voiture, tutoriel)
+    enregistreur = Enregistreur(enregistrer, frequence, profil) if enregistrer else None
+    capteur = Telemetrie(telemetrie, frequence, profil) if telemetrie else None
+    entrees = Entrees(charger_config_manette(manette) if manette else None)
+    # État envoyé au moniteur par un fil asyncio (la boucle ne fait que le déposer)
+    if classe:
+        hote, _, port = classe.rpartition(":")
+        salle = PosteClasse(hote or "127.0.0.1", int(port), poste, cadence_classe)
+    else:
+        salle = None
+
+    ordonnanceur = Ordonnanceur(voiture, frequence)
+    vue = ordonnanceur.vue  # État interpolé lu par les fonctions de dessin
+
+    # Mode examen : relevés à chaque pas, affichés en direct et résumés à la sortie
+    examen = Examen() if examen else None
+    lignes_examen = (lambda: lignes_resume(examen.resultats(frequence))) if examen else None
+
+    # Itinéraire d'une carte : seuls les blocs autour de la voiture sont en mémoire
+    if carte:
+        charger_carte(carte)
+
+    # Autres usagers (NumPy nécessaire), mis à jour une fois par image autour de la vue
+    if trafic:
+        from trafic import Trafic
+        trafic = Trafic(get_route().longueur, trafic)
+    else:
+        trafic = None
+    recul = False  # Touche Retour arrière maintenue (mis à jour à chaque image)
+    rendu = (RenduPartiel(screen, vue, tutoriel, lignes_examen, trafic,
+                          lambda: retour.secondes_disponibles() if recul else None)
+             if rendu_partiel else None)
+
+    # Résolution interne de la scène (le rendu partiel dessine toujours en pleine résolution)
+    cible = CibleRendu(screen, echelle) if rendu is None else None
+    # Budget : période d'image visée (60 images/s sans cible logicielle : vsync ou libre)
+    controleur = (ControleurQualite(1000 / (fps or 60.0), echelle=echelle)
+                  if qualite_auto and cible is not None else None)
+    # Rétroviseurs redessinés une image sur `retroviseurs` (0 : sans rétroviseurs)
+    miroirs = Retroviseurs(retroviseurs) if retroviseurs else None
+
+    # Profileur (F3 : affichage, F4 : export CSV)
+    profileur = Profileur()
+    afficher_profil = False
+
+    def avant_pas(tick):
+        # Commandes lues à chaque pas de physique (ou relues depuis l'enregistrement)
+        if relecteur is not None:
+            relecteur.avant_pas(tick)
+        else:
+            # Début du pas en temps réel : fin de l'attente moins le temps restant à simuler
+            entrees.appliquer(voiture, cadenceur.precedent - ordonnanceur.accumulateur)
+            if enregistreur is not None:
+                enregistreur.pedales(voiture)
+        profileur.marquer("pedales")
+
+    def apres_pas(tick):
+        profileur.marquer("physique")
+        if enregistreur is not None:
+            enregistreur.ticks(1)
+        tutoriel.mettre_a_jour(voiture)
+        retour.enregistrer(voiture, tutoriel)
+        if capteur is not None:
+            capteur.capturer(tick * ordonnanceur.dt, voiture)
+        if examen is not None:
+            examen(tick, voiture)
+        profileur.marquer("tutoriel")
+
     running = True
+    presentee = True  # Image précédente présentée (en vsync, l'écran a donné la cadence)
 
     while running:
-        dt = clock.tick(60) / 1000.0  # Delta time en secondes
+        # Delta time en secondes ; commandes relevées et datées pendant l'attente
+        dt = cadenceur.attendre(presentee, entrees.relever if relecteur is None else None)
+        profileur.debut_image()
 
         # Gestion des événements
         for event in pygame.event.get():
+            entrees.gerer_evenement(event)
             if event.type == pygame.QUIT:
                 running = False
 
@@ -636,67 +1305,185 @@ def main():
                 if event.key == pygame.K_ESCAPE:
                     running = False
 
-                # Démarrer/Couper le moteur
-                elif event.key == pygame.K_RETURN:
-                    if voiture.moteur_demarre:
-                        voiture.couper_moteur()
-                    else:
-                        voiture.demarrer_moteur()
-
-                # Frein à main
-                elif event.key == pygame.K_SPACE:
-                    if tutoriel.etape == 0 or tutoriel.etape == 1:
-                        tutoriel.etape_suivante(voiture)
-                    else:
-                        voiture.frein_main = not voiture.frein_main
-
-                # Vitesses
-                elif event.key == pygame.K_0:
-                    voiture.changer_vitesse(0)  # Point mort
-                elif event.key == pygame.K_1:
-                    voiture.changer_vitesse(1)
-                elif event.key == pygame.K_2:
-                    voiture.changer_vitesse(2)
-                elif event.key == pygame.K_3:
-                    voiture.changer_vitesse(3)
-                elif event.key == pygame.K_4:
-                    voiture.changer_vitesse(4)
-                elif event.key == pygame.K_5:
-                    voiture.changer_vitesse(5)
-                elif event.key == pygame.K_n:
-                    voiture.changer_vitesse(-1)  # Marche arrière
-
-                # Tutoriel
-                elif event.key == pygame.K_t:
-                    tutoriel.afficher = not tutoriel.afficher
-
-        # Gestion des touches maintenues (pédales)
-        keys = pygame.key.get_pressed()
-        gerer_pedales(keys, voiture)
-
-        # Mise à jour de la voiture
-        voiture.update(dt)
-
-        # Vérification des étapes du tutoriel
-        tutoriel.verifier_etape(voiture)
-        if tutoriel.etape >= 2:  # Après les étapes initiales
-            tutoriel.etape_suivante(voiture)
-
-        # Dessin
-        dessiner_ciel(screen, voiture.position_route)
-        dessiner_paysage(screen, voiture.position_route)
-        dessiner_route(screen, voiture.position_route, voiture.position_laterale)
-        dessiner_tableau_bord(screen, voiture)
-        dessiner_pedales(screen, voiture)
-        dessiner_aide_touches(screen)
-        dessiner_tutoriel(screen, tutoriel)
-
-        # Rafraîchissement de l'écran
-        pygame.display.flip()
-
+                # Moteur, frein à main, vitesses, tutoriel (ignorés en relecture)
+                elif event.key in TOUCHES_EVENEMENTS and relecteur is None:
+                    code = TOUCHES_EVENEMENTS[event.key]
+                    if enregistreur is not None:
+                        enregistreur.evenement(code)
+                    appliquer_evenement(code, voiture, tutoriel)
+
+                # Profileur
+                elif event.key == pygame.K_F3:
+                    afficher_profil = not afficher_profil
+                    if rendu is not None:
+                        rendu.invalider()
+                elif event.key == pygame.K_F4:
+                    profileur.exporter_csv(time.strftime("profil_%Y%m%d_%H%M%S.csv"))
+
+        if relecteur is None:
+            entrees.relever(pomper=False)  # pygame.event.get() vient de pomper
+        profileur.marquer("evenements")
+
+        # Retour en arrière tant que la touche est maintenue (physique suspendue),
+        # sinon mise à jour de la voiture par pas fixes (pédales lues avant chaque pas),
+        # puis vérification du tutoriel (pas de retour en arrière pendant un examen)
+        recul = (relecteur is None and examen is None
+                 and pygame.key.get_pressed()[pygame.K_BACKSPACE])
+        if recul:
+            if enregistreur is not None:
+                enregistreur.evenement(EVT_RETOUR)
+            appliquer_evenement(EVT_RETOUR, voiture, tutoriel, retour)
+            ordonnanceur.recaler()
+        else:
+            ordonnanceur.avancer(dt, avant_pas=avant_pas, apres_pas=apres_pas)
+        ordonnanceur.interpoler()
+        profileur.marquer("physique")
+        if trafic is not None:
+            trafic.mettre_a_jour(min(dt, 0.1), vue.position_route / UNITES_PAR_METRE,
+                                 vue.position_laterale * METRES_PAR_LATERAL,
+                                 vue.vitesse_actuelle / 3.6)
+            profileur.marquer("trafic")
+        if moteur_sonore is not None:
+            moteur_sonore.alimenter(voiture)
+            profileur.marquer("son")
+        if salle is not None:
+            salle.publier(voiture, tutoriel)
+
+        # Dessin et rafraîchissement de l'écran
+        if rendu is not None:
+            if afficher_profil:
+                rendu.invalider()  # Le profileur recouvre les zones : image complète
+            rects = rendu.dessiner()
+            profileur.marquer("rendu_partiel")
+            if miroirs is not None and (miroirs.mettre_a_jour(vue, trafic) or rects):
+                rects += miroirs.dessiner(screen)
+                profileur.marquer("retroviseurs")
+            if afficher_profil:
+                dessiner_profileur(screen, profileur, latence=entrees.latence_ms())
+                profileur.marquer("profileur")
+            if capture is not None:
+                capture.capturer(screen)  # Même inchangée, l'image garde sa place dans la vidéo
+                profileur.marquer("capture")
+            presentee = bool(rects)
+            if presentee:  # Rien n'a bougé : on ne présente pas l'image
+                pygame.display.update(rects)
+                entrees.image_presentee()
+        else:
+            dessiner_frame(screen, vue, tutoriel, profileur, cible, trafic)
+            if trafic is not None:
+                dessiner_vehicule_devant(screen, texte_vehicule_devant(trafic, vue))
+            if miroirs is not None:
+                miroirs.mettre_a_jour(vue, trafic)
+                miroirs.dessiner(screen)
+                profileur.marquer("retroviseurs")
+            if recul:
+                dessiner_retour(screen, retour.secondes_disponibles())
+            if examen is not None:
+                dessiner_examen(screen, lignes_examen())
+            if afficher_profil:
+                dessiner_profileur(screen, profileur, latence=entrees.latence_ms())
+                profileur.marquer("profileur")
+            if capture is not None:
+                capture.capturer(screen)
+                profileur.marquer("capture")
+            pygame.display.flip()
+            entrees.image_presentee()
+        profileur.marquer("presentation")
+        profileur.fin_image()
+
+        # Qualité dynamique : échelle de la scène selon le temps de calcul
+        if controleur is not None:
+            cible.regler_echelle(controleur.ajouter(profileur.derniere_image() * 1000))
+
+    if enregistreur is not None:
+        enregistreur.fermer()
+    if capteur is not None:
+        capteur.fermer()
+    if salle is not None:
+        salle.fermer()
+    if moteur_sonore is not None:
+        moteur_sonore.fermer()
+    if capture is not None:
+        afficher_capture(capture.fermer(), dossier_capture, capture.decimation)
+    if cadence == "libre":
+        afficher_resume(cadenceur.resume(), cadence)
+    if examen is not None:
+        print("Résultats de l'examen :")
+        for ligne in lignes_examen():
+            print("  " + ligne)
     pygame.quit()
     sys.exit()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Simulateur de Conduite - Permis B")
+    parser.add_argument("--rendu-partiel", action="store_true",
+                        help="ne redessiner et présenter que les zones modifiées")
+    parser.add_argument("--headless", action="store_true",
+                        help="simuler sans affichage (pilote vidéo SDL factice)")
+    parser.add_argument("--duree", type=float, default=10.0,
+                        help="durée simulée en secondes (avec --headless)")
+    parser.add_argument("--frequence", type=int, default=FREQUENCE_PHYSIQUE,
+                        help="fréquence de la physique en Hz")
+    parser.add_argument("--enregistrer", metavar="FICHIER",
+                        help="enregistrer les entrées de la séance")
+    parser.add_argument("--rejouer", metavar="FICHIER",
+                        help="rejouer une séance enregistrée à vitesse réelle")
+    parser.add_argument("--voiture", choices=profils_disponibles(),
+                        help="profil de voiture (par défaut : modèle historique)")
+    parser.add_argument("--telemetrie", metavar="DOSSIER",
+                        help="écrire l'état de la voiture à chaque pas (colonnes binaires)")
+    parser.add_argument("--manette", metavar="FICHIER",
+                        help="réglage des axes des manettes et pédaliers (JSON)")
+    parser.add_argument("--echelle", type=float, default=1.0,
+                        help="résolution interne de la scène (ex. 0.5 : moitié)")
+    parser.add_argument("--qualite-auto", action="store_true",
+                        help="ajuster la résolution interne selon le temps d'image")
+    parser.add_argument("--plein-ecran", action="store_true",
+                        help="plein écran, image mise à l'échelle par SDL")
+    parser.add_argument("--redimensionnable", action="store_true",
+                        help="fenêtre redimensionnable, image mise à l'échelle par SDL")
+    parser.add_argument("--retroviseurs", type=int, nargs="?", const=2, default=0, metavar="N",
+                        help="afficher les rétroviseurs, redessinés une image sur N (2 par défaut)")
+    parser.add_argument("--trafic", type=int, default=0, metavar="N",
+                        help="N autres véhicules sur la route (NumPy nécessaire)")
+    parser.add_argument("--carte", metavar="FICHIER",
+                        help="itinéraire d'une carte (tracé, panneaux, décor ; voir carte.py)")
+    parser.add_argument("--muet", action="store_true", help="sans le son du moteur")
+    parser.add_argument("--examen", action="store_true",
+                        help="mode examen : relevés de conduite en direct, résumé à la sortie")
+    parser.add_argument("--fps", type=float,
+                        help="images par seconde visées (60 par défaut, sans limite avec --vsync)")
+    parser.add_argument("--vsync", dest="cadence", action="store_const", const="vsync",
+                        default="precis", help="présenter les images au rafraîchissement de l'écran")
+    parser.add_argument("--libre", dest="cadence", action="store_const", const="libre",
+                        help="sans limite d'images par seconde (résumé des temps d'image à la sortie)")
+    parser.add_argument("--capture", metavar="DOSSIER",
+                        help="enregistrer la vidéo de la séance (images écrites par un fil à part)")
+    parser.add_argument("--format-capture", choices=FORMATS_CAPTURE, default="png",
+                        help="images PNG ou pixels bruts (video.raw)")
+    parser.add_argument("--decimation-capture", type=int, default=1, metavar="N",
+                        help="ne garder qu'une image sur N")
+    parser.add_argument("--classe", metavar="HOTE:PORT",
+                        help="envoyer l'état de la voiture au concentrateur de la salle (classe.py)")
+    parser.add_argument("--poste", default=socket.gethostname(),
+                        help="nom du poste affiché au moniteur (par défaut : nom de la machine)")
+    parser.add_argument("--cadence-classe", type=float, default=10.0,
+                        help="envois par seconde vers le concentrateur")
+    args = parser.parse_args()
+    if args.headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        afficher_resultat_headless(*executer_headless(args.duree, args.frequence,
+                                                      profil=args.voiture, telemetrie=args.telemetrie,
+                                                      t_lancement=_T_LANCEMENT))
+    else:
+        main(rendu_partiel=args.rendu_partiel, frequence=args.frequence,
+             enregistrer=args.enregistrer, rejouer=args.rejouer,
+             echelle=args.echelle, qualite_auto=args.qualite_auto,
+             plein_ecran=args.plein_ecran, redimensionnable=args.redimensionnable,
+             profil=args.voiture, telemetrie=args.telemetrie, manette=args.manette,
+             classe=args.classe, poste=args.poste, cadence_classe=args.cadence_classe,
+             fps=args.fps, cadence=args.cadence, examen=args.examen, muet=args.muet,
+             retroviseurs=args.retroviseurs, trafic=args.trafic, carte=args.carte,
+             capture=args.capture, format_capture=args.format_capture,
+             decimation_capture=args.decimation_capture)
@@ -0,0 +1,528 @@
+"""
+Simulateur de Conduite - Permis B
+Cœur de la simulation : physique de la voiture et tutoriel
+
+Ce module n'importe pas Pygame : il peut être utilisé sans affichage
+(tests, correction automatique, serveurs).
+
+Utilisation sans affichage :
+    python simulation.py --duree 10
+"""
+
+import time
+
+from motorisation import ChaineTraction, charger_profil, profils_disponibles
+
+# Instant d'import du module (mesure du temps jusqu'au premier pas)
+_T_IMPORT = time.perf_counter()
+
+# Plages de régime pour chaque vitesse (min optimal, max optimal)
+PLAGES_REGIME = {
+    1: (1000, 2500),
+    2: (1500, 3000),
+    3: (2000, 3500),
+    4: (2500, 4000),
+    5: (3000, 4500),
+}
+
+# Vitesses max par rapport (modèle historique)
+VITESSE_MAX_RAPPORT = {
+    -1: 20,
+    1: 30,
+    2: 50,
+    3: 70,
+    4: 100,
+    5: 130,
+}
+
+
+# Centre de la voie de l'élève, à droite de la ligne médiane (position_laterale 0) :
+# +1,75 m, la moitié d'une voie de 3,5 m (position_laterale 100)
+CENTRE_VOIE = 50
+
+
+# Classe Voiture
+class Voiture:
+    # Attributs fixes : pas de dictionnaire par instance
+    __slots__ = (
+        "moteur_demarre", "vitesse_actuelle", "regime_moteur", "vitesse_engagee",
+        "embrayage", "frein", "accelerateur", "direction", "frein_main",
+        "position_route", "position_laterale", "cale",
+        "plages_regime", "vitesse_max_rapport", "chaine",
+    )
+
+    def __init__(self, profil=None):
+        self.moteur_demarre = False
+        self.vitesse_actuelle = 0  # km/h
+        self.regime_moteur = 800  # RPM au ralenti
+        self.vitesse_engagee = 0  # 0 = point mort, 1-5 = vitesses, -1 = marche arrière
+        self.embrayage = 0  # 0-4 (0 = relâché, 4 = enfoncé à fond), fractionnaire en analogique
+        self.frein = 0  # 0-4
+        self.accelerateur = 0  # 0-4
+        self.direction = 0  # -1 gauche, 0 centre, 1 droite (continu en analogique)
+        self.frein_main = True
+        self.position_route = 0  # Position sur la route (pour l'animation)
+        self.position_laterale = CENTRE_VOIE  # Position latérale (-100 à 100), départ dans sa voie
+        self.cale = False
+
+        # Tables partagées entre toutes les voitures (jamais modifiées en place)
+        self.plages_regime = PLAGES_REGIME
+        self.vitesse_max_rapport = VITESSE_MAX_RAPPORT
+
+        # Profil de voiture (nom ou dictionnaire) : sans profil, modèle historique
+        self.chaine = None
+        if profil is not None:
+            if isinstance(profil, str):
+                profil = charger_profil(profil)
+            self.chaine = ChaineTraction(profil)
+            self.vitesse_max_rapport = {
+                r: round(v) for r, v in self.chaine.vitesses_max().items()
+            }
+
+    def update(self, dt):
+        if self.chaine is not None:
+            # Chaîne de traction tabulée du profil (couple, rapports, embrayage)
+            self.chaine.pas(self, dt)
+        elif not self.moteur_demarre:
+            self.regime_moteur = 0
+            return
+        else:
+            # Calcul du régime moteur
+            if self.vitesse_engagee == 0:  # Point mort
+                regime_cible = 800 + (self.accelerateur * 1500)
+            else:
+                # Régime basé sur la vitesse et le rapport engagé
+                if self.vitesse_engagee > 0:
+                    rapport = self.vitesse_engagee
+                    vitesse_max = self.vitesse_max_rapport[rapport]
+                    regime_base = 800 + (self.vitesse_actuelle / vitesse_max) * 5200
+                else:  # Marche arrière
+                    regime_base = 800 + (abs(self.vitesse_actuelle) / 20) * 3000
+
+                # Influence de l'accélérateur
+                if self.embrayage >= 3:  # Embrayage suffisamment enfoncé
+                    regime_cible = 800 + (self.accelerateur * 1500)
+                else:
+                    regime_cible = regime_base + (self.accelerateur * 500)
+
+            # Transition douce du régime
+            self.regime_moteur += (regime_cible - self.regime_moteur) * dt * 3
+            self.regime_moteur = max(0, min(7000, self.regime_moteur))
+
+            # Détection du calage
+            if self.vitesse_engagee != 0 and self.embrayage < 2:
+                if self.regime_moteur < 500 and self.vitesse_actuelle < 5:
+                    self.cale = True
+                    self.moteur_demarre = False
+                    self.regime_moteur = 0
+
+            # Calcul de la vitesse
+            if self.vitesse_engagee != 0 and self.embrayage < 4:
+                # Force motrice (dépend du régime et de l'embrayage)
+                coeff_embrayage = 1 - (self.embrayage / 4)
+                force_motrice = (self.accelerateur / 4) * coeff_embrayage
+
+                if self.vitesse_engagee > 0:
+                    vitesse_cible = force_motrice * self.vitesse_max_rapport[self.vitesse_engagee]
+                else:  # Marche arrière
+                    vitesse_cible = -force_motrice * 20
+
+                # Accélération/décélération
+                if not self.frein_main:
+                    acceleration = (vitesse_cible - self.vitesse_actuelle) * dt * 2
+                    self.vitesse_actuelle += acceleration
+
+        # Freinage
+        if self.frein > 0:
+            freinage = self.frein * 30 * dt
+            if self.vitesse_actuelle > 0:
+                self.vitesse_actuelle = max(0, self.vitesse_actuelle - freinage)
+            elif self.vitesse_actuelle < 0:
+                self.vitesse_actuelle = min(0, self.vitesse_actuelle + freinage)
+
+        # Frein à main (coefficients exprimés par image à 60 Hz, ramenés à dt)
+        if self.frein_main and abs(self.vitesse_actuelle) > 0:
+            self.vitesse_actuelle *= 0.95 ** (dt * 60)
+            if abs(self.vitesse_actuelle) < 0.5:
+                self.vitesse_actuelle = 0
+
+        # Friction naturelle (incluse dans la chaîne de traction d'un profil)
+        if self.chaine is None and self.accelerateur == 0 and self.vitesse_engagee == 0:
+            self.vitesse_actuelle *= 0.99 ** (dt * 60)
+
+        # Mise à jour de la position
+        self.position_route += self.vitesse_actuelle * dt * 10
+
+        # Direction
+        if abs(self.vitesse_actuelle) > 1:
+            self.position_laterale += self.direction * abs(self.vitesse_actuelle) * dt * 0.5
+            self.position_laterale = max(-100, min(100, self.position_laterale))
+
+    def demarrer_moteur(self):
+        if not self.moteur_demarre and self.embrayage >= 3:
+            self.moteur_demarre = True
+            self.cale = False
+            self.regime_moteur = 800
+            return True
+        return False
+
+    def couper_moteur(self):
+        self.moteur_demarre = False
+        self.regime_moteur = 0
+
+    def changer_vitesse(self, nouvelle_vitesse):
+        if self.embrayage >= 3:  # Embrayage enfoncé suffisamment
+            self.vitesse_engagee = nouvelle_vitesse
+            return True
+        return False
+
+
+# Classe Tutoriel
+class Tutoriel:
+    def __init__(self):
+        self.etape = 0
+        self.etapes = [
+            {
+                "titre": "Bienvenue au Simulateur de Conduite !",
+                "texte": [
+                    "Apprenez à conduire une voiture manuelle.",
+                    "",
+                    "Contrôles des pédales (progressifs) :",
+                    "- Embrayage : A, Z, E, R (de léger à fond)",
+                    "- Frein : Q, S, D, F",
+                    "- Accélérateur : W, X, C, V",
+                    "",
+                    "Appuyez sur ESPACE pour continuer..."
+                ],
+                "condition": lambda v: True
+            },
+            {
+                "titre": "Étape 1 : Vérifications avant démarrage",
+                "texte": [
+                    "Avant de démarrer :",
+                    "1. Vérifiez que le frein à main est serré (case verte)",
+                    "2. Vérifiez que vous êtes au point mort (N sur l'indicateur)",
+                    "",
+                    "Le frein à main est actuellement SERRÉ.",
+                    "Appuyez sur 0 pour mettre au point mort si nécessaire.",
+                    "",
+                    "Appuyez sur ESPACE quand c'est fait..."
+                ],
+                "condition": lambda v: v.frein_main and v.vitesse_engagee == 0
+            },
+            {
+                "titre": "Étape 2 : Démarrer le moteur",
+                "texte": [
+                    "Pour démarrer le moteur :",
+                    "1. Enfoncez l'embrayage à fond (A+Z+E+R)",
+                    "2. Appuyez sur ENTRÉE pour démarrer",
+                    "",
+                    "Maintenez A, puis ajoutez Z, E, et R",
+                    "L'indicateur d'embrayage doit être au maximum.",
+                    "",
+                    "Démarrez le moteur..."
+                ],
+                "condition": lambda v: v.moteur_demarre
+            },
+            {
+                "titre": "Étape 3 : Engager la première vitesse",
+                "texte": [
+                    "Moteur démarré ! Maintenant :",
+                    "1. Gardez l'embrayage enfoncé (A+Z+E+R)",
+                    "2. Appuyez sur 1 pour la première vitesse",
+                    "",
+                    "L'indicateur de vitesse passera de N à 1.",
+                    "",
+                    "Engagez la première..."
+                ],
+                "condition": lambda v: v.vitesse_engagee == 1
+            },
+            {
+                "titre": "Étape 4 : Desserrer le frein à main",
+                "texte": [
+                    "Parfait ! Première engagée.",
+                    "",
+                    "Appuyez sur ESPACE pour desserrer",
+                    "le frein à main.",
+                    "",
+                    "Gardez l'embrayage enfoncé !",
+                ],
+                "condition": lambda v: not v.frein_main
+            },
+            {
+                "titre": "Étape 5 : Démarrer en douceur",
+                "texte": [
+                    "C'est le moment délicat !",
+                    "",
+                    "1. Accélérez légèrement (W)",
+                    "2. Relâchez DOUCEMENT l'embrayage",
+                    "   (lâchez R, puis E, puis Z...)",
+                    "",
+                    "Si vous calez, recommencez !",
+                    "Objectif : atteindre 10 km/h"
+                ],
+                "condition": lambda v: v.vitesse_actuelle >= 10
+            },
+            {
+                "titre": "Bravo ! Vous roulez !",
+                "texte": [
+                    "Félicitations ! Vous avez réussi à démarrer !",
+                    "",
+                    "Continuez à pratiquer :",
+                    "- Passez la 2ème vers 20 km/h",
+                    "- Restez dans votre voie, à droite (flèches)",
+                    "- Freinez avec Q, S, D, F",
+                    "",
+                    "Bonne route !"
+                ],
+                "condition": lambda v: True
+            }
+        ]
+        self.afficher = True
+
+    def verifier_etape(self, voiture):
+        if self.etape < len(self.etapes) - 1:
+            if self.etapes[self.etape]["condition"](voiture):
+                pass  # Condition remplie, on peut passer à la suite
+
+    def etape_suivante(self, voiture):
+        if self.etape < len(self.etapes) - 1:
+            if self.etapes[self.etape]["condition"](voiture):
+                self.etape += 1
+
+    def get_etape_actuelle(self):
+        return self.etapes[self.etape]
+
+    def mettre_a_jour(self, voiture):
+        """Vérifie l'étape en cours après un pas de physique"""
+        self.verifier_etape(voiture)
+        if self.etape >= 2:  # Après les étapes initiales
+            self.etape_suivante(voiture)
+
+
+# Événements discrets (touches), indépendants de Pygame
+EVT_MOTEUR = 1  # Entrée : démarrer/couper le moteur
+EVT_ESPACE = 2  # Espace : frein à main (ou étape suivante au début du tutoriel)
+EVT_TUTORIEL = 3  # T : masquer/afficher le tutoriel
+EVT_RETOUR = 4  # Retour arrière : reculer d'un cran dans les dernières secondes (retour.py)
+EVT_VITESSE = 0x10  # + (rapport + 1) : 0x10 = marche arrière, 0x11 = point mort, ...
+
+
+def appliquer_evenement(code, voiture, tutoriel, retour=None):
+    """Applique un événement discret à la voiture et au tutoriel"""
+    # Démarrer/Couper le moteur
+    if code == EVT_MOTEUR:
+        if voiture.moteur_demarre:
+            voiture.couper_moteur()
+        else:
+            voiture.demarrer_moteur()
+
+    # Frein à main
+    elif code == EVT_ESPACE:
+        if tutoriel.etape == 0 or tutoriel.etape == 1:
+            tutoriel.etape_suivante(voiture)
+        else:
+            voiture.frein_main = not voiture.frein_main
+
+    # Tutoriel
+    elif code == EVT_TUTORIEL:
+        tutoriel.afficher = not tutoriel.afficher
+
+    # Retour en arrière
+    elif code == EVT_RETOUR:
+        if retour is not None:
+            retour.reculer(voiture, tutoriel)
+
+    # Vitesses
+    elif EVT_VITESSE <= code <= EVT_VITESSE + 6:
+        voiture.changer_vitesse(code - EVT_VITESSE - 1)
+
+
+# Pédales analogiques : valeurs quantifiées sur 12 bits, pour une relecture exacte
+PAS_ANALOGIQUES = 4095
+
+
+def niveau_analogique(q):
+    """Niveau de pédale (0.0-4.0) d'une valeur quantifiée 0-4095"""
+    return q * 4 / PAS_ANALOGIQUES
+
+
+def direction_analogique(q):
+    """Direction (-1.0 à 1.0) d'une valeur quantifiée 1-4095, 2048 étant le centre exact"""
+    return (q - 2048) / 2047
+
+
+def quantifier_pedale(x):
+    """Valeur quantifiée d'une pédale enfoncée de x (0.0-1.0)"""
+    return round(x * PAS_ANALOGIQUES)
+
+
+def quantifier_direction(d):
+    return round(d * 2047) + 2048
+
+
+# Ordonnanceur à pas fixe
+FREQUENCE_PHYSIQUE = 120  # Hz
+
+
+class VueInterpolee:
+    """Voiture vue par l'affichage : grandeurs continues interpolées entre deux pas"""
+
+    CHAMPS = ("position_route", "position_laterale", "vitesse_actuelle", "regime_moteur")
+
+    def __init__(self, voiture):
+        self.voiture = voiture
+        for nom in self.CHAMPS:
+            setattr(self, nom, getattr(voiture, nom))
+
+    def __getattr__(self, nom):
+        # Appelé seulement pour les attributs non interpolés (rapport, pédales...)
+        return getattr(self.voiture, nom)
+
+
+class Ordonnanceur:
+    """Avance la physique par pas fixes, indépendamment de la cadence d'affichage"""
+
+    def __init__(self, voiture, frequence=FREQUENCE_PHYSIQUE, pas_max=8):
+        self.voiture = voiture
+        self.dt = 1.0 / frequence
+        self.pas_max = pas_max  # Au-delà, le retard est abandonné (pas de spirale)
+        self.accumulateur = 0.0
+        self.tick = 0
+        self.precedent = self._capturer()
+        self.vue = VueInterpolee(voiture)
+
+    def _capturer(self):
+        v = self.voiture
+        return (v.position_route, v.position_laterale, v.vitesse_actuelle, v.regime_moteur)
+
+    def pas(self, avant_pas=None, apres_pas=None):
+        """Un pas de physique de durée dt"""
+        if avant_pas is not None:
+            avant_pas(self.tick)
+        self.precedent = self._capturer()
+        self.voiture.update(self.dt)
+        self.tick += 1
+        if apres_pas is not None:
+            apres_pas(self.tick)
+
+    def avancer(self, duree, avant_pas=None, apres_pas=None):
+        """Consomme le temps réel écoulé et renvoie le nombre de pas effectués"""
+        self.accumulateur += duree
+        n = 0
+        while self.accumulateur >= self.dt:
+            if n == self.pas_max:
+                self.accumulateur = 0.0
+                break
+            self.pas(avant_pas, apres_pas)
+            self.accumulateur -= self.dt
+            n += 1
+        return n
+
+    def recaler(self):
+        """Après un saut de l'état (retour en arrière) : pas d'interpolation depuis l'ancien"""
+        self.accumulateur = 0.0
+        self.precedent = self._capturer()
+
+    def executer(self, nombre_pas, avant_pas=None, apres_pas=None):
+        """Mode libre : enchaîne les pas aussi vite que possible, sans affichage"""
+        for _ in range(nombre_pas):
+            self.pas(avant_pas, apres_pas)
+
+    def interpoler(self):
+        """Met à jour la vue entre l'état précédent et l'état courant"""
+        alpha = self.accumulateur / self.dt
+        actuel = self._capturer()
+        for nom, a, b in zip(VueInterpolee.CHAMPS, self.precedent, actuel):
+            setattr(self.vue, nom, a + (b - a) * alpha)
+        return self.vue
+
+
+# Exécution sans affichage
+def scenario_demarrage(voiture, t):
+    """Pédales d'un démarrage en première : embrayage relâché progressivement sur 2 s"""
+    if t < 0.5:
+        voiture.embrayage = 4
+        voiture.accelerateur = 0
+    elif t < 2.5:
+        voiture.embrayage = max(0, 4 - int((t - 0.5) * 2.5))
+        voiture.accelerateur = 1
+    else:
+        voiture.embrayage = 0
+        voiture.accelerateur = 2
+
+
+def executer_headless(duree=10.0, frequence=FREQUENCE_PHYSIQUE, scenario=scenario_demarrage,
+                      profil=None, telemetrie=None, t_lancement=None):
+    """Fait rouler la voiture sans affichage (physique en mode libre) et renvoie les mesures
+
+    telemetrie : dossier où écrire l'état à chaque pas (voir telemetrie.py).
+    t_lancement : instant (time.perf_counter) où le programme a commencé ses
+    imports, par défaut l'import de ce module.
+    """
+    voiture = Voiture(profil)
+    tutoriel = Tutoriel()
+    ordonnanceur = Ordonnanceur(voiture, frequence)
+    capteur = None
+    if telemetrie:
+        from telemetrie import Telemetrie
+        capteur = Telemetrie(telemetrie, frequence, profil)
+
+    def apres_pas(tick):
+        tutoriel.mettre_a_jour(voiture)
+        if capteur is not None:
+            capteur.capturer(tick * ordonnanceur.dt, voiture)
+
+    # Préparation : point mort, embrayage enfoncé, moteur, première, frein à main
+    voiture.embrayage = 4
+    tutoriel.etape_suivante(voiture)
+    tutoriel.etape_suivante(voiture)
+    voiture.demarrer_moteur()
+    voiture.changer_vitesse(1)
+    voiture.frein_main = False
+
+    debut = time.perf_counter()
+    ordonnanceur.pas(lambda tick: scenario(voiture, 0.0), apres_pas)
+    premier_pas = time.perf_counter()
+    pas = int(round(duree * frequence))
+    ordonnanceur.executer(
+        pas - 1,
+        lambda tick: scenario(voiture, tick * ordonnanceur.dt),
+        apres_pas,
+    )
+    fin = time.perf_counter()
+    if capteur is not None:
+        capteur.fermer()
+
+    mesures = {
+        "pas": pas,
+        "import_premier_pas_ms": (premier_pas - (t_lancement or _T_IMPORT)) * 1000,
+        "pas_par_seconde": pas / (fin - debut) if fin > debut else float("inf"),
+        "etape_tutoriel": tutoriel.etape,
+    }
+    return voiture, mesures
+
+
+def afficher_resultat_headless(voiture, mesures):
+    """Affiche l'état final et les mesures d'une exécution sans affichage"""
+    print(f"Pas simulés : {mesures['pas']}")
+    print(f"Import -> premier pas : {mesures['import_premier_pas_ms']:.1f} ms")
+    print(f"Pas par seconde : {mesures['pas_par_seconde']:.0f}")
+    print(f"Vitesse : {voiture.vitesse_actuelle:.1f} km/h, "
+          f"régime : {voiture.regime_moteur:.0f} tr/min, "
+          f"rapport : {voiture.vitesse_engagee}, calé : {voiture.cale}")
+    print(f"Étape du tutoriel : {mesures['etape_tutoriel'] + 1}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulation sans affichage")
+    parser.add_argument("--duree", type=float, default=10.0, help="durée simulée en secondes")
+    parser.add_argument("--frequence", type=int, default=FREQUENCE_PHYSIQUE,
+                        help="fréquence de la physique en Hz")
+    parser.add_argument("--voiture", choices=profils_disponibles(),
+                        help="profil de voiture (par défaut : modèle historique)")
+    args = parser.parse_args()
+    afficher_resultat_headless(*executer_headless(args.duree, args.frequence,
+                                                  profil=args.voiture))
@@ -0,0 +1,217 @@
+"""
+Simulateur de Conduite - Permis B
+Son du moteur : synthèse par tables d'onde, dans le rappel du flux audio de SDL
+
+Le bruit du moteur suit regime_moteur (fréquence d'allumage d'un quatre
+cylindres quatre temps : deux explosions par tour) et la charge
+(accelerateur) : deux tables d'onde précalculées d'un cycle, l'une au
+ralenti, l'autre en charge, sont mélangées selon la pédale. Un calage
+joue un bref hoquet, moteur coupé le son s'éteint en fondu.
+
+Le son n'est pas mis en file sur un canal du mixer : un canal Pygame ne
+garde qu'un seul son en file, ce qui impose des blocs plus longs qu'une
+image. Le flux est ouvert avec pygame._sdl2.audio.AudioDevice, dont SDL
+appelle le rappel sur son fil audio à chaque bloc de TAILLE_BLOC
+échantillons ; le rappel synthétise le bloc avec des opérations NumPy sur
+place (sans allocation de tampon) et y ajoute le hoquet de calage. La
+boucle principale ne fait que transmettre, à chaque image, les consignes
+lues sur la voiture (alimenter).
+
+La latence vaut au plus deux blocs : le bloc synthétisé est joué quand
+le bloc en cours se termine (2 * TAILLE_BLOC échantillons, environ 23 ms
+quelle que soit la cadence d'affichage, voir latence_ms), plus l'âge des
+consignes, mises à jour à chaque image comme l'affichage. Le rappel prend
+le GIL : tant que le moteur sonore tourne, la boucle principale le cède
+toutes les INTERVALLE_GIL secondes au lieu de 5 ms. Si le rappel attend
+malgré tout plus d'un bloc, le son manque un instant, l'image n'attend
+jamais le son.
+
+Le flux remplace pygame.mixer (fermé) sur le premier périphérique de
+sortie déclaré par SDL, en général celui par défaut : AudioDevice de
+Pygame 2 n'ouvre que des périphériques nommés.
+
+NumPy est nécessaire ; sans lui, ou sans périphérique audio, le
+simulateur reste muet. Pour les essais : SDL_AUDIODRIVER=dummy.
+"""
+
+import math
+import sys
+
+import pygame
+
+FREQUENCE_AUDIO = 22050  # Hz
+TAILLE_BLOC = 256  # Échantillons par rappel de SDL (11,6 ms)
+INTERVALLE_GIL = 0.001  # s (sys.setswitchinterval) : bien moins qu'un bloc
+TAILLE_TABLE = 2048  # Échantillons par cycle d'allumage
+VOLUME = 0.5
+FONDU = 0.05  # s pour passer d'un volume à l'autre (évite les claquements)
+CYLINDRES = 4
+
+
+def tables_onde():
+    """Un cycle d'allumage au ralenti et en charge (float32, crête 1.0)"""
+    import numpy as np
+
+    phase = np.arange(TAILLE_TABLE) / TAILLE_TABLE * 2 * math.pi
+    # Ralenti : fondamentale et quelques harmoniques douces
+    ralenti = (np.sin(phase) + 0.5 * np.sin(2 * phase + 0.3)
+               + 0.25 * np.sin(3 * phase + 1.1) + 0.3 * np.sin(0.5 * phase))
+    # Charge : impulsion d'explosion plus riche en harmoniques (son plus rauque)
+    charge = sum(np.sin(k * phase + 0.7 * k) / k ** 0.8 for k in range(1, 16))
+    charge += 0.6 * np.exp(-((phase - 0.6) ** 2) * 8) - 0.2
+    tables = []
+    for table in (ralenti, charge):
+        table = table - table.mean()
+        tables.append((table / np.abs(table).max()).astype(np.float32))
+    return tables
+
+
+def son_calage(frequence):
+    """Hoquet de calage : quelques explosions qui ralentissent et s'éteignent (float32)"""
+    import numpy as np
+
+    duree = 0.6
+    t = np.arange(int(duree * frequence)) / frequence
+    cadence = 25.0 * np.exp(-t * 3)  # Explosions par seconde, de plus en plus espacées
+    phase = 2 * math.pi * np.cumsum(cadence) / frequence
+    onde = np.sin(phase) * np.exp(-t * 5) * (0.6 + 0.4 * np.sign(np.sin(phase / 2)))
+    return (onde * VOLUME * 32767).astype(np.float32)
+
+
+class MoteurSonore:
+    """Synthèse continue du bruit du moteur à partir de l'état de la voiture"""
+
+    def __init__(self):
+        import numpy as np
+        from pygame._sdl2 import audio, sdl2
+
+        self.np = np  # Gardé pour le rappel, appelé à chaque bloc
+        self.frequence = FREQUENCE_AUDIO
+        self.ralenti, self.charge = tables_onde()
+        self.calage = son_calage(self.frequence)
+        self.calage_lu = None  # Échantillons du hoquet déjà joués (None : silencieux)
+
+        # Tampons de travail, réutilisés à chaque bloc
+        n = TAILLE_BLOC
+        self.rampe = np.arange(n, dtype=np.float64)
+        self.rampe_carre = self.rampe ** 2 / (2 * n)  # Intégrale d'un glissement linéaire
+        self.rampe_unite = (self.rampe / n).astype(np.float32)
+        self.position = np.empty(n, dtype=np.float64)
+        self.glissement = np.empty(n, dtype=np.float64)
+        self.indices = np.empty(n, dtype=np.intp)
+        self.onde = np.empty(n, dtype=np.float32)
+        self.onde_charge = np.empty(n, dtype=np.float32)
+        self.gain = np.empty(n, dtype=np.float32)
+
+        self.phase = 0.0
+        self.increment = 0.0  # Pas dans la table par échantillon
+        self.melange = 0.0  # 0 : ralenti, 1 : pleine charge
+        self.volume = 0.0
+        self.cale = False
+        # Consignes (moteur tournant, régime, accélérateur), remplacées d'un bloc à chaque image
+        self.consignes = (False, 0.0, 0.0)
+
+        pygame.mixer.quit()  # Libère le périphérique pour le flux
+        sdl2.init_subsystem(sdl2.INIT_AUDIO)
+        sorties = audio.get_audio_device_names(False)
+        if not sorties:
+            raise pygame.error("aucun périphérique de sortie")
+        # allowed_changes=0 : SDL convertit si besoin, le rappel reçoit toujours ce format
+        self.peripherique = audio.AudioDevice(
+            devicename=sorties[0], iscapture=False, frequency=self.frequence,
+            audioformat=audio.AUDIO_S16, numchannels=1, chunksize=TAILLE_BLOC,
+            allowed_changes=0, callback=self._remplir)
+        self.intervalle_gil = sys.getswitchinterval()
+        sys.setswitchinterval(INTERVALLE_GIL)
+        self.peripherique.pause(0)
+
+    def latence_ms(self):
+        """Latence maximale entre l'état de la voiture et le haut-parleur
+
+        Un bloc est synthétisé quand SDL le demande, pendant que le bloc
+        précédent joue : il s'achève deux blocs plus tard. Les consignes,
+        elles, ont au plus une image de retard.
+        """
+        return 2 * TAILLE_BLOC / self.frequence * 1000
+
+    def alimenter(self, voiture):
+        """Transmet l'état de la voiture au rappel audio (une fois par image)"""
+        if voiture.cale and not self.cale:
+            self.calage_lu = 0
+        self.cale = voiture.cale
+        self.consignes = (voiture.moteur_demarre and not voiture.cale,
+                          max(voiture.regime_moteur, 0.0), voiture.accelerateur)
+
+    def _remplir(self, peripherique, memoire):
+        """Rappel du fil audio de SDL : écrit le bloc suivant dans son tampon"""
+        np = self.np
+        echantillons = np.frombuffer(memoire, dtype=np.int16)
+        if len(echantillons) != TAILLE_BLOC:  # Format imposé : ne devrait pas arriver
+            echantillons[:] = 0
+            return
+        self._synthetiser()
+        if self.calage_lu is not None:
+            lu = self.calage_lu
+            morceau = self.calage[lu:lu + TAILLE_BLOC]
+            self.onde[:len(morceau)] += morceau
+            self.calage_lu = lu + TAILLE_BLOC if lu + TAILLE_BLOC < len(self.calage) else None
+        np.clip(self.onde, -32767, 32767, out=self.onde)
+        np.copyto(echantillons, self.onde, casting="unsafe")
+
+    def _synthetiser(self):
+        """Calcule le prochain bloc dans self.onde, sur place"""
+        np = self.np
+        n = TAILLE_BLOC
+
+        # Consignes, atteintes en glissant sur le bloc
+        tourne, regime, accelerateur = self.consignes
+        explosions = regime / 60 * CYLINDRES / 2
+        increment = explosions * TAILLE_TABLE / self.frequence
+        charge = min(1.0, accelerateur / 4)
+        volume = VOLUME * (0.35 + 0.4 * charge + 0.25 * min(1.0, regime / 6000)) if tourne else 0.0
+        suivi = min(1.0, n / (FONDU * self.frequence))
+        volume = self.volume + (volume - self.volume) * suivi
+        melange = self.melange + (charge - self.melange) * suivi
+
+        # Position dans la table : phase + intégrale de l'incrément (qui glisse linéairement)
+        position = self.position
+        np.multiply(self.rampe, self.increment, out=position)
+        np.multiply(self.rampe_carre, increment - self.increment, out=self.glissement)
+        position += self.glissement
+        position += self.phase
+        np.mod(position, TAILLE_TABLE, out=position)
+        np.copyto(self.indices, position, casting="unsafe")
+        self.phase = (self.phase + n * (self.increment + increment) / 2) % TAILLE_TABLE
+        self.increment = increment
+
+        # Mélange ralenti / charge et volume, en glissant aussi
+        np.take(self.ralenti, self.indices, out=self.onde)
+        np.take(self.charge, self.indices, out=self.onde_charge)
+        self.onde_charge -= self.onde
+        np.multiply(self.rampe_unite, melange - self.melange, out=self.gain)
+        self.gain += self.melange
+        self.onde_charge *= self.gain
+        self.onde += self.onde_charge
+        np.multiply(self.rampe_unite, volume - self.volume, out=self.gain)
+        self.gain += self.volume
+        self.onde *= self.gain
+        self.onde *= 32767
+        self.melange = melange
+        self.volume = volume
+
+
+    def fermer(self):
+        self.peripherique.pause(1)
+        self.peripherique.close()
+        sys.setswitchinterval(self.intervalle_gil)
+
+
+def creer_moteur_sonore():
+    """MoteurSonore, ou None (avec un avertissement) sans NumPy ni périphérique audio"""
+    try:
+        return MoteurSonore()
+    except ImportError as erreur:
+        print(f"{erreur.name or 'NumPy'} absent : simulateur muet")
+    except RuntimeError as erreur:  # pygame.error ou pygame._sdl2.sdl2.error
+        print(f"Audio indisponible ({erreur}) : simulateur muet")
+    return None
@@ -0,0 +1,176 @@
+"""
+Simulateur de Conduite - Permis B
+Télémétrie : état de la voiture à chaque pas, écrit en colonnes par un fil d'arrière-plan
+
+Chaque pas de physique est copié dans un tampon circulaire préalloué (un
+tableau par colonne) : la boucle principale ne fait que quelques
+affectations et ne touche jamais au disque. Un fil d'exécution vide le
+tampon par blocs, en ajoutant chaque colonne à son propre fichier binaire
+(petit-boutiste) dans le dossier de la séance. La mémoire occupée ne
+dépend pas de la durée de la séance ; si le disque prend trop de retard,
+les pas en excès sont comptés comme perdus plutôt que de bloquer.
+
+Une colonne étant contiguë sur le disque, la lecture la projette en
+mémoire directement dans un tableau NumPy, sans copie :
+    colonnes = lire_telemetrie("seance.telem")
+    colonnes["regime_moteur"].mean()
+"""
+
+import json
+import os
+import sys
+import threading
+from array import array
+
+VERSION = 1
+
+# Colonnes enregistrées : nom, code de type (module array)
+COLONNES = (
+    ("temps", "d"),
+    ("regime_moteur", "f"),
+    ("vitesse_actuelle", "f"),
+    ("vitesse_engagee", "b"),
+    ("embrayage", "f"),  # Pédales et direction : fractionnaires en analogique
+    ("frein", "f"),
+    ("accelerateur", "f"),
+    ("direction", "f"),
+    ("frein_main", "b"),
+    ("position_route", "d"),
+    ("position_laterale", "f"),
+    ("cale", "b"),
+)
+
+# Type NumPy équivalent à chaque code, tel qu'écrit sur le disque
+TYPES_NUMPY = {"d": "<f8", "f": "<f4", "b": "i1"}
+
+
+class Telemetrie:
+    """Tampon circulaire de l'état de la voiture, vidé sur le disque en arrière-plan"""
+
+    def __init__(self, dossier, frequence, profil=None, capacite=4096, taille_bloc=512):
+        os.makedirs(dossier, exist_ok=True)
+        self.dossier = dossier
+        self.capacite = capacite
+        self.taille_bloc = taille_bloc
+        self.colonnes = [array(code, [0]) * capacite for _, code in COLONNES]
+        self.ecrites = 0  # Lignes ajoutées au tampon (boucle principale)
+        self.videes = 0  # Lignes écrites sur le disque (fil d'arrière-plan)
+        self.perdues = 0
+        self.meta = {
+            "version": VERSION,
+            "frequence": frequence,
+            "profil": profil,
+            "colonnes": [[nom, TYPES_NUMPY[code]] for nom, code in COLONNES],
+            "lignes": None,  # Connu à la fermeture
+        }
+        self._ecrire_meta()
+
+        self.fichiers = [
+            open(os.path.join(dossier, nom + ".bin"), "wb") for nom, _ in COLONNES
+        ]
+        self.signal = threading.Event()
+        self.arret = False
+        self.fil = threading.Thread(target=self._vider_en_continu, name="telemetrie", daemon=True)
+        self.fil.start()
+
+    def capturer(self, temps, voiture):
+        """Ajoute l'état courant de la voiture (appelé après chaque pas de physique)"""
+        n = self.ecrites
+        if n - self.videes >= self.capacite:
+            self.perdues += 1  # Tampon plein : on ne bloque pas la boucle principale
+            return
+        i = n % self.capacite
+        c = self.colonnes
+        c[0][i] = temps
+        c[1][i] = voiture.regime_moteur
+        c[2][i] = voiture.vitesse_actuelle
+        c[3][i] = voiture.vitesse_engagee
+        c[4][i] = voiture.embrayage
+        c[5][i] = voiture.frein
+        c[6][i] = voiture.accelerateur
+        c[7][i] = voiture.direction
+        c[8][i] = voiture.frein_main
+        c[9][i] = voiture.position_route
+        c[10][i] = voiture.position_laterale
+        c[11][i] = voiture.cale
+        self.ecrites = n + 1
+        if n + 1 - self.videes >= self.taille_bloc:
+            self.signal.set()
+
+    def _vider_en_continu(self):
+        while not self.arret:
+            self.signal.wait(0.5)
+            self.signal.clear()
+            self._vider()
+        self._vider()
+
+    def _vider(self):
+        """Écrit les lignes en attente, colonne par colonne (fil d'arrière-plan)"""
+        debut, fin = self.videes, self.ecrites
+        if fin == debut:
+            return
+        a = debut % self.capacite
+        b = a + (fin - debut)
+        for colonne, fichier in zip(self.colonnes, self.fichiers):
+            if b <= self.capacite:
+                bloc = colonne[a:b]
+            else:
+                bloc = colonne[a:] + colonne[:b - self.capacite]
+            if sys.byteorder == "big":
+                bloc.byteswap()
+            fichier.write(bloc.tobytes())
+        self.videes = fin  # Libère les lignes pour la boucle principale
+
+    def fermer(self):
+        self.arret = True
+        self.signal.set()
+        self.fil.join()
+        for fichier in self.fichiers:
+            fichier.close()
+        self.meta["lignes"] = self.videes
+        self.meta["perdues"] = self.perdues
+        self._ecrire_meta()
+
+    def _ecrire_meta(self):
+        with open(os.path.join(self.dossier, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2, ensure_ascii=False)
+
+
+def lire_telemetrie(dossier):
+    """Colonnes d'une séance, projetées en mémoire (tableaux NumPy en lecture seule)"""
+    import numpy as np
+
+    with open(os.path.join(dossier, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    chemins = {nom: os.path.join(dossier, nom + ".bin") for nom, _ in meta["colonnes"]}
+    lignes = meta["lignes"]
+    if lignes is None:
+        # Séance interrompue : lignes complètes présentes dans toutes les colonnes
+        lignes = min(
+            os.path.getsize(chemins[nom]) // np.dtype(type_numpy).itemsize
+            for nom, type_numpy in meta["colonnes"]
+        )
+
+    colonnes = {}
+    for nom, type_numpy in meta["colonnes"]:
+        if lignes == 0:
+            colonnes[nom] = np.empty(0, dtype=type_numpy)
+        else:
+            colonnes[nom] = np.memmap(chemins[nom], dtype=type_numpy, mode="r", shape=(lignes,))
+    return colonnes
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Résumé d'une séance de télémétrie")
+    parser.add_argument("dossier")
+    args = parser.parse_args()
+
+    colonnes = lire_telemetrie(args.dossier)
+    temps = colonnes["temps"]
+    print(f"{len(temps)} pas, {temps[-1] if len(temps) else 0:.1f} s")
+    for nom, valeurs in colonnes.items():
+        if len(valeurs):
+            print(f"  {nom:18} min {valeurs.min():10.2f}  moy {valeurs.mean():10.2f}  "
+                  f"max {valeurs.max():10.2f}")
@@ -0,0 +1,131 @@
+"""
+Simulateur de Conduite - Permis B
+Trafic : autres usagers de la route, conduits par un contrôleur simple
+
+Chaque véhicule a une abscisse s le long de la route (m, la route boucle),
+une vitesse, une voie (à droite dans le sens de l'élève, à gauche en sens
+inverse) et une position latérale. Les tableaux NumPy sont gardés triés
+par abscisse : « qui est autour de l'élève » et « qui est visible » sont
+des tranches trouvées par recherche dichotomique (np.searchsorted), en
+temps logarithmique quel que soit le nombre de véhicules.
+
+Mise à jour vectorisée, une fois par image :
+- longitudinal : modèle du conducteur intelligent (IDM), qui suit le
+  véhicule de devant dans la même voie, l'élève compris ;
+- latéral : retour progressif vers le centre de la voie.
+Les véhicules ne se doublent pas : l'ordre dans une voie ne change que
+lorsqu'un véhicule passe la fin de la boucle, et le tri (stable) d'un
+tableau presque trié est quasi linéaire.
+
+Le trafic n'est pas enregistré avec les séances.
+"""
+
+import numpy as np
+
+LARGEUR_VOIE = 3.5  # m
+VOIES = (LARGEUR_VOIE / 2, -LARGEUR_VOIE / 2)  # Centre de chaque voie : sens de l'élève, sens inverse
+LONGUEUR_VEHICULE = 4.5  # m
+
+# Modèle du conducteur intelligent
+ACCELERATION = 1.5  # m/s²
+DECELERATION_CONFORT = 2.5  # m/s²
+DISTANCE_ARRET = 3.0  # m, écart minimal à l'arrêt
+TEMPS_INTERVALLE = 1.5  # s, intervalle visé avec le véhicule de devant
+GAIN_LATERAL = 1.5  # 1/s, retour au centre de la voie
+
+NOMBRE_COULEURS = 8  # Indice de couleur de carrosserie (palette de l'affichage)
+
+
+class Trafic:
+    """Véhicules du trafic, triés par abscisse le long de la route"""
+
+    def __init__(self, longueur_route, nombre=100, graine=0, part_meme_sens=0.6):
+        rng = np.random.default_rng(graine)
+        self.longueur = longueur_route
+        meme_sens = rng.random(nombre) < part_meme_sens
+        self.sens = np.where(meme_sens, 1, -1).astype(np.int8)
+        self.voie = np.where(meme_sens, VOIES[0], VOIES[1])
+        self.lat = self.voie + rng.normal(0.0, 0.3, nombre)
+        self.v0 = rng.uniform(70, 90, nombre) / 3.6  # Vitesse souhaitée (m/s)
+        self.v = self.v0 * 0.8
+        self.couleur = rng.integers(0, NOMBRE_COULEURS, nombre).astype(np.int8)
+        # Répartis régulièrement dans chaque voie, avec un peu de désordre
+        self.s = np.empty(nombre)
+        for sens in (1, -1):
+            indices = np.flatnonzero(self.sens == sens)
+            pas = longueur_route / max(len(indices), 1)
+            self.s[indices] = (np.arange(len(indices)) + rng.uniform(0, 0.5, len(indices))) * pas
+        self._trier()
+
+    def __len__(self):
+        return len(self.s)
+
+    def _trier(self):
+        ordre = np.argsort(self.s, kind="stable")
+        for nom in ("s", "v", "v0", "sens", "voie", "lat", "couleur"):
+            setattr(self, nom, getattr(self, nom)[ordre])
+
+    def indices_entre(self, s_min, s_max):
+        """Indices des véhicules d'abscisse dans [s_min, s_max] (tranche, ou deux à la jonction)"""
+        L = self.longueur
+        if s_max - s_min >= L:
+            return np.arange(len(self.s))
+        a, b = s_min % L, s_max % L
+        if a <= b:
+            return np.arange(*np.searchsorted(self.s, (a, b)))
+        debut, fin = np.searchsorted(self.s, (a, b))
+        return np.concatenate((np.arange(debut, len(self.s)), np.arange(0, fin)))
+
+    def proches(self, s, rayon):
+        """Véhicules à moins de `rayon` m (le long de la route) de l'abscisse s"""
+        return self.indices_entre(s - rayon, s + rayon)
+
+    def vehicule_devant(self, s, lat, portee=150.0):
+        """(distance m, vitesse m/s) du premier véhicule devant l'élève dans sa voie, ou None"""
+        indices = self.indices_entre(s, s + portee)
+        dans_voie = (self.sens[indices] == 1) & (np.abs(self.lat[indices] - lat) < LARGEUR_VOIE * 0.75)
+        indices = indices[dans_voie]
+        if not len(indices):
+            return None
+        i = indices[0]  # Tranche dans l'ordre des abscisses depuis s
+        return (self.s[i] - s) % self.longueur - LONGUEUR_VEHICULE, float(self.v[i])
+
+    def mettre_a_jour(self, dt, s_eleve, lat_eleve, v_eleve):
+        """Avance tous les véhicules de dt (s) ; l'élève (m, m, m/s) est un obstacle dans sa voie"""
+        L = self.longueur
+        # Voie de l'élève : une seule, selon le côté de la ligne médiane où il se trouve
+        voie_eleve = VOIES[0] if lat_eleve >= 0 else VOIES[1]
+        ecart = np.full(len(self.s), np.inf)
+        v_devant = self.v0.copy()
+
+        for centre, sens in zip(VOIES, (1, -1)):
+            indices = np.flatnonzero(self.sens == sens)
+            if not len(indices):
+                continue
+            s = self.s[indices]
+            # Véhicule de devant : suivant dans l'ordre des abscisses (précédent en sens inverse)
+            devant = np.roll(indices, -sens)
+            distance = ((self.s[devant] - s) * sens) % L
+            if len(indices) == 1:
+                distance[:] = np.inf
+            vitesse = self.v[devant]
+            if centre == voie_eleve:
+                # L'élève dans cette voie : venant vers lui (sens inverse), il arrive vite
+                jusqu_eleve = ((s_eleve - s) * sens) % L
+                plus_pres = jusqu_eleve < distance
+                distance = np.where(plus_pres, jusqu_eleve, distance)
+                vitesse = np.where(plus_pres, v_eleve * sens, vitesse)
+            ecart[indices] = np.maximum(distance - LONGUEUR_VEHICULE, 0.1)
+            v_devant[indices] = vitesse
+
+        # Modèle du conducteur intelligent
+        v = self.v
+        dv = v - v_devant
+        souhaite = DISTANCE_ARRET + np.maximum(
+            0.0, v * TEMPS_INTERVALLE + v * dv / (2 * np.sqrt(ACCELERATION * DECELERATION_CONFORT)))
+        acceleration = ACCELERATION * (1 - (v / self.v0) ** 4 - (souhaite / ecart) ** 2)
+        np.maximum(v + acceleration * dt, 0.0, out=v)
+        self.s += self.sens * v * dt
+        np.mod(self.s, L, out=self.s)
+        self.lat += (self.voie - self.lat) * min(1.0, GAIN_LATERAL * dt)
+        self._trier()
@@ -0,0 +1,232 @@
+"""
+Simulateur de Conduite - Permis B
+Physique vectorisée : N voitures avancées en un seul appel
+
+Reproduit Voiture.update (simulation.py) avec des tableaux NumPy et des
+mises à jour masquées sans branchement, pour rejouer des milliers de
+traces d'élèves ou faire des études de paramètres.
+
+Banc d'essai :
+    python voiture_batch.py --voitures 10000 --pas 600
+"""
+
+import time
+
+import numpy as np
+
+from simulation import CENTRE_VOIE, Voiture
+
+
+class VoitureBatch:
+    """État de N voitures sous forme de tableaux (un élément par voiture)"""
+
+    def __init__(self, n):
+        self.n = n
+        self.moteur_demarre = np.zeros(n, dtype=bool)
+        self.vitesse_actuelle = np.zeros(n)  # km/h
+        self.regime_moteur = np.full(n, 800.0)  # RPM au ralenti
+        self.vitesse_engagee = np.zeros(n, dtype=np.int8)  # 0 = point mort, -1 = marche arrière
+        # Pédales et direction fractionnaires (commandes analogiques, voir entrees.py)
+        self.embrayage = np.zeros(n)  # 0-4
+        self.frein = np.zeros(n)  # 0-4
+        self.accelerateur = np.zeros(n)  # 0-4
+        self.direction = np.zeros(n)  # -1 gauche, 0 centre, 1 droite
+        self.frein_main = np.ones(n, dtype=bool)
+        self.position_route = np.zeros(n)
+        self.position_laterale = np.full(n, float(CENTRE_VOIE))  # -100 à 100
+        self.cale = np.zeros(n, dtype=bool)
+
+        # Vitesse max par rapport, indexée par vitesse_engagee + 1
+        # (le point mort reçoit 1 pour éviter une division par zéro, sans effet)
+        reference = Voiture().vitesse_max_rapport
+        self.vitesse_max_rapport = np.array(
+            [reference[-1], 1] + [reference[r] for r in range(1, 6)], dtype=float
+        )
+
+    @classmethod
+    def depuis_voitures(cls, voitures):
+        """Construit un lot à partir d'objets Voiture"""
+        lot = cls(len(voitures))
+        for nom in lot.champs():
+            getattr(lot, nom)[:] = [getattr(v, nom) for v in voitures]
+        return lot
+
+    @staticmethod
+    def champs():
+        return (
+            "moteur_demarre", "vitesse_actuelle", "regime_moteur", "vitesse_engagee",
+            "embrayage", "frein", "accelerateur", "direction", "frein_main",
+            "position_route", "position_laterale", "cale",
+        )
+
+    def voiture(self, i):
+        """Renvoie une copie de la voiture i sous forme d'objet Voiture"""
+        v = Voiture()
+        for nom in self.champs():
+            setattr(v, nom, getattr(self, nom)[i].item())
+        return v
+
+    def update(self, dt):
+        actif = self.moteur_demarre
+        ve = self.vitesse_engagee
+        v = self.vitesse_actuelle
+        acc = self.accelerateur
+        emb = self.embrayage
+        vitesse_max = self.vitesse_max_rapport[ve + 1]
+
+        # Calcul du régime moteur
+        regime_libre = 800 + acc * 1500.0
+        regime_base = np.where(
+            ve > 0,
+            800 + (v / vitesse_max) * 5200,
+            800 + (np.abs(v) / 20) * 3000,  # Marche arrière
+        )
+        regime_cible = np.where(
+            (ve == 0) | (emb >= 3), regime_libre, regime_base + acc * 500.0
+        )
+
+        # Transition douce du régime (moteur coupé : régime nul)
+        regime = self.regime_moteur + (regime_cible - self.regime_moteur) * dt * 3
+        regime = np.clip(regime, 0, 7000)
+
+        # Détection du calage
+        calage = actif & (ve != 0) & (emb < 2) & (regime < 500) & (v < 5)
+        self.cale |= calage
+        regime = np.where(actif & ~calage, regime, 0.0)
+        self.regime_moteur = regime
+
+        # Calcul de la vitesse
+        force_motrice = (acc / 4) * (1 - emb / 4)
+        vitesse_cible = np.where(ve > 0, force_motrice * vitesse_max, -force_motrice * 20)
+        entraine = actif & (ve != 0) & (emb < 4) & ~self.frein_main
+        v = np.where(entraine, v + (vitesse_cible - v) * dt * 2, v)
+
+        # Freinage
+        freinage = self.frein * (30 * dt)
+        v_freine = np.where(v > 0, np.maximum(0, v - freinage), np.minimum(0, v + freinage))
+        v = np.where(actif & (self.frein > 0), v_freine, v)
+
+        # Frein à main (coefficients par image à 60 Hz, ramenés à dt)
+        v_serre = v * 0.95 ** (dt * 60)
+        v_serre = np.where(np.abs(v_serre) < 0.5, 0.0, v_serre)
+        v = np.where(actif & self.frein_main & (v != 0), v_serre, v)
+
+        # Friction naturelle
+        v = np.where(actif & (acc == 0) & (ve == 0), v * 0.99 ** (dt * 60), v)
+        self.vitesse_actuelle = v
+
+        # Mise à jour de la position
+        self.position_route = np.where(actif, self.position_route + v * dt * 10, self.position_route)
+
+        # Direction
+        lateral = self.position_laterale + self.direction * np.abs(v) * dt * 0.5
+        tourne = actif & (np.abs(v) > 1)
+        self.position_laterale = np.where(tourne, np.clip(lateral, -100, 100), self.position_laterale)
+
+        # Les moteurs calés sont coupés après le pas, comme dans Voiture.update
+        self.moteur_demarre = actif & ~calage
+
+    def demarrer_moteur(self, masque=None):
+        masque = self._masque(masque) & ~self.moteur_demarre & (self.embrayage >= 3)
+        self.moteur_demarre |= masque
+        self.cale &= ~masque
+        self.regime_moteur[masque] = 800
+        return masque
+
+    def couper_moteur(self, masque=None):
+        masque = self._masque(masque)
+        self.moteur_demarre &= ~masque
+        self.regime_moteur[masque] = 0
+
+    def changer_vitesse(self, nouvelle_vitesse, masque=None):
+        masque = self._masque(masque) & (self.embrayage >= 3)
+        self.vitesse_engagee[masque] = nouvelle_vitesse
+        return masque
+
+    def _masque(self, masque):
+        if masque is None:
+            return np.ones(self.n, dtype=bool)
+        return np.asarray(masque, dtype=bool)
+
+
+# Banc d'essai
+def etats_aleatoires(n, graine=0):
+    """Tire n voitures dans des états variés (moteur, rapport, pédales, vitesse)"""
+    rng = np.random.default_rng(graine)
+    voitures = []
+    for _ in range(n):
+        v = Voiture()
+        v.moteur_demarre = bool(rng.random() < 0.9)
+        v.vitesse_engagee = int(rng.integers(-1, 6))
+        if rng.random() < 0.5:  # Clavier : niveaux entiers
+            v.embrayage = int(rng.integers(0, 5))
+            v.frein = int(rng.integers(0, 5))
+            v.accelerateur = int(rng.integers(0, 5))
+            v.direction = int(rng.integers(-1, 2))
+        else:  # Manette : valeurs fractionnaires
+            v.embrayage, v.frein, v.accelerateur = (float(x) for x in rng.uniform(0, 4, 3))
+            v.direction = float(rng.uniform(-1, 1))
+        v.frein_main = bool(rng.random() < 0.2)
+        v.vitesse_actuelle = float(rng.uniform(-20, 130))
+        v.regime_moteur = float(rng.uniform(0, 7000)) if v.moteur_demarre else 0
+        voitures.append(v)
+    return voitures
+
+
+def ecart_max(voitures, lot):
+    """Plus grand écart absolu entre les objets Voiture et le lot"""
+    ecart = 0.0
+    for nom in ("vitesse_actuelle", "regime_moteur", "position_route", "position_laterale"):
+        reference = np.array([getattr(v, nom) for v in voitures], dtype=float)
+        ecart = max(ecart, float(np.max(np.abs(reference - getattr(lot, nom)))))
+    for nom in ("moteur_demarre", "cale"):
+        reference = np.array([getattr(v, nom) for v in voitures])
+        if np.any(reference != getattr(lot, nom)):
+            ecart = float("inf")
+    return ecart
+
+
+def benchmark(n_voitures=10000, pas=600, dt=1 / 60, n_scalaire=1000):
+    """Compare les pas-voiture par seconde du lot et de la classe scalaire"""
+    voitures = etats_aleatoires(max(n_voitures, n_scalaire))
+    lot = VoitureBatch.depuis_voitures(voitures[:n_voitures])
+
+    debut = time.perf_counter()
+    for _ in range(pas):
+        lot.update(dt)
+    duree_lot = time.perf_counter() - debut
+
+    scalaires = voitures[:n_scalaire]
+    debut = time.perf_counter()
+    for _ in range(pas):
+        for v in scalaires:
+            v.update(dt)
+    duree_scalaire = time.perf_counter() - debut
+
+    # Vérification : mêmes résultats sur les voitures scalaires
+    controle = VoitureBatch.depuis_voitures(etats_aleatoires(n_scalaire))
+    for _ in range(pas):
+        controle.update(dt)
+
+    return {
+        "voitures": n_voitures,
+        "pas": pas,
+        "lot_pas_voiture_par_s": n_voitures * pas / duree_lot,
+        "scalaire_pas_voiture_par_s": n_scalaire * pas / duree_scalaire,
+        "ecart_max": ecart_max(scalaires, controle),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Banc d'essai de la physique vectorisée")
+    parser.add_argument("--voitures", type=int, default=10000)
+    parser.add_argument("--pas", type=int, default=600)
+    args = parser.parse_args()
+
+    r = benchmark(args.voitures, args.pas)
+    print(f"Lot ({r['voitures']} voitures) : {r['lot_pas_voiture_par_s']:,.0f} pas-voiture/s")
+    print(f"Voiture scalaire : {r['scalaire_pas_voiture_par_s']:,.0f} pas-voiture/s")
+    print(f"Accélération : x{r['lot_pas_voiture_par_s'] / r['scalaire_pas_voiture_par_s']:.0f}")
+    print(f"Écart max avec Voiture.update : {r['ecart_max']:.2e}")